@@ -1,13 +1,14 @@
 # backend/aptitude_routes.py
-import os
-import asyncio
 import random
 import re
 import json
 import ast
 from fastapi import APIRouter, HTTPException
-from google import genai
+import llm_gateway
 from pydantic import BaseModel
+import question_bank
+import mcq_pool
+import singleflight
 
 router = APIRouter(prefix="/api/aptitude", tags=["Aptitude"])
 
@@ -15,41 +16,10 @@ class MCQRequest(BaseModel):
     topic: str
     count: int = 20
     difficulty: str | None = None
+    user_id: int | None = None  # lets the MCQ pool skip questions this user has already seen
 
 # --- 1. LOCAL DATASET LOGIC (FOR FINAL EXAM) ---
-def load_specific_db(filename):
-    """Loads a specific JSON dataset file."""
-    path = os.path.join(os.path.dirname(__file__), filename)
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f: 
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️ Error reading {filename}: {e}")
-            return []
-    return []
-
-def get_balanced_sample(module_qs, count=20):
-    """Fetches exactly 20% Easy, 30% Medium, 50% Hard"""
-    easy_qs = [q for q in module_qs if q.get('difficulty') == 'easy']
-    med_qs = [q for q in module_qs if q.get('difficulty') == 'medium']
-    hard_qs = [q for q in module_qs if q.get('difficulty') == 'hard']
-    
-    e_count = int(count * 0.20)
-    m_count = int(count * 0.30)
-    h_count = int(count * 0.50)
-    
-    test_qs = []
-    # Use random.choices to allow duplicates if your DB is still small
-    if easy_qs: test_qs.extend(random.choices(easy_qs, k=e_count))
-    if med_qs: test_qs.extend(random.choices(med_qs, k=m_count))
-    if hard_qs: test_qs.extend(random.choices(hard_qs, k=h_count))
-    
-    # Fill any missing gaps if the math was slightly off
-    while len(test_qs) < count and module_qs:
-        test_qs.append(random.choice(module_qs))
-        
-    return test_qs
+# Datasets are loaded once and bucketed by difficulty in question_bank.py
 
 # --- 2. LIVE AI LOGIC (FOR SINGLE TOPICS) ---
 def generate_prompt(topic: str, count: int, difficulty: str | None = None) -> str:
@@ -122,16 +92,21 @@ def validate_mcqs(data, count):
                 })
     return cleaned[:count]
 
-async def generate_single_topic(topic: str, count: int, difficulty: str, api_key: str = None):
-    if not api_key: return []
-    client = genai.Client(api_key=api_key)
+async def generate_single_topic(topic: str, count: int, difficulty: str, module: str = "aptitude", priority: str = "batch"):
+    """Concurrent identical requests (same topic, count, difficulty, module, priority) share one Gemini call."""
+    if not llm_gateway.has_keys(): return []
+    # module: results are produced for (and billed to) one module. priority: a user-facing request
+    # must not join a background refill and wait in the background queue behind it.
+    key = (topic.strip().lower(), count, (difficulty or "").strip().lower(), module, priority)
+    return await singleflight.flight("mcq").do(key, lambda: _generate_single_topic(topic, count, difficulty, module, priority))
+
+async def _generate_single_topic(topic: str, count: int, difficulty: str, module: str, priority: str):
     prompt = generate_prompt(topic, count, difficulty)
     
-    models_to_try = ["gemini-2.5-flash", "gemini-2.5-flash-lite"] 
-    
-    for model_name in models_to_try:
+    # Retries/backoff happen inside the gateway; an unusable answer also falls back to the next model
+    for model_name in llm_gateway.DEFAULT_MODELS:
         try:
-            response = await client.aio.models.generate_content(model=model_name, contents=prompt)
+            response = await llm_gateway.generate(module, prompt, models=(model_name,), priority=priority)
             data = clean_and_parse_json(response.text or "")
             valid_mcqs = validate_mcqs(data, count)
             if len(valid_mcqs) >= (count // 2): return valid_mcqs
@@ -146,26 +121,23 @@ async def generate_aptitude_test(req: MCQRequest):
     
     # HYBRID LOGIC: If Final Test -> Load instantly from the 3 JSON Datasets
     if req.topic == "Final Aptitude Test":
-        quant_qs = load_specific_db("quant_dataset.json")
-        logic_qs = load_specific_db("logical_dataset.json")
-        verb_qs = load_specific_db("verbal_dataset.json")
-        
-        if not quant_qs and not logic_qs and not verb_qs:
-            raise HTTPException(status_code=500, detail="Databases missing. Run the background Python miners first.")
-            
         final_exam = []
         
         # Get exactly 20 of each, perfectly balanced with 20% Easy / 30% Medium / 50% Hard
-        if quant_qs: final_exam.extend(get_balanced_sample(quant_qs, 20))
-        if logic_qs: final_exam.extend(get_balanced_sample(logic_qs, 20))
-        if verb_qs: final_exam.extend(get_balanced_sample(verb_qs, 20))
+        for bank in question_bank.banks.values():
+            final_exam.extend(bank.sample_balanced(20))
+        
+        if not final_exam:
+            raise HTTPException(status_code=500, detail="Databases missing. Run the background Python miners first.")
         
         random.shuffle(final_exam)
         return final_exam
 
-    # HYBRID LOGIC: If Single Topic -> Generate Live with AI
-    api_key = os.getenv("GEMINI_API_KEY_APTITUDE") or os.getenv("GEMINI_API_KEY")
-    mcqs = await generate_single_topic(req.topic, req.count, req.difficulty, api_key)
+    # HYBRID LOGIC: If Single Topic -> Serve from the MCQ pool, generating live with AI when it runs dry
+    async def generate(count, priority="batch"):
+        return await generate_single_topic(req.topic, count, req.difficulty, "aptitude", priority)
+
+    mcqs = await mcq_pool.serve(req.topic, req.difficulty, req.count, req.user_id, generate)
     
     if not mcqs:
         raise HTTPException(status_code=500, detail="Failed to generate AI questions. Rate limit may be exceeded.")
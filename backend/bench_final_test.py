@@ -0,0 +1,75 @@
+# backend/bench_final_test.py
+# Requests/sec on POST /api/aptitude/mcqs/test for the Final Aptitude Test:
+# the old path (re-read + re-filter all three JSON files per request) vs. question_bank.py.
+#
+#   python bench_final_test.py --requests 2000
+import os
+import json
+import time
+import random
+import argparse
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import aptitude_routes
+import question_bank
+
+# --- Old path, kept verbatim for comparison ---
+def load_specific_db(filename):
+    path = os.path.join(os.path.dirname(__file__), filename)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error reading {filename}: {e}")
+            return []
+    return []
+
+def get_balanced_sample(module_qs, count=20):
+    easy_qs = [q for q in module_qs if q.get('difficulty') == 'easy']
+    med_qs = [q for q in module_qs if q.get('difficulty') == 'medium']
+    hard_qs = [q for q in module_qs if q.get('difficulty') == 'hard']
+    test_qs = []
+    if easy_qs: test_qs.extend(random.choices(easy_qs, k=int(count * 0.20)))
+    if med_qs: test_qs.extend(random.choices(med_qs, k=int(count * 0.30)))
+    if hard_qs: test_qs.extend(random.choices(hard_qs, k=int(count * 0.50)))
+    while len(test_qs) < count and module_qs:
+        test_qs.append(random.choice(module_qs))
+    return test_qs
+
+legacy_app = FastAPI()
+
+@legacy_app.post("/api/aptitude/mcqs/test")
+async def legacy_final_test(req: aptitude_routes.MCQRequest):
+    final_exam = []
+    for filename in question_bank.DATASETS.values():
+        qs = load_specific_db(filename)
+        if qs: final_exam.extend(get_balanced_sample(qs, 20))
+    random.shuffle(final_exam)
+    return final_exam
+
+current_app = FastAPI()
+current_app.include_router(aptitude_routes.router)
+
+def run(label, app, requests):
+    with TestClient(app) as client:
+        body = {"topic": "Final Aptitude Test"}
+        for _ in range(20):  # warm-up
+            client.post("/api/aptitude/mcqs/test", json=body)
+        start = time.perf_counter()
+        for _ in range(requests):
+            resp = client.post("/api/aptitude/mcqs/test", json=body)
+            assert resp.status_code == 200 and len(resp.json()) == 60, resp.text
+        elapsed = time.perf_counter() - start
+    print(f"{label:<14} {requests / elapsed:8.1f} req/s  ({elapsed * 1000 / requests:.2f} ms/request)")
+    return requests / elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    question_bank.load_all()
+    before = run("load per call", legacy_app, args.requests)
+    after = run("question_bank", current_app, args.requests)
+    print(f"speed-up: {after / before:.1f}x")
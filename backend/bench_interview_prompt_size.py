@@ -0,0 +1,62 @@
+# backend/bench_interview_prompt_size.py
+# Question-prompt size (estimated tokens) per turn of a simulated 10-question interview:
+# the whole conversation vs. the old last-6-messages window vs. rolling memory under the budget.
+# Live numbers per turn are under "interview" in GET /health/llm.
+#
+#   python bench_interview_prompt_size.py --answer-words 150 --code-turns 6,8
+import random
+import argparse
+from types import SimpleNamespace
+import interview_memory
+from interview_state import InterviewState
+from interview_routes import _question_prompt
+
+SKILLS = ["Python", "SQL", "Redis", "Docker", "Kafka", "React", "AWS", "Go"]
+WEAK = ["Trade-offs", "Testing", "Metrics", "Concurrency"]
+
+def words(n):
+    return " ".join(random.choice(["cache", "latency", "service", "query", "team", "deploy", "index", "users"]) for _ in range(n))
+
+def simulate(answer_words, code_turns):
+    session = SimpleNamespace(id=1, user_id=1, interview_type="Technical", job_role="Software Engineer",
+                              memory_summary=None, memory_facts=None)
+    first = SimpleNamespace(id=1, turn_number=1, question_text="Please introduce yourself.", user_answer_text=None, ai_score=None)
+    state = InterviewState(session, [first])
+    conversation = [("ai", first.question_text)]
+    sizes = []
+    for turn in range(1, 11):
+        answer = words(answer_words * (4 if turn in code_turns else 1))
+        full_history = "\n".join(f"{role}: {content}" for role, content in conversation)
+        last_six = "\n".join(f"{role}: {content}" for role, content in conversation[-6:])
+        current = _question_prompt(state, answer)
+        base = current.split("Conversation History:")[0]
+        sizes.append((
+            turn,
+            interview_memory.count_tokens(f"{base}Conversation History:\n{full_history}\n\nCandidate's Last Answer: {answer}"),
+            interview_memory.count_tokens(f"{base}Conversation History:\n{last_six}\n\nCandidate's Last Answer: {answer}"),
+            interview_memory.count_tokens(current),
+        ))
+        # What background scoring would merge for this answer
+        interview_memory.merge(session, turn, {
+            "note": f"Turn {turn}: {words(12)}",
+            "skills": random.sample(SKILLS, 2), "weak_areas": random.sample(WEAK, 1),
+        })
+        state.remember(session.memory_summary, session.memory_facts)
+        state.answer(answer)
+        question = f"Question {turn + 1}: {words(25)}?"
+        state.advance(turn + 1, question)
+        conversation += [("user", answer), ("ai", question)]
+    return sizes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answer-words", type=int, default=120)
+    parser.add_argument("--code-turns", default="6,8", help="turns whose answers are 4x longer (code)")
+    args = parser.parse_args()
+    random.seed(7)
+    code_turns = {int(t) for t in args.code_turns.split(",") if t}
+
+    print(f"context budget: {interview_memory.INTERVIEW_CONTEXT_TOKEN_BUDGET} tokens")
+    print(f"{'turn':>4} {'full history':>13} {'last 6 msgs':>12} {'memory':>8}")
+    for turn, full, window, memory in simulate(args.answer_words, code_turns):
+        print(f"{turn:>4} {full:>13} {window:>12} {memory:>8}")
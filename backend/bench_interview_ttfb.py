@@ -0,0 +1,56 @@
+# backend/bench_interview_ttfb.py
+# Time until the candidate sees the first word of the next interview question:
+# /chat (wait for the whole JSON reply) vs. /chat/stream (next_question streamed as it arrives).
+# Runs the real prompt through llm_gateway against fake_llm.py, so no database or quota is needed.
+#
+#   python fake_llm.py --port 8808 --latency 0.8 --chunk-delay 0.08
+#   GEMINI_BASE_URL=http://127.0.0.1:8808 GEMINI_API_KEY=fake python bench_interview_ttfb.py --turns 20
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+import llm_gateway
+from interview_state import InterviewState
+from interview_routes import JsonFieldStream, _question_prompt, _parse_question
+from percentiles import percentile
+
+def prompt_for(turn):
+    session = SimpleNamespace(id=1, user_id=1, interview_type="Technical", job_role="Software Engineer",
+                              memory_summary=None, memory_facts=None)
+    asked = SimpleNamespace(id=1, turn_number=turn, question_text="Tell me about a project you are proud of.",
+                            user_answer_text=None, ai_score=None)
+    return _question_prompt(InterviewState(session, [asked]), "I built a caching layer for our API.")
+
+async def blocking_turn(turn):
+    start = time.perf_counter()
+    response = await llm_gateway.generate("interview", prompt_for(turn), priority="interactive")
+    assert _parse_question(response.text, False).get("next_question")
+    return time.perf_counter() - start
+
+async def streaming_turn(turn):
+    start = time.perf_counter()
+    question = JsonFieldStream("next_question")
+    first = None
+    async for chunk in llm_gateway.generate_stream("interview", prompt_for(turn)):
+        if question.feed(chunk) and first is None:
+            first = time.perf_counter() - start
+    assert first is not None
+    return first
+
+async def run(label, turn_fn, turns):
+    timings = [await turn_fn(turn % 9 + 1) for turn in range(turns)]
+    print(f"{label:<13} p50 {percentile(timings, 50) * 1000:7.0f} ms   p95 {percentile(timings, 95) * 1000:7.0f} ms")
+    return percentile(timings, 50)
+
+async def main(turns):
+    before = await run("/chat", blocking_turn, turns)
+    after = await run("/chat/stream", streaming_turn, turns)
+    print(f"time to first question byte: {after / before:.0%} of non-streaming")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    if not llm_gateway.has_keys():
+        raise SystemExit("Set GEMINI_API_KEY (and GEMINI_BASE_URL for fake_llm.py) first")
+    asyncio.run(main(args.turns))
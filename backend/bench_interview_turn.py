@@ -0,0 +1,88 @@
+# backend/bench_interview_turn.py
+# Perceived latency of one interview turn: the old single call that scores the answer *and* asks
+# the next question vs. the question-only call /chat now makes (scoring runs alongside it).
+# Runs the real prompts through llm_gateway against fake_llm.py, so no database or quota is needed.
+#
+#   python fake_llm.py --port 8808 --latency 0.8 --chunk-delay 0.08
+#   GEMINI_BASE_URL=http://127.0.0.1:8808 GEMINI_API_KEY=fake python bench_interview_turn.py --turns 20
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+import llm_gateway
+from interview_state import InterviewState
+from interview_routes import _question_prompt, _score_prompt, _parse_question, _parse_json
+from percentiles import percentile
+
+SESSION = SimpleNamespace(id=1, user_id=1, interview_type="Technical", job_role="Software Engineer",
+                          memory_summary=None, memory_facts=None)
+ANSWER = "I built a caching layer for our API."
+
+# --- Old combined prompt, kept verbatim for comparison ---
+def combined_prompt(turn_count):
+    system_instruction = f"""
+            You are conducting a {SESSION.interview_type} interview for the {SESSION.job_role} role.
+            Current Progress: Question {turn_count} of 10.
+
+            DIFFICULTY LOGIC:
+            - Turns 1-3: Basic/Introductory level.
+            - Turns 4-7: Intermediate level (Scenario-based or core technical concepts).
+            - Turns 8-9: Advanced/Hard level (Complex problem solving).
+            - Turn 10: Closing and final thoughts.
+
+            STRICT RULES:
+            1. Ask ONLY ONE question at a time.
+            2. Keep questions concise (under 30 words) to facilitate voice interaction.
+            3. Increase the technical complexity as the interview progresses.
+            4. If the turn_count reaches 10, set "is_final": true.
+
+            RESPONSE JSON FORMAT:
+            {{
+                "feedback": "...",
+                "ideal_answer": "...",
+                "score": 0-10,
+                "next_question": "...",
+                "is_final": false
+            }}
+        """
+    return f"{system_instruction}\n\nConversation History:\n\n\nCandidate's Last Answer: {ANSWER}"
+
+async def combined_turn(turn):
+    start = time.perf_counter()
+    response = await llm_gateway.generate("interview", combined_prompt(turn), priority="interactive")
+    assert _parse_json(response.text).get("score") is not None
+    return time.perf_counter() - start, None
+
+async def split_turn(turn):
+    start = time.perf_counter()
+    answered = SimpleNamespace(id=1, turn_number=turn, question_text="Tell me about a project you are proud of.",
+                               user_answer_text=ANSWER, ai_score=None)
+    state = InterviewState(SESSION, [answered])
+    scoring = asyncio.create_task(llm_gateway.generate("interview", _score_prompt(state), priority="interactive"))
+    response = await llm_gateway.generate("interview", _question_prompt(state, ANSWER), priority="interactive")
+    assert _parse_question(response.text, False).get("next_question")
+    turn_latency = time.perf_counter() - start
+    await scoring
+    return turn_latency, time.perf_counter() - start
+
+async def run(label, turn_fn, turns):
+    results = [await turn_fn(turn % 9 + 1) for turn in range(turns)]
+    timings = [turn_latency for turn_latency, _ in results]
+    line = f"{label:<10} p50 {percentile(timings, 50) * 1000:7.0f} ms   p95 {percentile(timings, 95) * 1000:7.0f} ms"
+    if results[0][1] is not None:
+        line += f"   (score ready after p50 {percentile([scored for _, scored in results], 50) * 1000:.0f} ms)"
+    print(line)
+    return percentile(timings, 50)
+
+async def main(turns):
+    before = await run("combined", combined_turn, turns)
+    after = await run("split", split_turn, turns)
+    print(f"turn latency: {after / before:.0%} of the combined call")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    if not llm_gateway.has_keys():
+        raise SystemExit("Set GEMINI_API_KEY (and GEMINI_BASE_URL for fake_llm.py) first")
+    asyncio.run(main(args.turns))
@@ -0,0 +1,55 @@
+# backend/bench_question_bank_memory.py
+# Memory per worker for the question banks: JSON-parsed dicts vs. the shared mmap'd question_bank.bin.
+# Starts N worker processes per mode, has each load the banks and serve a batch of final tests,
+# then reads RSS and PSS (shared pages split between the processes mapping them) from /proc.
+# Linux only. Build the compiled file first:
+#
+#   python build_question_bank.py && python bench_question_bank_memory.py --workers 4
+import os
+import argparse
+import multiprocessing as mp
+
+def memory_kib():
+    """(rss, pss) of the calling process in KiB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values["Rss:"], values["Pss:"]
+
+def worker(mode, tests, barrier, results):
+    if mode == "json":
+        os.environ["QUESTION_BANK_FILE"] = os.devnull + ".missing"
+    import question_bank  # imported after the env var so COMPILED_PATH picks it up
+    base_rss, base_pss = memory_kib()
+    question_bank.load_all()
+    for _ in range(tests):
+        for bank in question_bank.banks.values():
+            bank.sample_balanced(20)
+    barrier.wait()  # all workers alive at once, so shared pages are split between them
+    rss, pss = memory_kib()
+    results.put((rss - base_rss, pss - base_pss))
+    barrier.wait()
+
+def measure(mode, workers, tests):
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, tests, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    samples = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    rss = sum(s[0] for s in samples) / workers
+    pss = sum(s[1] for s in samples) / workers
+    print(f"{mode:<9} +{rss:8.0f} KiB RSS  +{pss:8.0f} KiB PSS per worker  ({workers} workers)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tests", type=int, default=200, help="final tests each worker serves")
+    args = parser.parse_args()
+    measure("json", args.workers, args.tests)
+    measure("compiled", args.workers, args.tests)
@@ -0,0 +1,61 @@
+# backend/bench_sandbox_load.py
+# Load test for the sandbox queue: submits a burst of slow /run-code jobs and measures the latency
+# of other endpoints before and while they are queued. Also reports queue positions/waits from the
+# responses and how many submissions were refused with 429.
+# Start the API first (uvicorn main:app), then:
+#   python bench_sandbox_load.py --base http://127.0.0.1:8000 --jobs 50 --sleep 2
+import time
+import asyncio
+import argparse
+import httpx
+from percentiles import percentile
+
+PROBES = [("GET", "/health", None), ("POST", "/api/coding/level-status", {"user_id": 1, "difficulty": "easy"})]
+
+async def probe(client, stop, latencies):
+    """Hits the probe endpoints in turn until stopped, recording milliseconds per request."""
+    while not stop.is_set():
+        for method, path, body in PROBES:
+            start = time.perf_counter()
+            await client.request(method, path, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+async def run_job(client, sleep_seconds, results):
+    code = f"import time\ntime.sleep({sleep_seconds})\nprint('done')"
+    res = await client.post("/api/coding/run-code", json={"language": "python", "code": code, "input": ""})
+    results.append((res.status_code, res.headers.get("Retry-After"), res.json()))
+
+async def measure(client, seconds):
+    stop, latencies = asyncio.Event(), []
+    task = asyncio.create_task(probe(client, stop, latencies))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+    return latencies
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base, timeout=600) as client:
+        idle = await measure(client, 3)
+
+        stop, loaded, results = asyncio.Event(), [], []
+        prober = asyncio.create_task(probe(client, stop, loaded))
+        await asyncio.gather(*(run_job(client, args.sleep, results) for _ in range(args.jobs)))
+        stop.set()
+        await prober
+
+    for name, latencies in (("idle", idle), (f"{args.jobs} jobs queued", loaded)):
+        print(f"{name:>16}: other endpoints p50 {percentile(latencies, 50, 0.0):6.1f} ms  p99 {percentile(latencies, 99, 0.0):6.1f} ms  ({len(latencies)} requests)")
+    done = [body["queue"] for status, _, body in results if status == 200]
+    refused = [retry for status, retry, _ in results if status == 429]
+    if done:
+        print(f"completed {len(done)}: max position {max(q['position'] for q in done)}, "
+              f"wait p50 {percentile([q['wait_ms'] for q in done], 50)} ms, max {max(q['wait_ms'] for q in done)} ms")
+    print(f"refused with 429: {len(refused)}" + (f" (Retry-After {sorted(set(refused))})" if refused else ""))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--sleep", type=float, default=2.0, help="seconds each submitted program sleeps")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+# backend/bench_sandbox_pool.py
+# Per-run latency of "Run Code": a fresh container per run (the old path) vs. the warm pool
+# (docker exec in a pre-started container). Needs Docker and the *-runner images.
+# Live pool numbers are in GET /health/sandbox.
+#
+#   python bench_sandbox_pool.py --language python --runs 30
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import sandbox_pool
+from percentiles import percentile
+
+PROGRAMS = {
+    "python": "print(sum(int(x) for x in input().split()))",
+    "java": "public class MyClass { public static void main(String[] a) { java.util.Scanner s = new java.util.Scanner(System.in); System.out.println(s.nextInt() + s.nextInt()); } }",
+    "cpp": "#include <iostream>\nint main() { int a, b; std::cin >> a >> b; std::cout << a + b; }",
+}
+
+def cold_run(language, code, stdin):
+    source_file, compile_command, run_command = sandbox_pool.LANGUAGES[language]
+    command = f"{compile_command} && {run_command}" if compile_command else run_command
+    temp_dir = tempfile.mkdtemp(dir=sandbox_pool.SANDBOX_ROOT)
+    try:
+        with open(os.path.join(temp_dir, source_file), "w", encoding='utf-8') as f:
+            f.write(code)
+        with open(os.path.join(temp_dir, "input.txt"), "w", encoding='utf-8') as f:
+            f.write(stdin)
+        return sandbox_pool.get_client().containers.run(
+            image=f"{language}-runner", command=f"sh -c '{command} < input.txt'",
+            volumes={temp_dir: {'bind': '/app', 'mode': 'rw'}}, working_dir="/app", user="coder",
+            network_disabled=True, mem_limit="256m", cpuset_cpus="0", security_opt=["no-new-privileges"],
+            cap_drop=["ALL"], remove=True, stop_signal='SIGKILL',
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def timed(fn, runs):
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--language", default="python", choices=sorted(PROGRAMS))
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    os.makedirs(sandbox_pool.SANDBOX_ROOT, exist_ok=True)
+    code = PROGRAMS[args.language]
+    pool = sandbox_pool.pool_for(args.language)
+
+    pool.refill()  # warm before timing, as startup does
+    try:
+        results = {
+            "cold container": timed(lambda: cold_run(args.language, code, "2 3"), args.runs),
+            "warm pool": timed(lambda: pool.run(code, "2 3"), args.runs),
+        }
+    finally:
+        pool.shutdown()
+
+    for name, seconds in results.items():
+        print(f"{name:>15}: p50 {percentile(seconds, 50) * 1000:7.1f} ms   p95 {percentile(seconds, 95) * 1000:7.1f} ms")
+    print(f"pool: {pool.get_stats()}")
@@ -0,0 +1,61 @@
+# backend/bench_ws_latency.py
+# Measures GD websocket round-trip latency while the coding endpoints are under load.
+# Start the API first (uvicorn main:app), then:  python bench_ws_latency.py --base http://127.0.0.1:8000
+# Run it once on the old (blocking) build and once on the current one to compare p99.
+import time
+import json
+import asyncio
+import argparse
+import statistics
+import httpx
+import websockets
+from percentiles import percentile
+
+async def ws_client(ws_base: str, room: str, name: str, messages: int, latencies: list):
+    """Sends a message, waits for its own broadcast to come back, records the round trip."""
+    async with websockets.connect(f"{ws_base}/api/gd/ws/{room}/{name}") as ws:
+        for i in range(messages):
+            payload = f"{name}-{i}"
+            sent = time.perf_counter()
+            await ws.send(payload)
+            while True:
+                msg = json.loads(await ws.recv())
+                if msg.get("type") == "user_message" and msg.get("text") == payload:
+                    break
+            latencies.append((time.perf_counter() - sent) * 1000)
+            await asyncio.sleep(0.02)
+
+async def coding_load(base: str, stop: asyncio.Event, concurrency: int, counter: list):
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        async def hammer():
+            while not stop.is_set():
+                try:
+                    await client.post("/api/coding/level-status", json={"user_id": 1, "difficulty": "easy"})
+                    counter[0] += 1
+                except httpx.HTTPError:
+                    counter[1] += 1
+        await asyncio.gather(*(hammer() for _ in range(concurrency)))
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--ws-clients", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--load", type=int, default=50, help="concurrent coding requests")
+    args = parser.parse_args()
+    ws_base = args.base.replace("http", "ws", 1)
+
+    for label, load in (("idle", 0), ("under coding load", args.load)):
+        latencies, counter, stop = [], [0, 0], asyncio.Event()
+        loader = asyncio.create_task(coding_load(args.base, stop, load, counter)) if load else None
+        await asyncio.gather(*(
+            ws_client(ws_base, f"bench-{label[:4]}", f"u{i}", args.messages, latencies)
+            for i in range(args.ws_clients)
+        ))
+        stop.set()
+        if loader: await loader
+        print(f"[{label}] ws round trips={len(latencies)}  p50={statistics.median(latencies):.1f}ms  "
+              f"p99={percentile(latencies, 99, 0.0):.1f}ms  coding reqs ok={counter[0]} failed={counter[1]}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 # backend/build_logical.py
 import os, json, asyncio, re, ast
-from google import genai
+import llm_gateway
+from llm_scheduler import wait_for_api_headroom
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -61,9 +62,6 @@ def save_to_dataset(new_qs):
     print(f"📙 LOGICAL DB Updated! Added: {unique_added} | Total: {len(existing)}")
 
 async def main():
-    api_key = os.getenv("GEMINI_API_KEY_LOGICAL") or os.getenv("GEMINI_API_KEY")
-    client = genai.Client(api_key=api_key)
-    
     runs = ["easy", "easy", "medium", "medium", "medium", "hard", "hard", "hard", "hard", "hard"]
     
     print(f"🚀 Starting {MODULE_NAME} Miner...")
@@ -71,7 +69,9 @@ async def main():
         for diff in runs:
             print(f"Mining 10 {diff} {MODULE_NAME} Qs...")
             try:
-                res = await client.aio.models.generate_content(model="gemini-2.5-flash", contents=generate_prompt(diff))
+                # Background priority: bills GEMINI_API_KEY_LOGICAL first, yields to live traffic
+                await wait_for_api_headroom()
+                res = await llm_gateway.generate("logical", generate_prompt(diff), models=("gemini-2.5-flash",), priority="background")
                 
                 # Check if Google's API cut off the output because it was too long
                 if res.candidates and res.candidates[0].finish_reason == 2:
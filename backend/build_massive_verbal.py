@@ -1,6 +1,7 @@
 # backend/build_verbal.py
 import os, json, asyncio, re, ast
-from google import genai
+import llm_gateway
+from llm_scheduler import wait_for_api_headroom
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -69,9 +70,6 @@ def save_to_dataset(new_qs):
     print(f"📗 VERBAL DB Updated! Added: {unique_added} | Total: {len(existing)}")
 
 async def main():
-    api_key = os.getenv("GEMINI_API_KEY_VERBAL") or os.getenv("GEMINI_API_KEY")
-    client = genai.Client(api_key=api_key)
-    
     # 20% Easy, 30% Medium, 50% Hard runs
     runs = ["easy", "easy", "medium", "medium", "medium", "hard", "hard", "hard", "hard", "hard"]
     
@@ -80,7 +78,9 @@ async def main():
         for diff in runs:
             print(f"Mining 10 {diff} {MODULE_NAME} Qs...")
             try:
-                res = await client.aio.models.generate_content(model="gemini-2.5-flash", contents=generate_prompt(diff))
+                # Background priority: bills GEMINI_API_KEY_VERBAL first, yields to live traffic
+                await wait_for_api_headroom()
+                res = await llm_gateway.generate("verbal", generate_prompt(diff), models=("gemini-2.5-flash",), priority="background")
                 match = re.search(r'\[\s*\{.*?\}\s*\]', res.text or "", re.DOTALL)
                 if match:
                     clean_json = match.group(0)
@@ -0,0 +1,78 @@
+# backend/build_question_bank.py
+# Compiles the *_dataset.json banks into question_bank.bin (format in question_bank.py).
+# Run it after the build_massive_* miners; until then the API keeps serving the changed
+# datasets straight from JSON.
+#
+#   python build_question_bank.py [--out question_bank.bin]
+import os
+import json
+import argparse
+from question_bank import (
+    BASE_DIR, DATASETS, COMPILED_PATH, DIFFICULTY_MIX,
+    MAGIC, VERSION, HEADER, FIELDS, JSON_FIELDS, RECORD,
+)
+
+class StringHeap:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, value: str):
+        """(offset, length) of value, storing each distinct string once."""
+        if value not in self.offsets:
+            encoded = value.encode("utf-8")
+            self.offsets[value] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self.offsets[value]
+
+def encode_field(name, question):
+    value = question.get(name)
+    if name in JSON_FIELDS:
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else str(value)
+
+def build(out_path):
+    heap, records, manifest = StringHeap(), bytearray(), {"banks": {}}
+    order = {difficulty: i for i, (difficulty, _) in enumerate(DIFFICULTY_MIX)}
+    count = 0
+    for name, filename in DATASETS.items():
+        path = os.path.join(BASE_DIR, filename)
+        if not os.path.exists(path):
+            print(f"⚠️ {filename} not found, skipping")
+            continue
+        source_mtime = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+        # Group by difficulty so each bucket is a contiguous range of records
+        questions.sort(key=lambda q: order.get(q.get("difficulty"), len(order)))
+        entry = {"source_mtime": source_mtime, "start": count, "end": count + len(questions), "buckets": {}}
+        for q in questions:
+            refs = []
+            for field in FIELDS:
+                refs.extend(heap.add(encode_field(field, q)))
+            records += RECORD.pack(*refs)
+            difficulty = q.get("difficulty")
+            if difficulty in order:
+                span = entry["buckets"].setdefault(difficulty, [count, count])
+                span[1] = count + 1
+            count += 1
+        manifest["banks"][name] = entry
+        print(f"✅ {name}: {len(questions)} questions")
+
+    manifest_bytes = json.dumps(manifest).encode("utf-8")
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        f.write(records)
+        f.write(heap.data)
+    # Atomic swap: workers that still map the old file keep a valid view of it
+    os.replace(tmp_path, out_path)
+    size = HEADER.size + len(manifest_bytes) + len(records) + len(heap.data)
+    print(f"📦 Wrote {out_path}: {count} questions, {size / 1024:.0f} KiB ({len(heap.data) / 1024:.0f} KiB string heap)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=COMPILED_PATH)
+    args = parser.parse_args()
+    build(args.out)
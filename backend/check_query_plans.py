@@ -0,0 +1,153 @@
+# backend/check_query_plans.py
+# Query-plan regression check: runs EXPLAIN on every hot query and fails if MySQL would
+# fall back to a full table scan. Point DB_NAME at a scratch database, then:
+#
+#   python check_query_plans.py --seed     -> migrate, insert synthetic rows, check plans
+#   python check_query_plans.py            -> check plans against whatever data is there
+#
+# Exits 1 on any regression so it can gate CI. The repo has no test suite, so this script is the
+# query-plan test: it needs a real MySQL (EXPLAIN output), and HOT_QUERIES must be kept in sync
+# with the routes by hand.
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+from database import engine
+from migrations import run_migrations
+
+U, S = 1, 1  # sample user_id / session_id used as query parameters
+
+# (name, sql, params) -- keep in sync with the routes they come from
+HOT_QUERIES = [
+    ("login", "SELECT * FROM users WHERE email=%s", ("user1@example.com",)),
+    ("verify_otp", """
+        SELECT pr.*, u.id as user_id FROM password_resets pr
+        JOIN users u ON pr.user_id = u.id
+        WHERE u.email=%s AND pr.otp=%s AND pr.expires_at > NOW()
+        ORDER BY pr.id DESC LIMIT 1
+    """, ("user1@example.com", "123456")),
+    ("mode_status", "SELECT id FROM test_attempts WHERE user_id=%s AND topic=%s AND mode=%s AND score>=%s LIMIT 1",
+        (U, "Percentages", "easy", 15)),
+    ("best_score", "SELECT MAX(score) as best_score FROM test_attempts WHERE user_id=%s AND topic=%s AND mode=%s",
+        (U, "Percentages", "easy")),
+    ("level_status", "SELECT COUNT(DISTINCT problem_title) as solved_count FROM coding_attempts WHERE user_id = %s AND difficulty = %s AND is_correct = TRUE",
+        (U, "easy")),
+    ("solved_titles", "SELECT DISTINCT problem_title FROM coding_attempts WHERE user_id = %s AND difficulty = %s AND is_correct = TRUE",
+        (U, "easy")),
+    ("gamification_xp", "SELECT total_xp, active_days FROM user_xp WHERE user_id = %s", (U,)),
+    ("interviews_taken", "SELECT COUNT(*) as c FROM interview_sessions WHERE user_id=%s", (U,)),
+    ("gds_taken", "SELECT COUNT(*) as c FROM gd_participants WHERE user_id=%s", (U,)),
+    ("finished_interviews", """
+        SELECT id, interview_type, job_role, overall_score, start_time as created_at
+        FROM interview_sessions WHERE user_id=%s AND end_time IS NOT NULL ORDER BY start_time DESC, id DESC LIMIT 21
+    """, (U,)),
+    ("tests_history_page", """
+        SELECT id, topic, mode, score, total, created_at FROM test_attempts WHERE user_id=%s
+        AND (created_at < %s OR (created_at = %s AND id < %s)) ORDER BY created_at DESC, id DESC LIMIT 21
+    """, (U, datetime(2030, 1, 1), datetime(2030, 1, 1), 10**9)),
+    ("summary_tests", "SELECT COUNT(*) AS tests_taken, AVG(score) AS avg_test_score FROM test_attempts WHERE user_id=%s", (U,)),
+    ("coding_history_page", """
+        SELECT id, problem_title, difficulty, is_correct, created_at FROM coding_attempts WHERE user_id=%s
+        ORDER BY created_at DESC, id DESC LIMIT 21
+    """, (U,)),
+    ("category_board", """
+        SELECT u.id, c.xp FROM user_category_xp c JOIN users u ON u.id = c.user_id
+        WHERE c.category = %s AND c.xp > 0 ORDER BY c.xp DESC, c.user_id ASC LIMIT 50
+    """, ("coding",)),
+    ("gd_room_size", "SELECT COUNT(*) as count FROM gd_participants WHERE session_id = %s", (S,)),
+    ("mcq_pool_draw", """
+        SELECT p.id, p.question, p.options, p.answer, p.explanation FROM mcq_pool p
+        LEFT JOIN mcq_seen s ON s.question_id = p.id AND s.user_id = %s
+        WHERE p.topic = %s AND p.difficulty = %s ORDER BY s.question_id IS NOT NULL, RAND() LIMIT 20
+    """, (U, "Percentages", "easy")),
+    ("last_interview_turn", "SELECT * FROM interview_turns WHERE session_id = %s ORDER BY turn_number DESC LIMIT 1", (S,)),
+]
+
+def full_scans(cursor, sql, params):
+    """Real tables (not derived/temporary ones) that EXPLAIN says will be scanned in full."""
+    cursor.execute("EXPLAIN " + sql, params)
+    return [
+        row["table"] for row in cursor.fetchall()
+        if row.get("type") == "ALL" and row.get("table") and not row["table"].startswith("<")
+    ]
+
+def seed(cursor, users=2000):
+    """Synthetic data big enough that the optimizer prefers indexes over scanning tiny tables."""
+    rnd = random.Random(42)
+    now = datetime.now()
+    topics = ["Percentages", "Number System", "Grammar", "Java Programming", "Operating Systems"]
+    cursor.executemany(
+        "INSERT IGNORE INTO users (fname, lname, email, year, field, password) VALUES (%s, %s, %s, %s, %s, %s)",
+        [("Seed", str(i), f"user{i}@example.com", 3, "CSE", "x") for i in range(1, users + 1)],
+    )
+    cursor.executemany(
+        "INSERT INTO test_attempts (user_id, topic, mode, score, total, created_at) VALUES (%s, %s, %s, %s, 20, %s)",
+        [(rnd.randint(1, users), rnd.choice(topics), rnd.choice(["easy", "moderate", "hard"]), rnd.randint(0, 20),
+          now - timedelta(minutes=rnd.randint(0, 100000))) for _ in range(users * 10)],
+    )
+    cursor.executemany(
+        "INSERT IGNORE INTO coding_attempts (user_id, problem_title, difficulty, is_correct) VALUES (%s, %s, %s, %s)",
+        [(rnd.randint(1, users), f"Problem {rnd.randint(1, 300)}", rnd.choice(["easy", "medium", "hard"]), rnd.random() < 0.7)
+         for _ in range(users * 5)],
+    )
+    cursor.executemany(
+        "INSERT INTO interview_sessions (user_id, job_role, interview_type, start_time, end_time, overall_score) VALUES (%s, 'SDE', 'HR', %s, %s, %s)",
+        [(rnd.randint(1, users), now, now if rnd.random() < 0.8 else None, rnd.randint(0, 10)) for _ in range(users * 2)],
+    )
+    cursor.executemany(
+        "INSERT INTO interview_turns (session_id, question_text, turn_number) VALUES (%s, 'Q', %s)",
+        [(rnd.randint(1, users * 2), rnd.randint(1, 10)) for _ in range(users * 10)],
+    )
+    cursor.executemany(
+        "INSERT INTO gd_sessions (host_id, host_name, scheduled_time, topic, status) VALUES (%s, 'Seed', %s, 'AI', %s)",
+        [(rnd.randint(1, users), now, rnd.choice(["scheduled", "active", "completed"])) for _ in range(users // 2)],
+    )
+    cursor.executemany(
+        "INSERT IGNORE INTO gd_participants (session_id, user_id, user_name) VALUES (%s, %s, 'Seed')",
+        [(rnd.randint(1, users // 2), rnd.randint(1, users)) for _ in range(users * 2)],
+    )
+    cursor.executemany(
+        "INSERT IGNORE INTO mcq_pool (topic, difficulty, question_hash, question, options, answer) VALUES (%s, %s, %s, 'Q', '[]', 'A')",
+        [(rnd.choice(topics), rnd.choice(["easy", "moderate", "hard"]), f"{i:040x}") for i in range(users * 2)],
+    )
+    cursor.executemany(
+        "INSERT IGNORE INTO mcq_seen (user_id, question_id) VALUES (%s, %s)",
+        [(rnd.randint(1, users), rnd.randint(1, users * 2)) for _ in range(users * 5)],
+    )
+    cursor.executemany(
+        "INSERT INTO password_resets (user_id, otp, expires_at) VALUES (%s, %s, %s)",
+        [(rnd.randint(1, users), f"{rnd.randint(0, 999999):06}", now) for _ in range(users)],
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true", help="insert synthetic rows first (scratch DBs only!)")
+    args = parser.parse_args()
+
+    conn = engine.raw_connection()
+    try:
+        run_migrations(conn)
+        cursor = conn.cursor(dictionary=True)
+        if args.seed:
+            import xp_ledger
+            seed(cursor)
+            xp_ledger.rebuild(cursor)
+            conn.commit()
+        for table in ["users", "test_attempts", "coding_attempts", "interview_sessions", "interview_turns",
+                      "gd_sessions", "gd_participants", "password_resets", "user_xp", "user_category_xp",
+                      "mcq_pool", "mcq_seen"]:
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+
+        failures = 0
+        for name, sql, params in HOT_QUERIES:
+            scanned = full_scans(cursor, sql, params)
+            if scanned:
+                failures += 1
+                print(f"❌ {name}: full scan on {', '.join(scanned)}")
+            else:
+                print(f"✅ {name}")
+        print(f"{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use an index.")
+        sys.exit(1 if failures else 0)
+    finally:
+        conn.close()
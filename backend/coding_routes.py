@@ -1,16 +1,17 @@
 # backend/coding_routes.py
-import os
 import re
 import json
-import uuid
-import shutil
-import asyncio
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
-from google import genai 
+import llm_gateway
 from pydantic import BaseModel
 import docker
-from database import get_cursor
+import sandbox_pool
+import sandbox_executor
+from database import get_async_cursor
+import xp_ledger
+from leaderboard_index import leaderboard
+import singleflight
 
 router = APIRouter(prefix="/api/coding", tags=["Coding"])
 
@@ -100,85 +101,33 @@ def create_evaluation_prompt(problem: dict, code: str, language: str) -> str:
     }}
     """
 
-def run_in_sandbox(language: str, code: str, stdin: str) -> str:
-    temp_dir = f"../temp_code/{uuid.uuid4()}"
-    os.makedirs(temp_dir, exist_ok=True)
-
-    file_map = {
-        "python": "script.py",
-        "java": "MyClass.java",
-        "cpp": "script.cpp"
-    }
-    command_map = {
-        "python": "python script.py",
-        "java": "javac MyClass.java && java MyClass",
-        "cpp": "g++ script.cpp -o script && ./script"
-    }
-    
-    file_name = file_map.get(language, "script.py")
-    command = command_map.get(language, "python script.py")
-    
+def run_in_sandbox(language: str, code: str, stdin: str):
+    """Returns (output, run info). Output is stdout, or stderr / compiler errors if the run failed."""
+    # Runs in a warm container from sandbox_pool (docker exec) instead of starting one per run
     if language == 'java':
         if 'public class' in code and 'public class MyClass' not in code:
             code = re.sub(r'public class \w+', 'public class MyClass', code, 1)
         elif 'public class' not in code:
             code = f'public class MyClass {{ public static void main(String[] args) {{ {code} }} }}'
 
-    code_file_path = os.path.join(temp_dir, file_name)
-    input_file_path = os.path.join(temp_dir, "input.txt")
-
+    image_name = f"{language}-runner"
+    run = None
     try:
-        # 1. Initialize Docker Client
-        client = None
-        try:
-            client = docker.from_env()
-            client.ping()
-        except Exception:
-            try:
-                # Force Windows named pipe connection if default fails
-                client = docker.DockerClient(base_url='npipe:////./pipe/docker_engine')
-                client.ping()
-            except Exception as e:
-                return f"System Error: Docker Desktop is not running. Please start it. (Error: {str(e)})"
-
-        # 2. Prepare Files
-        with open(code_file_path, "w", encoding='utf-8') as f:
-            f.write(code)
-        with open(input_file_path, "w", encoding='utf-8') as f:
-            f.write(stdin)
-
-        image_name = f"{language}-runner"
-        mount_mode = 'rw' if language in ['java', 'cpp'] else 'ro'
-        
-        # 3. Run Container
-        container = client.containers.run(
-            image=image_name,
-            command=f"sh -c '{command} < input.txt'",
-            volumes={os.path.abspath(temp_dir): {'bind': '/app', 'mode': mount_mode}},
-            working_dir="/app",
-            user="coder",
-            network_disabled=True,
-            mem_limit="256m",
-            cpuset_cpus="0",
-            security_opt=["no-new-privileges"],
-            cap_drop=["ALL"],
-            remove=True,
-            detach=False,
-            stop_signal='SIGKILL'
-        )
-        output = container.decode('utf-8')
-
-    except docker.errors.ContainerError as e:
-        output = e.stderr.decode('utf-8')
+        run = sandbox_pool.pool_for(language).run(code, stdin)
+        stdout, stderr = run.pop("stdout"), run.pop("stderr")
+        output = (stdout if run["exit_code"] == 0 else stderr or stdout).decode('utf-8', errors='replace')
+        if run["truncated"]:
+            output += f"\n... [output truncated at {sandbox_pool.SANDBOX_OUTPUT_BYTES} bytes]"
+    except sandbox_pool.SandboxUnavailable as e:
+        output = f"System Error: Docker Desktop is not running. Please start it. (Error: {str(e)})"
     except docker.errors.ImageNotFound:
         output = f"Execution environment '{image_name}' not found. Run 'docker build -t {image_name} ...' in backend folder."
     except Exception as e:
+        if isinstance(e, (docker.errors.APIError, ConnectionError)):
+            sandbox_pool.reset_client()  # Docker may have restarted; reconnect on the next run
         output = f"An unexpected execution error occurred: {str(e)}"
-    finally:
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        
-    return output
+
+    return output, run
 
 def clean_and_parse_json(text: str):
     text = re.sub(r'```json\s*', '', text, flags=re.IGNORECASE)
@@ -193,106 +142,82 @@ def clean_and_parse_json(text: str):
         except:
             raise HTTPException(status_code=500, detail=f"Failed to parse AI response: {str(e)}")
 
+async def generate_problem_batch(difficulty: str, count: int, solved_titles: List[str]):
+    prompt = create_batch_problem_prompt(difficulty, count, solved_titles)
+    # Retries (with backoff), model fallback and the circuit breaker live in llm_gateway
+    response = await llm_gateway.generate("coding", prompt)
+    
+    data = clean_and_parse_json(response.text)
+    
+    problems_list = []
+    if isinstance(data, dict):
+        problems_list = data.get("problems", [])
+    elif isinstance(data, list):
+        problems_list = data
+
+    if not problems_list or not isinstance(problems_list, list):
+         raise HTTPException(status_code=500, detail="AI generated invalid structure (not a list or missing 'problems' key).")
+    return problems_list
+
 # --- API Routes ---
 
 @router.post("/run-code")
 async def run_user_code(req: RunRequest):
     try:
-        output = run_in_sandbox(req.language, req.code, req.input)
-        return {"output": output}
+        # Queued on the language's sandbox workers; the event loop stays free while it runs
+        (output, run), queue = await sandbox_executor.submit(req.language, run_in_sandbox, req.language, req.code, req.input)
+        return {"output": output, "run": run, "queue": queue}
+    except sandbox_executor.QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"{e} Please retry in {e.retry_after}s.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-level-problems")
-async def generate_level_problems(req: LevelProblemRequest, db_cursor: tuple = Depends(get_cursor)):
+async def generate_level_problems(req: LevelProblemRequest, db_cursor: tuple = Depends(get_async_cursor)):
     cursor, db = db_cursor
     try:
-        api_key = os.getenv("GEMINI_API_KEY_TECHNICAL")
-        if not api_key:
+        if not llm_gateway.has_keys():
             raise HTTPException(status_code=500, detail="Missing API Key for Technical/Coding.")
 
-        client = genai.Client(api_key=api_key)
-        
-        cursor.execute(
+        await cursor.execute(
             "SELECT DISTINCT problem_title FROM coding_attempts WHERE user_id = %s AND difficulty = %s AND is_correct = TRUE",
             (req.user_id, req.difficulty)
         )
-        solved_problems = cursor.fetchall()
+        solved_problems = await cursor.fetchall()
         solved_titles = [item['problem_title'] for item in solved_problems]
 
-        prompt = create_batch_problem_prompt(req.difficulty, req.count, solved_titles)
-        
-        # --- ADDED RETRY LOGIC FOR 503 ERRORS ---
-        max_retries = 3
-        response = None
-        
-        for attempt in range(max_retries):
-            try:
-                # You can change this to "gemini-1.5-flash" if 2.5 remains consistently overloaded
-                response = await client.aio.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt
-                )
-                break # Success, break out of the loop
-            except Exception as api_err:
-                if "503" in str(api_err) and attempt < max_retries - 1:
-                    print(f"⚠️ Gemini API overloaded (503). Retrying in 2 seconds... (Attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(2)
-                else:
-                    raise api_err # If it's not a 503, or we ran out of retries, crash normally.
-        
-        data = clean_and_parse_json(response.text)
-        
-        problems_list = []
-        if isinstance(data, dict):
-            problems_list = data.get("problems", [])
-        elif isinstance(data, list):
-            problems_list = data
-
-        if not problems_list or not isinstance(problems_list, list):
-             raise HTTPException(status_code=500, detail="AI generated invalid structure (not a list or missing 'problems' key).")
-
+        # Students at the same level with the same solved set get the same prompt: share one call
+        key = (req.difficulty.strip().lower(), req.count, tuple(sorted(solved_titles)))
+        problems_list = await singleflight.flight("coding_problems").do(
+            key, lambda: generate_problem_batch(req.difficulty, req.count, solved_titles)
+        )
         return {"problems": problems_list}
         
+    except llm_gateway.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Error generating level problems: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred while generating problems: {str(e)}")
 
 
 @router.post("/evaluate-code")
-async def evaluate_user_code(req: EvaluationRequest, db_cursor: tuple = Depends(get_cursor)):
+async def evaluate_user_code(req: EvaluationRequest, db_cursor: tuple = Depends(get_async_cursor)):
     cursor, db = db_cursor
     try:
-        api_key = os.getenv("GEMINI_API_KEY_TECHNICAL")
-        if not api_key:
+        if not llm_gateway.has_keys():
             raise HTTPException(status_code=500, detail="Missing API Key for Technical/Coding.")
 
-        client = genai.Client(api_key=api_key)
-
         prompt = create_evaluation_prompt(req.problem, req.code, req.language)
-        
-        # --- ADDED RETRY LOGIC FOR 503 ERRORS ---
-        max_retries = 3
-        response = None
-        
-        for attempt in range(max_retries):
-            try:
-                response = await client.aio.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt
-                )
-                break
-            except Exception as api_err:
-                if "503" in str(api_err) and attempt < max_retries - 1:
-                    print(f"⚠️ Gemini API overloaded (503). Retrying in 2 seconds... (Attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(2)
-                else:
-                    raise api_err
+        response = await llm_gateway.generate("coding", prompt)
         
         evaluation_data = clean_and_parse_json(response.text)
 
         if evaluation_data.get("is_correct"):
-            cursor.execute(
+            await cursor.execute(
                 """
                 INSERT INTO coding_attempts (user_id, problem_title, difficulty, is_correct)
                 VALUES (%s, %s, %s, %s)
@@ -300,22 +225,26 @@ async def evaluate_user_code(req: EvaluationRequest, db_cursor: tuple = Depends(
                 """,
                 (req.user_id, req.problem.get("title"), req.difficulty, True)
             )
-            db.commit()
+            xp_row = await xp_ledger.record_coding_solve_async(cursor, req.user_id, req.problem.get("title"), req.difficulty)
+            await db.commit()
+            leaderboard.publish(xp_row)
 
         return evaluation_data
+    except llm_gateway.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Error evaluating code: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred during evaluation: {str(e)}")
 
 @router.post("/level-status")
-async def get_level_status(req: LevelStatusRequest, db_cursor: tuple = Depends(get_cursor)):
+async def get_level_status(req: LevelStatusRequest, db_cursor: tuple = Depends(get_async_cursor)):
     cursor, db = db_cursor
     try:
-        cursor.execute(
+        await cursor.execute(
             "SELECT COUNT(DISTINCT problem_title) as solved_count FROM coding_attempts WHERE user_id = %s AND difficulty = %s AND is_correct = TRUE",
             (req.user_id, req.difficulty)
         )
-        result = cursor.fetchone()
+        result = await cursor.fetchone()
         return {"solved_count": result['solved_count'] if result else 0}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,177 @@
+# backend/compile_cache.py
+# Content-addressed cache of compiled C++/Java submissions. Students run the same program against
+# several example inputs, and compiling was most of each run. Entries are keyed by a hash of the
+# language, the runner image (toolchain) and the normalized source, and hold either the build
+# artifacts or the compiler errors, so a repeated failing submission answers without a container.
+# The cache directory is mounted read-only into the runners at /cache; it is not listable there
+# (mode 711), so a job can only reach entries whose source it already has. Least recently used
+# entries are evicted once the cache is over SANDBOX_COMPILE_CACHE_MB.
+#
+# Every uvicorn worker shares the directory. Before evicting, a worker rescans it, so the limit
+# covers all workers' entries. A job touches its entry (mtime) when it starts running from it, and
+# entries used within SANDBOX_COMPILE_CACHE_MIN_AGE_SECONDS are never evicted. That keeps one
+# worker from deleting a build another worker's job is executing. The in-process pins also cover
+# jobs that are still waiting for a CPU slot.
+import os
+import json
+import glob
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.path.abspath(os.getenv("SANDBOX_COMPILE_CACHE_DIR", "../compile_cache"))
+CACHE_LIMIT_BYTES = int(os.getenv("SANDBOX_COMPILE_CACHE_MB", "512")) * 1024 * 1024
+# Must exceed the longest run from a cached build (SANDBOX_WALL_SECONDS plus the kill grace)
+EVICT_MIN_AGE_SECONDS = float(os.getenv("SANDBOX_COMPILE_CACHE_MIN_AGE_SECONDS", "60"))
+META_FILE = "meta.json"
+
+_lock = threading.Lock()
+_index = None  # key -> size in bytes, least recently used first
+_pins = {}  # key -> jobs currently running from the entry (never evicted)
+stats = {"hits": 0, "error_hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+def normalize(source):
+    """Line endings and trailing whitespace do not change what the compiler produces."""
+    lines = [line.rstrip() for line in source.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return "\n".join(lines).strip("\n") + "\n"
+
+def cache_key(language, toolchain, source):
+    digest = hashlib.sha256()
+    for part in (language, toolchain, normalize(source)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def entry_dir(key):
+    return os.path.join(CACHE_DIR, key)
+
+def _size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def _scan():
+    """key -> (last used, size) for every complete entry on disk."""
+    entries = {}
+    for key in os.listdir(CACHE_DIR):
+        path = entry_dir(key)
+        try:
+            if os.path.isfile(os.path.join(path, META_FILE)):
+                entries[key] = (os.path.getmtime(path), _size(path))
+        except OSError:
+            pass  # evicted while we looked
+    return entries
+
+def _reindex(entries):
+    global _index
+    _index = OrderedDict((key, size) for key, (_, size) in sorted(entries.items(), key=lambda e: e[1][0]))
+
+def _load_index():
+    """Scans the cache directory once per process, oldest entries first."""
+    if _index is not None:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    os.chmod(CACHE_DIR, 0o711)
+    for key in os.listdir(CACHE_DIR):
+        if not key.startswith(".") and not os.path.isfile(os.path.join(entry_dir(key), META_FILE)):
+            shutil.rmtree(entry_dir(key), ignore_errors=True)  # half-written or foreign
+    _reindex(_scan())
+
+# --- Lookup ---
+def lookup(key, pin=False):
+    """The entry's metadata ({"ok": True} or {"ok": False, "errors": ...}), or None on a miss.
+    With `pin`, a successful build is protected from eviction until unpin(key)."""
+    with _lock:
+        _load_index()
+        if key not in _index and not os.path.isfile(os.path.join(entry_dir(key), META_FILE)):
+            stats["misses"] += 1
+            return None
+        try:
+            with open(os.path.join(entry_dir(key), META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(entry_dir(key))  # recency survives restarts
+        except (OSError, ValueError):
+            _index.pop(key, None)  # evicted by another worker
+            stats["misses"] += 1
+            return None
+        # Move to the most recent end; the entry may have been stored by another worker
+        _index[key] = _index.pop(key, None) or _size(entry_dir(key))
+        stats["hits" if meta["ok"] else "error_hits"] += 1
+        if pin and meta["ok"]:
+            _pins[key] = _pins.get(key, 0) + 1
+        return meta
+
+def touch(key):
+    """A job is about to run from the entry: marks it in use for every worker. False if it is gone."""
+    try:
+        os.utime(entry_dir(key))
+        return True
+    except OSError:
+        return False  # another worker evicted it while the job waited for a CPU slot
+
+def unpin(key):
+    with _lock:
+        _pins[key] -= 1
+        if not _pins[key]:
+            del _pins[key]
+
+# --- Store ---
+def store(key, artifacts=(), errors=None):
+    """Caches build artifacts (host paths) or, with `errors`, a failed compile. Never raises."""
+    staging = os.path.join(CACHE_DIR, f".{uuid.uuid4().hex}")
+    try:
+        with _lock:
+            _load_index()
+        os.makedirs(staging)
+        for path in artifacts:
+            shutil.copy2(path, staging)
+        with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"ok": errors is None, "errors": errors, "created": time.time()}, f)
+        os.chmod(staging, 0o755)
+        size = _size(staging)
+        try:
+            os.rename(staging, entry_dir(key))  # atomic; readers never see a partial entry
+        except OSError:
+            # Another job (maybe in another worker) stored the same key first
+            if os.path.isfile(os.path.join(entry_dir(key), META_FILE)):
+                with _lock:
+                    _index.setdefault(key, _size(entry_dir(key)))
+            return
+        with _lock:
+            _index[key] = size
+            stats["stored"] += 1
+            _evict()
+    except Exception as e:
+        print(f"⚠️ Could not cache compile output {key[:12]}: {e}")
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+def collect(job_dir, patterns):
+    """Artifact paths in the job directory matching the language's patterns."""
+    return [path for pattern in patterns for path in glob.glob(os.path.join(job_dir, pattern))]
+
+def _evict():
+    """Drops least recently used entries until the whole directory is under the limit. Caller holds _lock."""
+    entries = _scan()  # includes what other workers stored since we last looked
+    _reindex(entries)
+    total = sum(_index.values())
+    recent = time.time() - EVICT_MIN_AGE_SECONDS
+    for key in list(_index):
+        if total <= CACHE_LIMIT_BYTES:
+            return
+        if key in _pins or entries[key][0] > recent:
+            continue  # may be running right now, here or in another worker
+        total -= _index.pop(key)
+        shutil.rmtree(entry_dir(key), ignore_errors=True)
+        stats["evicted"] += 1
+
+def get_stats():
+    with _lock:
+        lookups = stats["hits"] + stats["error_hits"] + stats["misses"]
+        return {
+            **stats,
+            "entries": len(_index or ()),
+            "bytes": sum((_index or {}).values()),
+            "hit_rate": round((stats["hits"] + stats["error_hits"]) / lookups, 3) if lookups else None,
+        }
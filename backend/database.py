@@ -1,11 +1,18 @@
 # backend/database.py
 import os
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+import aiomysql
 import mysql.connector
 from fastapi import Depends
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 
@@ -15,6 +22,15 @@ DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_NAME = os.getenv("DB_NAME", "placify")
 
+# Pool sizing. Keep (DB_POOL_SIZE + DB_MAX_OVERFLOW) * workers below MySQL's max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))      # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # max connection age in seconds
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # drop connections idle longer than this
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "2"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "10"))
+
 # 1. Config for Legacy (mysql.connector)
 db_config = {
     "host": DB_HOST,
@@ -26,8 +42,124 @@ db_config = {
 # 2. Config for SQLAlchemy
 SQLALCHEMY_DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-# --- SQLAlchemy Setup (For Interview Module) ---
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# --- Pool Monitoring ---
+class PoolStats:
+    """Thread-safe counters for connection checkouts across all worker threads."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.recycled_idle = 0
+
+    def begin_wait(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._latencies.append(seconds * 1000)
+
+    def note_idle_recycle(self):
+        with self._lock:
+            self.recycled_idle += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waiting, checkouts, timeouts, recycled = self.waiting, self.checkouts, self.timeouts, self.recycled_idle
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return {
+            "waiting": waiting,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "recycled_idle": recycled,
+            "checkout_ms_avg": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "checkout_ms_p95": round(p95, 3),
+            "checkout_ms_max": round(latencies[-1], 3) if latencies else 0.0,
+        }
+
+pool_stats = PoolStats()
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that records how many callers are waiting and how long a checkout takes."""
+
+    def _do_get(self):
+        pool_stats.begin_wait()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.end_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            pool_stats.end_wait(time.perf_counter() - start)
+            raise
+        pool_stats.end_wait(time.perf_counter() - start)
+        return conn
+
+# --- Shared Engine (Raw cursors AND the Interview ORM use this single pool) ---
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=MonitoredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,  # validates each connection on checkout, reconnects if MySQL dropped it
+)
+
+@event.listens_for(engine, "checkin")
+def _mark_idle(dbapi_connection, connection_record):
+    connection_record.info["idle_since"] = time.monotonic()
+
+@event.listens_for(engine, "checkout")
+def _drop_stale_idle(dbapi_connection, connection_record, connection_proxy):
+    idle_since = connection_record.info.pop("idle_since", None)
+    if idle_since is not None and time.monotonic() - idle_since > DB_POOL_IDLE_TIMEOUT:
+        pool_stats.note_idle_recycle()
+        # Tells the pool to discard this connection and hand out a fresh one.
+        raise exc.DisconnectionError("Connection idle for too long")
+
+def get_pool_stats() -> dict:
+    """Live view of the shared pool (and the async pool, once opened) for the /health/db endpoint."""
+    pool = engine.pool
+    stats = {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **pool_stats.snapshot(),
+    }
+    if _async_pool is not None:
+        stats["async"] = {
+            "size": _async_pool.size,
+            "in_use": _async_pool.size - _async_pool.freesize,
+            "idle": _async_pool.freesize,
+            "max_size": _async_pool.maxsize,
+        }
+    return stats
+
+def warm_pool():
+    """Opens DB_POOL_SIZE connections up front so the first requests skip the TCP+auth handshake."""
+    conns = []
+    try:
+        for _ in range(DB_POOL_SIZE):
+            conns.append(engine.raw_connection())
+    except Exception as e:
+        print(f"⚠️ Could not pre-warm DB pool ({len(conns)}/{DB_POOL_SIZE} opened): {e}")
+    finally:
+        for conn in conns:
+            conn.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -39,16 +171,25 @@ def get_session():
     finally:
         db.close()
 
+@contextmanager
+def session_cursor(db):
+    """Raw dictionary cursor on the ORM session's own connection, so raw SQL joins its transaction.
+    Closed when the block exits; the connection stays with the session."""
+    cursor = db.connection().connection.cursor(dictionary=True)
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+
 # --- Legacy Setup (For Existing Routes) ---
 def get_db():
-    """Dependency for Raw MySQL Connections"""
-    db = None
+    """Dependency for Raw MySQL Connections (checked out from the shared pool)"""
+    db = engine.raw_connection()
     try:
-        db = mysql.connector.connect(**db_config)
         yield db
     finally:
-        if db:
-            db.close()
+        # Returns the connection to the pool; uncommitted work is rolled back.
+        db.close()
 
 def get_cursor(db: mysql.connector.MySQLConnection = Depends(get_db)):
     """Dependency for Raw Cursors"""
@@ -58,4 +199,51 @@ def get_cursor(db: mysql.connector.MySQLConnection = Depends(get_db)):
         yield cursor, db
     finally:
         if cursor:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
+
+# --- Async Setup (For async def routes; never blocks the event loop) ---
+_async_pool = None
+_async_pool_lock = asyncio.Lock()
+
+async def get_async_pool():
+    """Lazily creates the aiomysql pool on the running event loop."""
+    global _async_pool
+    if _async_pool is None:
+        async with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = await aiomysql.create_pool(
+                    host=DB_HOST,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    db=DB_NAME,
+                    minsize=ASYNC_DB_POOL_MIN,
+                    maxsize=ASYNC_DB_POOL_MAX,
+                    pool_recycle=DB_POOL_IDLE_TIMEOUT,  # aiomysql recycles on idle time
+                    autocommit=False,
+                )
+    return _async_pool
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
+
+async def get_async_db():
+    """Dependency for async MySQL Connections"""
+    pool = await get_async_pool()
+    async with pool.acquire() as db:
+        try:
+            yield db
+        finally:
+            # Ends the implicit read transaction so aiomysql keeps the connection in the pool.
+            await db.rollback()
+
+async def get_async_cursor(db: aiomysql.Connection = Depends(get_async_db)):
+    """Dependency for async Cursors, mirrors get_cursor: yields (cursor, db)"""
+    cursor = await db.cursor(aiomysql.DictCursor)
+    try:
+        yield cursor, db
+    finally:
+        await cursor.close()
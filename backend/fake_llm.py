@@ -0,0 +1,169 @@
+# backend/fake_llm.py
+# Local stand-in for the Gemini REST API, for load tests and for exercising llm_gateway.py
+# (retries, fallback, circuit breaker) without spending quota. Point the app at it with
+#
+#   python fake_llm.py --port 8808 --latency 0.8 --error-rate 0.1
+#   GEMINI_BASE_URL=http://127.0.0.1:8808 GEMINI_API_KEY=fake uvicorn main:app
+#
+# Replies are canned but shaped like what each route's prompt asks for.
+import re
+import json
+import random
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+app = FastAPI(title="Fake Gemini")
+settings = {"latency": 0.5, "jitter": 0.2, "error_rate": 0.0, "rate_limit_rate": 0.0, "down": False,
+            "chunk_chars": 24, "chunk_delay": 0.05}  # latency = time to first chunk; each further chunk adds chunk_delay
+stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+# --- Canned replies ---
+def mcqs(count, topic, difficulty):
+    return [
+        {
+            "module": "General", "topic": topic, "difficulty": difficulty,
+            "question": f"[{topic}] Sample question {i + 1} #{random.randint(1000, 9999)}?",
+            "options": ["A. One", "B. Two", "C. Three", "D. Four"],
+            "answer": "A. One",
+            "explanation": "Standard Method: ... \n\n⚡ SHORTCUT: ...",
+        }
+        for i in range(count)
+    ]
+
+def coding_problems(count):
+    return {"problems": [
+        {
+            "title": f"Sample Problem {random.randint(1000, 9999)}",
+            "description": "Read n numbers and print their sum.",
+            "input_format": "n, then n integers", "output_format": "The sum",
+            "constraints": ["1 <= n <= 10^5"],
+            "examples": [{"input": "3\n1 2 3", "output": "6", "explanation": "1 + 2 + 3"}],
+        }
+        for _ in range(count)
+    ]}
+
+EVALUATION = {
+    "feedback": "Good structure, but add a concrete example with measurable impact and mention the trade-offs you weighed.",
+    "ideal_answer": "Situation: a slow checkout API. Task: cut p95 latency. Action: profiled, added caching and batched queries. "
+                    "Result: p95 dropped from 900ms to 250ms. Trade-off: cache invalidation complexity, handled with short TTLs.",
+}
+
+def reply_for(prompt: str) -> str:
+    if m := re.search(r"Generate exactly (\d+) multiple choice questions.*?topic: (.+?)\.\n", prompt, re.S):
+        difficulty = re.search(r"Difficulty: (\w+)", prompt)
+        return json.dumps(mcqs(int(m.group(1)), m.group(2).strip(), difficulty.group(1) if difficulty else "medium"))
+    if m := re.search(r"Generate exactly (\d+) unique software engineering coding", prompt):
+        return json.dumps(coding_problems(int(m.group(1))))
+    if '"is_correct": boolean' in prompt:
+        return json.dumps({"is_correct": random.random() < 0.7, "feedback_points": ["Looks fine."],
+                           "time_complexity": "O(n)", "space_complexity": "O(1)"})
+    if "Evaluate EVERY participant" in prompt:
+        transcript = prompt.split("Transcript:", 1)[-1].strip().split("\n\n", 1)[0]
+        names = re.findall(r"^\s*([^:\n]+):", transcript, re.M) or ["Test User"]
+        return json.dumps([
+            {"user_name": name, "clarity": 7, "confidence": 7, "logic": 7, "communication": 7, "leadership": 6,
+             "total": 34, "strengths": ["Clear points"], "weaknesses": ["Brief"], "advice": "Elaborate more."}
+            for name in dict.fromkeys(names)
+        ])
+    if '"next_question"' in prompt:
+        progress = re.search(r"Question (\d+) of 10", prompt)
+        final = bool(progress) and int(progress.group(1)) >= 10
+        reply = {"next_question": "Tell me about a challenging project you led and what you would do differently."}
+        if '"feedback"' in prompt:  # combined evaluate-and-ask prompt
+            reply.update(feedback=EVALUATION["feedback"], ideal_answer=EVALUATION["ideal_answer"], score=random.randint(4, 9))
+        return json.dumps({**reply, "is_final": final})
+    if '"ideal_answer"' in prompt:
+        answer = prompt.split("Candidate's Answer:", 1)[-1].strip().split("\n", 1)[0]
+        return json.dumps({**EVALUATION, "score": random.randint(4, 9), "note": f"Said: {answer[:60]}",
+                           "skills": random.sample(["Python", "SQL", "Caching", "REST APIs", "Docker"], 2),
+                           "weak_areas": random.sample(["Trade-offs", "Testing", "Metrics"], 1)})
+    if m := re.search(r"Write (\d+) different opening lines", prompt):
+        greetings = ["Hello and welcome!", "Hi, thanks for joining today.", "Good to meet you.", "Welcome, let's get started."]
+        return json.dumps([f"{random.choice(greetings)} Please introduce yourself and tell me a bit about your background."
+                           for _ in range(int(m.group(1)))])
+    return "Hello! Please introduce yourself and tell me a bit about your background."
+
+def gemini_response(text: str):
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": len(text) // 4, "totalTokenCount": len(text) // 4},
+    }
+
+def error_response(code: int, status: str, message: str):
+    return JSONResponse(status_code=code, content={"error": {"code": code, "message": message, "status": status}})
+
+# --- Endpoints ---
+@app.post("/{version}/models/{model}:generateContent")
+async def generate_content(version: str, model: str, request: Request):
+    stats["requests"] += 1
+    body = await request.json()
+    await asyncio.sleep(max(0.0, settings["latency"] + random.uniform(-settings["jitter"], settings["jitter"])))
+    if settings["down"] or random.random() < settings["error_rate"]:
+        stats["errors"] += 1
+        return error_response(503, "UNAVAILABLE", "The model is overloaded. Please try again later.")
+    if random.random() < settings["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return error_response(429, "RESOURCE_EXHAUSTED", "Quota exceeded.")
+    prompt = "\n".join(
+        part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+    )
+    text = reply_for(prompt)
+    # A real model takes as long to produce the whole reply whether or not it is streamed
+    await asyncio.sleep(settings["chunk_delay"] * ((len(text) - 1) // max(1, settings["chunk_chars"])))
+    return gemini_response(text)
+
+@app.post("/{version}/models/{model}:streamGenerateContent")
+async def stream_generate_content(version: str, model: str, request: Request):
+    """SSE (alt=sse), one gemini_response per chunk; usage only on the last one, like the real API."""
+    stats["requests"] += 1
+    body = await request.json()
+    await asyncio.sleep(max(0.0, settings["latency"] + random.uniform(-settings["jitter"], settings["jitter"])))
+    if settings["down"] or random.random() < settings["error_rate"]:
+        stats["errors"] += 1
+        return error_response(503, "UNAVAILABLE", "The model is overloaded. Please try again later.")
+    if random.random() < settings["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return error_response(429, "RESOURCE_EXHAUSTED", "Quota exceeded.")
+    prompt = "\n".join(
+        part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+    )
+    text = reply_for(prompt)
+    size = max(1, settings["chunk_chars"])
+
+    async def events():
+        for start in range(0, len(text), size):
+            if start:
+                await asyncio.sleep(settings["chunk_delay"])
+            chunk = gemini_response(text[start:start + size])
+            if start + size < len(text):
+                del chunk["usageMetadata"]
+            else:
+                chunk["usageMetadata"]["totalTokenCount"] = len(text) // 4
+            yield f"data: {json.dumps(chunk)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/_fake/settings")
+async def update_settings(changes: dict):
+    """Flip behaviour mid-run, e.g. {"down": true} to simulate an outage."""
+    settings.update({k: v for k, v in changes.items() if k in settings})
+    return settings
+
+@app.get("/_fake/stats")
+async def get_stats():
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=settings["latency"], help="seconds per reply")
+    parser.add_argument("--jitter", type=float, default=settings["jitter"])
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of replies that are 503s")
+    parser.add_argument("--chunk-delay", type=float, default=settings["chunk_delay"], help="seconds between streamed chunks")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of replies that are 429s")
+    args = parser.parse_args()
+    settings.update(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, chunk_delay=args.chunk_delay)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
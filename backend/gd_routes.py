@@ -3,8 +3,9 @@ import json
 from typing import Dict
 from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
-from google import genai
-from database import get_cursor
+import llm_gateway
+from database import get_cursor, get_async_cursor
+import xp_ledger
 from datetime import datetime
 
 # Import the send_email function from your main.py (you might need to adjust the import based on your structure, or redefine it here)
@@ -150,9 +151,24 @@ async def gd_websocket(websocket: WebSocket, session_id: str, user_name: str):
 
 
 # --- 3. AI EVALUATION ---
+GD_CRITERIA = ("clarity", "confidence", "logic", "communication", "leadership")  # each out of 10
+
+def _clamped(value, high):
+    """The model's number as an int in [0, high], or None if it is not a number."""
+    try:
+        return min(max(round(float(value)), 0), high)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def _gd_total(result):
+    """The model's total (out of 50); if it is missing or not a number, the sum of the criteria."""
+    total = _clamped(result.get("total"), 10 * len(GD_CRITERIA))
+    if total is None:
+        total = sum(_clamped(result.get(c), 10) or 0 for c in GD_CRITERIA)
+    return total
 
 @router.post("/evaluate")
-async def evaluate_gd(req: EvaluateReq, db_cursor: tuple = Depends(get_cursor)):
+async def evaluate_gd(req: EvaluateReq, db_cursor: tuple = Depends(get_async_cursor)):
     cursor, db = db_cursor
     room_data = manager.rooms.get(str(req.session_id))
     
@@ -179,17 +195,25 @@ async def evaluate_gd(req: EvaluateReq, db_cursor: tuple = Depends(get_cursor)):
     ]
     """
     try:
-        api_key = os.getenv("GEMINI_API_KEY_INTERVIEW") or os.getenv("GEMINI_API_KEY")
-        client = genai.Client(api_key=api_key)
-        response = await client.aio.models.generate_content(model="gemini-2.5-flash", contents=prompt)
+        response = await llm_gateway.generate("gd", prompt)
         
         cleaned = response.text.replace("```json", "").replace("```", "").strip()
         data = json.loads(cleaned)
         
-        cursor.execute("UPDATE gd_sessions SET status='completed' WHERE id=%s", (req.session_id,))
-        db.commit()
+        await cursor.execute("UPDATE gd_sessions SET status='completed' WHERE id=%s", (req.session_id,))
+
+        # Credit each evaluated participant on the GD leaderboard (once per session)
+        await cursor.execute("SELECT user_id, user_name FROM gd_participants WHERE session_id=%s", (req.session_id,))
+        participants = {p['user_name']: p['user_id'] for p in await cursor.fetchall()}
+        for result in data if isinstance(data, list) else []:
+            user_id = participants.get(result.get("user_name")) if isinstance(result, dict) else None
+            if user_id is not None:
+                await xp_ledger.record_gd_result_async(cursor, req.session_id, user_id, _gd_total(result))
+        await db.commit()
 
         return data
+    except llm_gateway.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Evaluation Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,123 @@
+# backend/interview_memory.py
+# Rolling memory for interviews. Only the last few messages fit in a prompt, so each scored
+# answer also leaves a one-line note and key facts (skills the candidate claimed, weak areas)
+# on the session. Question prompts are built from those plus the recent window, within a fixed
+# token budget, so late questions keep early context without prompts growing every turn.
+import os
+import json
+from collections import defaultdict, deque
+from percentiles import percentile
+
+INTERVIEW_CONTEXT_TOKEN_BUDGET = int(os.getenv("INTERVIEW_CONTEXT_TOKEN_BUDGET", "600"))  # history part of the prompt
+MAX_FACTS = 10  # per kind, most recent kept
+MAX_NOTE_CHARS = 160
+FACT_KINDS = {"skills": "Skills claimed", "weak_areas": "Weak areas"}
+
+def count_tokens(text):
+    """Same ~4 characters per token estimate as llm_gateway.estimate_tokens."""
+    return len(text) // 4 + 1
+
+# --- Stored Memory ---
+def parse_notes(summary):
+    """memory_summary ("T3: note" per line) -> {turn_number: note}."""
+    notes = {}
+    for line in (summary or "").splitlines():
+        number, _, note = line.partition(": ")
+        if number[:1] == "T" and number[1:].isdigit():
+            notes[int(number[1:])] = note
+    return notes
+
+def render_notes(notes):
+    return "\n".join(f"T{number}: {notes[number]}" for number in sorted(notes))
+
+def parse_facts(facts):
+    try:
+        loaded = json.loads(facts) if facts else {}
+    except ValueError:
+        loaded = {}
+    return {kind: list(loaded.get(kind) or []) for kind in FACT_KINDS}
+
+def merge(session, turn_number, scored):
+    """Folds one scored answer ("note", "skills", "weak_areas") into the session's memory columns.
+    Notes are keyed by turn, so answers scored out of order still merge cleanly."""
+    notes = parse_notes(session.memory_summary)
+    note = " ".join(str(scored.get("note") or "").split())[:MAX_NOTE_CHARS]
+    if note:
+        notes[turn_number] = note
+    facts = parse_facts(session.memory_facts)
+    for kind in FACT_KINDS:
+        items = scored.get(kind) or []
+        for item in items if isinstance(items, list) else [items]:
+            item = " ".join(str(item).split())
+            known = [existing.lower() for existing in facts[kind]]
+            if item and item.lower() not in known:
+                facts[kind].append(item)
+        facts[kind] = facts[kind][-MAX_FACTS:]
+    session.memory_summary = render_notes(notes)
+    session.memory_facts = json.dumps(facts)
+
+# --- Prompt Context ---
+def build_context(summary, facts, recent, budget=INTERVIEW_CONTEXT_TOKEN_BUDGET):
+    """History section of a question prompt, at most `budget` tokens.
+
+    `recent` holds (turn_number, role, content), oldest first. Key facts go in first, then the
+    recent window newest first (an oversized message is cut), then notes on older turns.
+    """
+    remaining = budget
+    facts = parse_facts(facts)
+    fact_lines = [f"{label}: {', '.join(facts[kind])}" for kind, label in FACT_KINDS.items() if facts[kind]]
+    fact_lines = _fit(fact_lines, remaining)
+    remaining -= sum(count_tokens(line) for line in fact_lines)
+
+    window = []
+    for turn_number, role, content in reversed(recent):
+        line = f"{role}: {content}"
+        cost = count_tokens(line)
+        if cost > remaining:
+            if remaining > 20:
+                window.append(line[:(remaining - 1) * 4 - 3] + "...")
+                remaining = 0
+            break
+        window.append(line)
+        remaining -= cost
+    window.reverse()
+
+    in_window = {turn_number for turn_number, _, _ in recent[len(recent) - len(window):]} if window else set()
+    older = [f"T{n}: {note}" for n, note in sorted(parse_notes(summary).items()) if n not in in_window]
+    older = _fit(older[::-1], remaining)[::-1]  # newest notes win
+
+    sections = []
+    if fact_lines:
+        sections.append("Key Facts:\n" + "\n".join(fact_lines))
+    if older:
+        sections.append("Earlier in the interview:\n" + "\n".join(older))
+    sections.append("Recent Conversation:\n" + "\n".join(window))
+    return "\n\n".join(sections)
+
+def _fit(lines, budget):
+    """Leading lines that fit in `budget` tokens."""
+    kept = []
+    for line in lines:
+        budget -= count_tokens(line)
+        if budget < 0:
+            break
+        kept.append(line)
+    return kept
+
+# --- Prompt Size Report ---
+prompt_tokens = defaultdict(lambda: deque(maxlen=500))  # turn_number -> recent prompt sizes
+
+def record_prompt(turn_number, prompt):
+    prompt_tokens[turn_number].append(count_tokens(prompt))
+
+def get_stats():
+    """Question-prompt size (estimated tokens) per turn number."""
+    return {
+        turn_number: {
+            "count": len(sizes),
+            "p50": percentile(list(sizes), 50),
+            "p95": percentile(list(sizes), 95),
+            "max": max(sizes),
+        }
+        for turn_number, sizes in sorted(prompt_tokens.items())
+    }
@@ -16,7 +16,11 @@ class InterviewSession(Base):
     start_time = Column(DateTime, default=datetime.utcnow)
     end_time = Column(DateTime, nullable=True)
     overall_score = Column(Float, nullable=True)
+    score_sum = Column(Integer, nullable=False, default=0, server_default="0")   # running totals of the turns'
+    score_count = Column(Integer, nullable=False, default=0, server_default="0") # ai_score (interview_scores.py)
     feedback_summary = Column(Text, nullable=True)
+    memory_summary = Column(Text, nullable=True) # one note per answered turn (interview_memory.py)
+    memory_facts = Column(Text, nullable=True)   # JSON: skills claimed, weak areas
 
     turns = relationship("InterviewTurn", back_populates="session")
 
@@ -0,0 +1,158 @@
+# backend/interview_openers.py
+# Pre-generated interview openers per (job_role, interview_type). /start used to wait on a full
+# Gemini round trip for a greeting under 15 words; now it rotates through a cached batch and only
+# calls the model live on a miss. Batches are generated in the background (one call for several
+# openers), refreshed after a number of uses or an age limit, and warmed at startup for the
+# role/type pairs that have been interviewed most.
+import os
+import json
+import time
+import random
+import asyncio
+from collections import OrderedDict
+from sqlalchemy import func
+import llm_gateway
+from database import SessionLocal
+from interview_models import InterviewSession
+
+FIRST_QUESTION = "Please introduce yourself and tell me a bit about your background."
+OPENER_BATCH = int(os.getenv("INTERVIEW_OPENER_BATCH", "6"))  # openers per background call
+OPENER_REFRESH_USES = int(os.getenv("INTERVIEW_OPENER_REFRESH_USES", "50"))  # serves before a fresh batch
+OPENER_TTL_SECONDS = float(os.getenv("INTERVIEW_OPENER_TTL_SECONDS", "86400"))
+OPENER_CACHE_SIZE = int(os.getenv("INTERVIEW_OPENER_CACHE_SIZE", "500"))  # role/type pairs per worker
+OPENER_WARM_PAIRS = int(os.getenv("INTERVIEW_OPENER_WARM_PAIRS", "10"))  # 0 disables startup warming
+MAX_GREETING_WORDS = 15
+
+class _Entry:
+    def __init__(self, openers):
+        self.openers = openers
+        self.next = random.randrange(len(openers))  # workers start at different points in the rotation
+        self.served = 0
+        self.created = time.monotonic()
+
+    @property
+    def stale(self):
+        return self.served >= OPENER_REFRESH_USES or time.monotonic() - self.created >= OPENER_TTL_SECONDS
+
+_cache = OrderedDict()  # (role, type) -> _Entry, least recently used first
+_refilling = set()  # keys with a batch being generated
+_tasks = set()  # strong refs so refill tasks are not garbage-collected mid-run
+stats = {"hits": 0, "misses": 0, "refills": 0, "refill_failures": 0}
+
+def cache_key(job_role, interview_type):
+    return " ".join((job_role or "").lower().split()), (interview_type or "").strip().lower()
+
+def greeting_prompt(job_role):
+    return f"""
+        You are a hiring manager for the {job_role} position.
+        Start the interview now.
+
+        STRICT RULES:
+        1. Keep your greeting under 15 words.
+        2. Your FIRST question MUST be: "{FIRST_QUESTION}"
+        3. Do not ask multiple questions at once.
+        """
+
+def batch_prompt(job_role, interview_type, count):
+    return f"""
+        You are a hiring manager for the {job_role} position, about to start a {interview_type} interview.
+        Write {count} different opening lines for the interview.
+
+        STRICT RULES:
+        1. Each greeting is under 15 words.
+        2. Each opener MUST end with exactly: "{FIRST_QUESTION}"
+        3. Vary the tone and wording between openers.
+
+        Return ONLY a JSON array of strings.
+        """
+
+def normalize(opener):
+    """A short greeting followed by FIRST_QUESTION, or None if the opener does not follow the rules."""
+    opener = " ".join(str(opener).split())
+    if FIRST_QUESTION not in opener:
+        return None
+    greeting = opener.split(FIRST_QUESTION)[0].strip()
+    if not greeting or len(greeting.split()) > MAX_GREETING_WORDS:
+        return None
+    return f"{greeting} {FIRST_QUESTION}"
+
+# --- Serving ---
+def take(job_role, interview_type):
+    """Next cached opener for the pair, or None (a miss; the caller generates one live)."""
+    key = cache_key(job_role, interview_type)
+    entry = _cache.get(key)
+    if entry is None:
+        stats["misses"] += 1
+        schedule_refill(job_role, interview_type)
+        return None
+    stats["hits"] += 1
+    _cache.move_to_end(key)
+    opener = entry.openers[entry.next % len(entry.openers)]
+    entry.next += 1
+    entry.served += 1
+    if entry.stale:
+        schedule_refill(job_role, interview_type)  # keeps serving this batch until the new one lands
+    return opener
+
+def seed(job_role, interview_type, opener):
+    """Caches a live-generated opener until the background batch arrives."""
+    key = cache_key(job_role, interview_type)
+    opener = normalize(opener)
+    if opener and key not in _cache:
+        _store(key, [opener])
+
+def _store(key, openers):
+    _cache[key] = _Entry(openers)
+    _cache.move_to_end(key)
+    while len(_cache) > OPENER_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+# --- Background refill ---
+def schedule_refill(job_role, interview_type):
+    key = cache_key(job_role, interview_type)
+    if key in _refilling:
+        return
+    _refilling.add(key)
+    task = asyncio.create_task(_refill(key, job_role, interview_type))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+async def _refill(key, job_role, interview_type):
+    try:
+        response = await llm_gateway.generate(
+            "interview", batch_prompt(job_role, interview_type, OPENER_BATCH), priority="background"
+        )
+        raw = json.loads(response.text.replace("```json", "").replace("```", "").strip())
+        openers = list(dict.fromkeys(filter(None, (normalize(o) for o in raw if isinstance(o, str)))))
+        if not openers:
+            raise ValueError("no usable openers in the batch")
+        _store(key, openers)
+        stats["refills"] += 1
+    except Exception as e:
+        stats["refill_failures"] += 1
+        print(f"⚠️ Interview opener refill failed for {key}: {e}")
+    finally:
+        _refilling.discard(key)
+
+def popular_pairs():
+    """The most-interviewed (job_role, interview_type) pairs."""
+    if OPENER_WARM_PAIRS <= 0:
+        return []
+    db = SessionLocal()
+    try:
+        return (
+            db.query(InterviewSession.job_role, InterviewSession.interview_type)
+            .group_by(InterviewSession.job_role, InterviewSession.interview_type)
+            .order_by(func.count().desc()).limit(OPENER_WARM_PAIRS).all()
+        )
+    finally:
+        db.close()
+
+def warm(pairs):
+    """Starts background batches for the given (job_role, interview_type) pairs."""
+    for job_role, interview_type in pairs:
+        if job_role and cache_key(job_role, interview_type) not in _cache:
+            schedule_refill(job_role, interview_type)
+
+def get_stats():
+    return {**stats, "pairs": len(_cache), "refilling": len(_refilling)}
@@ -1,20 +1,32 @@
 # backend/interview_routes.py
 import os
+import re
 import json
+import asyncio
 from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from google import genai  # ✅ Using the NEW SDK
+import llm_gateway
+import interview_memory
+import interview_openers
+import interview_scores
 
 # Database & Models
-from database import get_session, get_cursor
+from database import get_session, get_cursor, session_cursor, SessionLocal
+import xp_ledger
+from leaderboard_index import leaderboard
 from interview_models import InterviewSession, InterviewTurn
+from interview_state import InterviewState, interview_states
 
 router = APIRouter(prefix="/api/interview", tags=["Interview"])
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering of events
+
 # --- Pydantic Models ---
 class StartInterviewRequest(BaseModel):
     user_id: int
@@ -29,7 +41,7 @@ class ChatMessage(BaseModel):
 class InterviewRequest(BaseModel):
     session_id: int
     user_input: str
-    history: List[ChatMessage] 
+    history: List[ChatMessage] = []  # ignored: the server keeps the conversation (interview_state.py)
     is_code: bool = False
 
 class SaveInterviewRequest(BaseModel):
@@ -60,203 +72,488 @@ def save_interview_attempt(req: SaveInterviewRequest, db_cursor: tuple = Depends
         print(f"Error saving interview: {e}")
         raise HTTPException(status_code=500, detail="Failed to save results")
 
+async def _opener(req: StartInterviewRequest):
+    """Cached opener for the role and type, or a live one on a miss (which also seeds the cache)."""
+    opener = interview_openers.take(req.job_role, req.interview_type)
+    if opener is None:
+        response = await llm_gateway.generate("interview", interview_openers.greeting_prompt(req.job_role), priority="interactive")
+        opener = response.text
+        interview_openers.seed(req.job_role, req.interview_type, opener)
+    return opener
+
+def _create_session(db, req: StartInterviewRequest):
+    new_session = InterviewSession(
+        user_id=req.user_id,
+        job_role=req.job_role,
+        interview_type=req.interview_type,
+        difficulty="Medium", 
+        topic=req.topic,
+        start_time=datetime.utcnow()
+    )
+    db.add(new_session)
+    db.flush()  # assigns the id; the caller commits
+    return new_session
+
 @router.post("/start")
 async def start_interview(req: StartInterviewRequest, db: Session = Depends(get_session)):
     """Initializes a new interview session in the database."""
     try:
-        # 1. Get API Key
-        api_key = os.getenv("GEMINI_API_KEY_INTERVIEW")
-        if not api_key:
-            api_key = os.getenv("GEMINI_API_KEY") # Fallback
-        
-        if not api_key:
+        # 1. Check API Keys (the gateway picks one per call)
+        if not llm_gateway.has_keys():
             raise HTTPException(status_code=500, detail="Missing API Key for Interview.")
 
-        # 2. Initialize Client
-        client = genai.Client(api_key=api_key)
+        # 2. Initial Greeting (pre-generated; see interview_openers.py)
+        message = await _opener(req)
 
         # 3. Create Session Record
-        new_session = InterviewSession(
-            user_id=req.user_id,
-            job_role=req.job_role,
-            interview_type=req.interview_type,
-            difficulty="Medium", 
-            topic=req.topic,
-            start_time=datetime.utcnow()
-        )
-        db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
+        new_session = _create_session(db, req)
 
-        # 4. Generate Initial Greeting
-        prompt = f"""
-        You are a hiring manager for the {req.job_role} position. 
-        Start the interview now.
-        
-        STRICT RULES:
-        1. Keep your greeting under 15 words.
-        2. Your FIRST question MUST be: "Please introduce yourself and tell me a bit about your background."
-        3. Do not ask multiple questions at once.
-        """
-        
-        # ✅ Using gemini-2.5-flash
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash", 
-            contents=prompt
-        )
-        
-        # 5. Save first turn (AI Question)
+        # 4. Save first turn (AI Question), in the same transaction
         first_turn = InterviewTurn(
             session_id=new_session.id,
-            question_text=response.text,
+            question_text=message,
             turn_number=1,
             question_type=req.interview_type
         )
         db.add(first_turn)
+        db.flush()
+        state = InterviewState(new_session, [first_turn])
         db.commit()
+        interview_states.put(state)
 
         return {
-            "session_id": new_session.id, 
-            "message": response.text,
+            "session_id": state.session_id, 
+            "message": message,
             "turn_number": 1
         }
 
+    except llm_gateway.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"❌ Start Interview Error (Likely Quota/Model Issue): {e}") 
         raise HTTPException(status_code=500, detail=f"AI Error: {str(e)}")
 
-@router.post("/chat")
-async def interview_chat(req: InterviewRequest, db: Session = Depends(get_session)):
-    """Handles the interview loop: Evaluates answer -> Saves -> Generates Next Question."""
+# --- Turn Helpers (shared by /chat and /chat/stream) ---
+def _record_answer(db, req: InterviewRequest):
+    """The session's cached state, with the user's answer saved on its open turn."""
+    state = interview_states.get(db, req.session_id)
+    for _ in range(2):
+        if not state:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if state.last_answer or state.last_turn_id is None:
+            return state
+        saved = (
+            db.query(InterviewTurn)
+            .filter(InterviewTurn.id == state.last_turn_id, func.coalesce(InterviewTurn.user_answer_text, "") == "")
+            .update({InterviewTurn.user_answer_text: req.user_input}, synchronize_session=False)
+        )
+        if saved:
+            db.commit()  # before scoring starts: the scoring task writes this row from its own session
+            state.answer(req.user_input)
+            return state
+        # Answered elsewhere (another worker): our copy is stale
+        state = interview_states.reload(db, req.session_id)
+    return state
+
+def _question_prompt(state, user_input):
+    system_instruction = f"""
+        You are conducting a {state.interview_type} interview for the {state.job_role} role.
+        Current Progress: Question {state.turn_count} of 10.
+
+        DIFFICULTY LOGIC:
+        - Turns 1-3: Basic/Introductory level.
+        - Turns 4-7: Intermediate level (Scenario-based or core technical concepts).
+        - Turns 8-9: Advanced/Hard level (Complex problem solving).
+        - Turn 10: Closing and final thoughts.
+
+        STRICT RULES:
+        1. Ask ONLY ONE question at a time.
+        2. Keep questions concise (under 30 words) to facilitate voice interaction.
+        3. Increase the technical complexity as the interview progresses.
+        4. If the turn_count reaches 10, set "is_final": true.
+
+        RESPONSE JSON FORMAT:
+        {{
+            "next_question": "...",
+            "is_final": false
+        }}
+    """
+
+    history_text = interview_memory.build_context(state.memory_summary, state.memory_facts, list(state.recent))
+    return f"{system_instruction}\n\nConversation History:\n{history_text}\n\nCandidate's Last Answer: {user_input}"
+
+def _score_prompt(state):
+    return f"""
+        You are evaluating one answer from a {state.interview_type} interview for the {state.job_role} role.
+
+        Question: {state.last_question}
+        Candidate's Answer: {state.last_answer}
+
+        Score the answer from 0 to 10, point out what to improve, and give a model answer.
+        Also note, for later questions, what this answer showed about the candidate.
+
+        RESPONSE JSON FORMAT:
+        {{
+            "feedback": "...",
+            "ideal_answer": "...",
+            "score": 0-10,
+            "note": "one sentence, under 20 words",
+            "skills": ["skills or technologies the candidate claimed"],
+            "weak_areas": ["topics the answer was weak on"]
+        }}
+    """
+
+def _parse_json(text):
+    # Clean Markdown if present
+    return json.loads(text.replace("```json", "").replace("```", "").strip())
+
+def _parse_question(text, is_final_turn):
     try:
-        api_key = os.getenv("GEMINI_API_KEY_INTERVIEW") or os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="Missing API Key for Interview.")
+        return _parse_json(text)
+    except:
+        return {"next_question": text, "is_final": is_final_turn}
+
+def _close_session(db, session_id, summary):
+    """Sets end_time and the average score (from the running totals) under a row lock, so the final
+    /chat and /end cannot both close the session. Returns (session, XP row to publish); the row is
+    None if the session was already closed, and both are None if it does not exist."""
+    session = (
+        db.query(InterviewSession)
+        .filter(InterviewSession.id == session_id)
+        .populate_existing()
+        .with_for_update()
+        .first()
+    )
+    if session is None or session.end_time is not None:
+        return session, None
+    session.end_time = datetime.utcnow()
+    session.overall_score = interview_scores.average(session.score_sum, session.score_count)
+    session.feedback_summary = f"{summary}: {session.overall_score}/10"
+    with session_cursor(db) as cursor:
+        return session, xp_ledger.record_interview_completed(cursor, session.user_id, session.overall_score)
+
+async def _finish_turn(db, state, data):
+    """Saves the next turn, or on the final one waits for scoring and closes the session; commits,
+    publishes XP and advances the cached state. Returns the response body."""
+    try:
+        if data.get("is_final"):
+            db.commit()  # new snapshot, so the scores committed by the scoring tasks are visible
+            await wait_for_scoring(state.session_id)
+            session, xp_row = _close_session(db, state.session_id, "Interview Completed. Final Score")
+            if session is None:
+                raise HTTPException(status_code=404, detail="Session not found")
+            last_turn = db.get(InterviewTurn, state.last_turn_id) if state.last_turn_id else None
+            if last_turn:
+                data = {**data, "score": last_turn.ai_score, "feedback": last_turn.ai_feedback, "ideal_answer": last_turn.ai_suggested_answer}
+            # Authoritative average from the running totals; the client may not have every turn's feedback yet
+            data = {**data, "overall_score": session.overall_score}
+            db.commit()
+            interview_states.evict(state.session_id)
+            leaderboard.publish(xp_row)
+            return data
+
+        question = data.get("next_question", "")
+        new_turn = InterviewTurn(
+            session_id=state.session_id,
+            question_text=question,
+            turn_number=state.turn_count + 1,
+            question_type="Technical" if "CODE_TASK:" in question else "Behavioral"
+        )
+        db.add(new_turn)
+        db.flush()
+        new_turn_id = new_turn.id
+        db.commit()
+    except Exception:
+        interview_states.evict(state.session_id)
+        raise
+
+    # The answer's score arrives later: GET /feedback/{session_id}/{scored_turn}
+    scored_turn = state.turn_count if state.last_turn_id else None
+    state.advance(new_turn_id, question)
+    return {**data, "scored_turn": scored_turn}
+
+# --- Background Scoring ---
+# Each answer is scored by its own LLM call, started alongside the next-question call, so a turn
+# only waits for the short question. Tasks live in this process; the final turn and /end wait
+# for their session's tasks before averaging the scores.
+INTERVIEW_SCORING_WAIT_SECONDS = float(os.getenv("INTERVIEW_SCORING_WAIT_SECONDS", "30"))
+_scoring = {}  # session_id -> {turn_number: asyncio.Task}
+
+async def _score_turn(session_id, turn_id, turn_number, prompt):
+    try:
+        # Nobody waits on this call: batch class keeps it out of the interactive p95
+        response = await llm_gateway.generate("interview", prompt, priority="batch")
+    except Exception as e:
+        print(f"⚠️ Scoring failed for interview turn {turn_id}: {e}")
+        return
+    try:
+        data = _parse_json(response.text)
+    except:
+        data = {"feedback": "Good attempt.", "ideal_answer": "N/A", "score": 5}
 
-        client = genai.Client(api_key=api_key)
+    try:
+        # Blocking DB work (and its row lock wait) stays off the event loop
+        saved = await asyncio.to_thread(_save_score, session_id, turn_id, turn_number, data)
+    except Exception as e:
+        print(f"⚠️ Could not save score for interview turn {turn_id}: {e}")
+        return
+    state = interview_states.peek(session_id)
+    if saved and state:
+        state.remember(*saved)
+
+def _save_score(session_id, turn_id, turn_number, data):
+    """Writes one turn's score, the session totals and memory. Returns (summary, facts), or None if the rows are gone."""
+    db = SessionLocal()
+    try:
+        # Row lock: other workers may be scoring another turn of the same session
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).with_for_update().first()
+        turn = db.get(InterviewTurn, turn_id)
+        if not session or not turn:
+            db.rollback()
+            print(f"⚠️ Interview turn {turn_id} of session {session_id} no longer exists; score dropped")
+            return None
+        old_score, new_score = turn.ai_score, interview_scores.as_score(data.get("score"))
+        turn.ai_score = new_score
+        turn.ai_feedback = data.get("feedback")
+        turn.ai_suggested_answer = data.get("ideal_answer")
+        # Running totals, as SQL increments in the same transaction as the turn
+        session.score_sum = InterviewSession.score_sum + (new_score or 0) - (old_score or 0)
+        session.score_count = InterviewSession.score_count + int(new_score is not None) - int(old_score is not None)
+        interview_memory.merge(session, turn_number, data)
+        summary, facts = session.memory_summary, session.memory_facts
+        db.commit()
+        return summary, facts
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def schedule_scoring(state):
+    """Starts scoring the open turn's answer in the background (once per turn)."""
+    session_id, turn_number = state.session_id, state.turn_count
+    if not state.last_answer or state.scored_through >= turn_number:
+        return
+    state.scored_through = turn_number
+    task = asyncio.create_task(_score_turn(session_id, state.last_turn_id, turn_number, _score_prompt(state)))
+    _scoring.setdefault(session_id, {})[turn_number] = task
+    task.add_done_callback(lambda t: _forget_scoring(session_id, turn_number, t))
+
+def _forget_scoring(session_id, turn_number, task):
+    tasks = _scoring.get(session_id, {})
+    if tasks.get(turn_number) is task:
+        del tasks[turn_number]
+        if not tasks:
+            del _scoring[session_id]
+
+async def wait_for_scoring(session_id, turn_number=None):
+    """Waits (up to INTERVIEW_SCORING_WAIT_SECONDS) for a session's scoring tasks, or for one turn's."""
+    pending = [task for n, task in _scoring.get(session_id, {}).items() if turn_number in (None, n)]
+    if pending:
+        await asyncio.wait(pending, timeout=INTERVIEW_SCORING_WAIT_SECONDS)
+
+@router.post("/start/stream")
+async def start_interview_stream(req: StartInterviewRequest):
+    """/start over SSE: the greeting streams out as it is generated."""
+    if not llm_gateway.has_keys():
+        raise HTTPException(status_code=500, detail="Missing API Key for Interview.")
+
+    db = SessionLocal()
+    try:
+        new_session = _create_session(db, req)
+        db.commit()
+        db.refresh(new_session)
+    except Exception:
+        db.close()
+        raise
 
-        # 1. Fetch Session
-        session = db.query(InterviewSession).filter(InterviewSession.id == req.session_id).first()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+    async def events():
+        try:
+            yield sse("session", {"session_id": new_session.id})
+            message = interview_openers.take(req.job_role, req.interview_type)
+            if message is not None:
+                yield sse("question", {"delta": message})
+            else:
+                parts = []
+                prompt = interview_openers.greeting_prompt(req.job_role)
+                async for chunk in llm_gateway.generate_stream("interview", prompt):
+                    parts.append(chunk)
+                    yield sse("question", {"delta": chunk})
+                message = "".join(parts)
+                interview_openers.seed(req.job_role, req.interview_type, message)
+
+            first_turn = InterviewTurn(session_id=new_session.id, question_text=message, turn_number=1, question_type=req.interview_type)
+            db.add(first_turn)
+            db.flush()
+            state = InterviewState(new_session, [first_turn])
+            db.commit()
+            interview_states.put(state)
+            yield sse("done", {"session_id": state.session_id, "message": message, "turn_number": 1})
+        except Exception as e:
+            db.rollback()
+            yield _stream_error(e)
+        finally:
+            db.close()
 
-        # 2. Update Previous Turn (User's Answer)
-        last_turn = db.query(InterviewTurn).filter(InterviewTurn.session_id == req.session_id).order_by(InterviewTurn.turn_number.desc()).first()
-        
-        if last_turn and not last_turn.user_answer_text:
-            last_turn.user_answer_text = req.user_input
-
-        # 3. Determine Progress
-        turn_count = db.query(InterviewTurn).filter(InterviewTurn.session_id == req.session_id).count()
-        is_final_turn = turn_count >= 10  # Ends at 10 questions
-
-        # 4. Construct Gemini Prompt
-        system_instruction = f"""
-            You are conducting a {session.interview_type} interview for the {session.job_role} role.
-            Current Progress: Question {turn_count} of 10.
-
-            DIFFICULTY LOGIC:
-            - Turns 1-3: Basic/Introductory level.
-            - Turns 4-7: Intermediate level (Scenario-based or core technical concepts).
-            - Turns 8-9: Advanced/Hard level (Complex problem solving).
-            - Turn 10: Closing and final thoughts.
-
-            STRICT RULES:
-            1. Ask ONLY ONE question at a time.
-            2. Keep questions concise (under 30 words) to facilitate voice interaction.
-            3. Increase the technical complexity as the interview progresses.
-            4. If the turn_count reaches 10, set "is_final": true.
-
-            RESPONSE JSON FORMAT:
-            {{
-                "feedback": "...",
-                "ideal_answer": "...",
-                "score": 0-10,
-                "next_question": "...",
-                "is_final": false
-            }}
-        """
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
-        history_text = "\n".join([f"{msg.role}: {msg.content}" for msg in req.history[-6:]]) 
-        full_prompt = f"{system_instruction}\n\nConversation History:\n{history_text}\n\nCandidate's Last Answer: {req.user_input}"
+@router.post("/chat")
+async def interview_chat(req: InterviewRequest, db: Session = Depends(get_session)):
+    """Handles the interview loop: Saves answer -> Generates Next Question (the answer is scored in the background)."""
+    try:
+        if not llm_gateway.has_keys():
+            raise HTTPException(status_code=500, detail="Missing API Key for Interview.")
 
-        # 5. Generate AI Response
-        # ✅ Using gemini-2.5-flash
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=full_prompt
-        )
-        
-        # Clean Markdown if present
-        text_resp = response.text.replace("```json", "").replace("```", "").strip()
-        
-        try:
-            data = json.loads(text_resp)
-        except:
-            data = {
-                "feedback": "Good attempt.", 
-                "ideal_answer": "N/A", 
-                "score": 5, 
-                "next_question": response.text, 
-                "is_final": is_final_turn
-            }
-
-        # 6. Save Evaluation to Previous Turn
-        if last_turn:
-            last_turn.ai_score = data.get("score")
-            last_turn.ai_feedback = data.get("feedback")
-            last_turn.ai_suggested_answer = data.get("ideal_answer")
-        
-        # 7. Create Next Turn OR Close Session
-        if data.get("is_final"):
-            session.end_time = datetime.utcnow()
-            avg_score = db.query(InterviewTurn).with_entities(InterviewTurn.ai_score).filter(InterviewTurn.session_id==session.id).all()
-            if avg_score:
-                valid_scores = [x[0] for x in avg_score if x[0] is not None]
-                session.overall_score = round(sum(valid_scores) / len(valid_scores), 1) if valid_scores else 0
-            
-            session.feedback_summary = f"Interview Completed. Final Score: {session.overall_score}/10"
-        else:
-            new_turn = InterviewTurn(
-                session_id=session.id,
-                question_text=data.get("next_question"),
-                turn_number=turn_count + 1,
-                question_type="Technical" if "CODE_TASK:" in data.get("next_question", "") else "Behavioral"
-            )
-            db.add(new_turn)
+        state = _record_answer(db, req)
+        is_final_turn = state.turn_count >= 10  # Ends at 10 questions
+        schedule_scoring(state)
 
-        db.commit()
+        prompt = _question_prompt(state, req.user_input)
+        interview_memory.record_prompt(state.turn_count, prompt)
+        response = await llm_gateway.generate("interview", prompt, priority="interactive")
+        data = _parse_question(response.text, is_final_turn)
 
-        return data
+        return await _finish_turn(db, state, data)
 
+    except llm_gateway.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"❌ Chat Error (Likely Quota/Model Issue): {e}")
         raise HTTPException(status_code=500, detail=f"AI Error: {str(e)}")
 
+# --- Streaming (Server-Sent Events) ---
+# Same flow as /start and /chat, but the question is sent as it is generated:
+#   event: session   {"session_id"}            (/start/stream only)
+#   event: question  {"delta": "..."}          repeated; concatenated they form the question
+#   event: done      {...}                     same body /start or /chat returns, after it is saved
+#   event: error     {"status", "detail"}
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+class JsonFieldStream:
+    """Pulls one top-level string field out of a JSON reply while it is still arriving."""
+
+    def __init__(self, field):
+        self.pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self.buffer = ""
+        self.pos = None  # index of the next undecoded character of the value
+        self.closed = False
+
+    def feed(self, chunk):
+        """Adds a chunk of the reply; returns the newly decoded part of the field ('' if none)."""
+        self.buffer += chunk
+        if self.closed:
+            return ""
+        if self.pos is None:
+            match = self.pattern.search(self.buffer)
+            if not match:
+                return ""
+            self.pos = match.end()
+        out = []
+        buf, i = self.buffer, self.pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.closed = True
+                i += 1
+                break
+            if ch == "\\":
+                width = 6 if buf[i + 1:i + 2] == "u" else 2
+                if i + width > len(buf):
+                    break  # escape split across chunks: wait for the rest
+                try:
+                    out.append(json.loads(f'"{buf[i:i + width]}"'))
+                except ValueError:
+                    out.append(buf[i + 1:i + width])
+                i += width
+                continue
+            out.append(ch)
+            i += 1
+        self.pos = i
+        return "".join(out)
+
+def _stream_error(e):
+    if isinstance(e, HTTPException):
+        return sse("error", {"status": e.status_code, "detail": e.detail})
+    if isinstance(e, llm_gateway.LLMUnavailable):
+        return sse("error", {"status": 503, "detail": str(e)})
+    print(f"❌ Streaming Interview Error: {e}")
+    return sse("error", {"status": 500, "detail": f"AI Error: {str(e)}"})
+
+@router.post("/chat/stream")
+async def interview_chat_stream(req: InterviewRequest):
+    """/chat over SSE: the next question streams out as it is generated."""
+    if not llm_gateway.has_keys():
+        raise HTTPException(status_code=500, detail="Missing API Key for Interview.")
+
+    # Own session rather than Depends(get_session): it must live until the stream finishes
+    db = SessionLocal()
+    try:
+        state = _record_answer(db, req)
+    except Exception:
+        db.close()
+        raise
+    is_final_turn = state.turn_count >= 10
+    schedule_scoring(state)
+
+    async def events():
+        try:
+            question = JsonFieldStream("next_question")
+            parts = []
+            prompt = _question_prompt(state, req.user_input)
+            interview_memory.record_prompt(state.turn_count, prompt)
+            async for chunk in llm_gateway.generate_stream("interview", prompt):
+                parts.append(chunk)
+                delta = question.feed(chunk)
+                if delta:
+                    yield sse("question", {"delta": delta})
+
+            data = _parse_question("".join(parts), is_final_turn)
+            yield sse("done", await _finish_turn(db, state, data))
+        except Exception as e:
+            db.rollback()
+            yield _stream_error(e)
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.get("/feedback/{session_id}/{turn_number}")
+async def get_turn_feedback(session_id: int, turn_number: int, db: Session = Depends(get_session)):
+    """Score and feedback for an answered turn, waiting for its background scoring if it is still running."""
+    await wait_for_scoring(session_id, turn_number)
+    turn = await asyncio.to_thread(
+        lambda: db.query(InterviewTurn).filter(InterviewTurn.session_id == session_id, InterviewTurn.turn_number == turn_number).first()
+    )
+    if not turn:
+        raise HTTPException(status_code=404, detail="Turn not found")
+    return {
+        "turn_number": turn.turn_number,
+        "score": turn.ai_score,
+        "feedback": turn.ai_feedback,
+        "ideal_answer": turn.ai_suggested_answer,
+        "pending": turn_number in _scoring.get(session_id, {}),
+    }
+
+def _end_session(db, session_id):
+    session, xp_row = _close_session(db, session_id, "Interview Ended Early. Partial Score")
+    db.commit()
+    return session, xp_row
+
 @router.post("/end")
-def end_interview_session(req: EndSessionRequest, db: Session = Depends(get_session)):
+async def end_interview_session(req: EndSessionRequest, db: Session = Depends(get_session)):
     """Manually ends an interview session and calculates the partial score."""
     try:
-        session = db.query(InterviewSession).filter(InterviewSession.id == req.session_id).first()
+        await wait_for_scoring(req.session_id)  # before the first query, so its snapshot has the scores
+        # Only closes it if it hasn't been closed yet (the final /chat may have won the row lock).
+        # The queries, the ledger SQL and the commit run off the event loop.
+        session, xp_row = await asyncio.to_thread(_end_session, db, req.session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Only close it if it hasn't been closed yet
-        if session.end_time is None:
-            session.end_time = datetime.utcnow()
-            
-            # Calculate average score based on completed turns so far
-            avg_score = db.query(InterviewTurn).with_entities(InterviewTurn.ai_score).filter(InterviewTurn.session_id==session.id).all()
-            if avg_score:
-                valid_scores = [x[0] for x in avg_score if x[0] is not None]
-                session.overall_score = round(sum(valid_scores) / len(valid_scores), 1) if valid_scores else 0
-            else:
-                session.overall_score = 0
-                
-            session.feedback_summary = f"Interview Ended Early. Partial Score: {session.overall_score}/10"
-            db.commit()
+        leaderboard.publish(xp_row)
+        interview_states.evict(req.session_id)
 
         return {"message": "Session ended successfully"}
     except Exception as e:
         print(f"End Session Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
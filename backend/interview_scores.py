@@ -0,0 +1,69 @@
+# backend/interview_scores.py
+# Running score totals on interview_sessions (score_sum, score_count). Background scoring adds
+# each answer's score in the same transaction that writes interview_turns.ai_score, so closing a
+# session averages in O(1) instead of reading every turn.
+#
+#   python interview_scores.py          -> list sessions whose totals disagree with their turns
+#   python interview_scores.py rebuild  -> recompute every session's totals from interview_turns
+import sys
+
+TURN_TOTALS = "SELECT session_id, SUM(ai_score) AS total, COUNT(ai_score) AS scored FROM interview_turns GROUP BY session_id"
+
+REBUILD_SQL = f"""
+    UPDATE interview_sessions s
+    LEFT JOIN ({TURN_TOTALS}) t ON t.session_id = s.id
+    SET s.score_sum = COALESCE(t.total, 0), s.score_count = COALESCE(t.scored, 0)
+"""
+
+VERIFY_SQL = f"""
+    SELECT s.id, s.score_sum, s.score_count, COALESCE(t.total, 0) AS total, COALESCE(t.scored, 0) AS scored
+    FROM interview_sessions s
+    LEFT JOIN ({TURN_TOTALS}) t ON t.session_id = s.id
+    WHERE s.score_sum <> COALESCE(t.total, 0) OR s.score_count <> COALESCE(t.scored, 0)
+"""
+
+def as_score(value):
+    """The model's score as an int in 0-10, or None if it is not a number."""
+    try:
+        return max(0, min(10, round(float(value))))
+    except (TypeError, ValueError):
+        return None
+
+def average(score_sum, score_count):
+    return round(score_sum / score_count, 1) if score_count else 0
+
+def rebuild(cursor):
+    """Recomputes score_sum/score_count for every session. Caller commits."""
+    cursor.execute(REBUILD_SQL)
+
+def verify(cursor):
+    """Returns (session_id, column, expected, stored) for every disagreement."""
+    cursor.execute(VERIFY_SQL)
+    mismatches = []
+    for row in cursor.fetchall():
+        if row["score_sum"] != row["total"]:
+            mismatches.append((row["id"], "score_sum", row["total"], row["score_sum"]))
+        if row["score_count"] != row["scored"]:
+            mismatches.append((row["id"], "score_count", row["scored"], row["score_count"]))
+    return mismatches
+
+if __name__ == "__main__":
+    from database import engine
+    from migrations import run_migrations
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    conn = engine.raw_connection()
+    try:
+        run_migrations(conn)
+        cursor = conn.cursor(dictionary=True)
+        if command == "rebuild":
+            rebuild(cursor)
+            conn.commit()
+            print("✅ Interview score totals rebuilt.")
+        mismatches = verify(cursor)
+        for session_id, col, want, got in mismatches[:50]:
+            print(f"❌ session {session_id}: {col} turns={want} stored={got}")
+        print(f"{'✅' if not mismatches else '❌'} {len(mismatches)} mismatches.")
+        sys.exit(1 if mismatches else 0)
+    finally:
+        conn.close()
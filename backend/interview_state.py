@@ -0,0 +1,104 @@
+# backend/interview_state.py
+# Server-side conversation state for live interviews. A turn used to re-query the session, its
+# latest turn and the turn count, and prompt from history the client resent every time. The state
+# is loaded once per session (two queries) and advanced by the routes after each commit; the
+# rolling memory (interview_memory.py) is refreshed here as background scoring merges into it.
+#
+# Each worker keeps its own copy. Recording an answer only succeeds on the turn the state thinks is
+# open (UPDATE ... WHERE the turn has no answer yet), so a copy made stale by another worker is
+# detected on the next turn and reloaded.
+import os
+from collections import deque, OrderedDict
+from interview_models import InterviewSession, InterviewTurn
+
+INTERVIEW_STATE_CACHE_SIZE = int(os.getenv("INTERVIEW_STATE_CACHE_SIZE", "2000"))  # sessions per worker
+RECENT_MESSAGES = 6  # conversation window used in prompts
+RECENT_TURNS = RECENT_MESSAGES // 2  # each turn is a question and an answer
+
+class InterviewState:
+    def __init__(self, session, turns):
+        """`turns`: the session's latest turns, newest first (at least RECENT_TURNS of them if it has that many)."""
+        self.session_id = session.id
+        self.user_id = session.user_id
+        self.job_role = session.job_role
+        self.interview_type = session.interview_type
+        last = turns[0] if turns else None
+        self.turn_count = last.turn_number if last else 0  # turns are numbered 1..n
+        self.last_turn_id = last.id if last else None
+        self.last_question = last.question_text if last else None
+        self.last_answer = (last.user_answer_text or None) if last else None
+        self.scored_through = self.turn_count if last and last.ai_score is not None else self.turn_count - 1
+        self.memory_summary = session.memory_summary
+        self.memory_facts = session.memory_facts
+        self.recent = deque(maxlen=RECENT_MESSAGES)  # (turn_number, role, content), oldest first
+        for turn in reversed(turns[:RECENT_TURNS]):
+            self.recent.append((turn.turn_number, "ai", turn.question_text))
+            if turn.user_answer_text:
+                self.recent.append((turn.turn_number, "user", turn.user_answer_text))
+
+    def answer(self, text):
+        """The open turn's answer was saved."""
+        self.last_answer = text
+
+    def advance(self, turn_id, question):
+        """A new turn was saved after the answered one."""
+        answered = (self.turn_count, "user", self.last_answer)
+        if self.last_answer and (not self.recent or self.recent[-1] != answered):
+            self.recent.append(answered)
+        self.turn_count += 1
+        self.recent.append((self.turn_count, "ai", question))
+        self.last_turn_id = turn_id
+        self.last_question = question
+        self.last_answer = None
+
+    def remember(self, summary, facts):
+        """The session's memory columns were updated."""
+        self.memory_summary = summary
+        self.memory_facts = facts
+
+class InterviewStateCache:
+    def __init__(self, capacity=INTERVIEW_STATE_CACHE_SIZE):
+        self.capacity = capacity
+        self._states = OrderedDict()  # session_id -> InterviewState, least recently used first
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, db, session_id):
+        """Cached state, loaded from the database on a miss. None if the session does not exist."""
+        state = self._states.get(session_id)
+        if state is not None:
+            self.hits += 1
+            self._states.move_to_end(session_id)
+            return state
+        return self.reload(db, session_id)
+
+    def peek(self, session_id):
+        """Cached state or None, without loading."""
+        return self._states.get(session_id)
+
+    def reload(self, db, session_id):
+        self.loads += 1
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if not session:
+            self.evict(session_id)
+            return None
+        turns = (
+            db.query(InterviewTurn).filter(InterviewTurn.session_id == session_id)
+            .order_by(InterviewTurn.turn_number.desc()).limit(RECENT_TURNS).all()
+        )
+        return self.put(InterviewState(session, turns))
+
+    def put(self, state):
+        self._states[state.session_id] = state
+        self._states.move_to_end(state.session_id)
+        while len(self._states) > self.capacity:
+            self._states.popitem(last=False)
+        return state
+
+    def evict(self, session_id):
+        self._states.pop(session_id, None)
+
+    def get_stats(self):
+        return {"sessions": len(self._states), "hits": self.hits, "loads": self.loads}
+
+interview_states = InterviewStateCache()
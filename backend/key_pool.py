@@ -0,0 +1,136 @@
+# backend/key_pool.py
+# Pool of every configured Gemini key (GEMINI_API_KEY and GEMINI_API_KEY_*). Each call goes to
+# the least-loaded key that still has request/token budget in the sliding window, so one busy
+# module can borrow an idle module's quota. A key keeps a reserved share of its budget for its
+# own modules, and a key that answers 429 is quarantined for a cooldown.
+import os
+import time
+import asyncio
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+KEY_PREFIX = "GEMINI_API_KEY"
+LLM_KEY_RPM = int(os.getenv("LLM_KEY_RPM", "10"))  # requests per key per window
+LLM_KEY_TPM = int(os.getenv("LLM_KEY_TPM", "250000"))  # tokens per key per window
+LLM_KEY_WINDOW_SECONDS = float(os.getenv("LLM_KEY_WINDOW_SECONDS", "60"))
+LLM_KEY_RESERVED_SHARE = float(os.getenv("LLM_KEY_RESERVED_SHARE", "0.3"))  # kept for the key's own modules
+LLM_KEY_COOLDOWN_SECONDS = float(os.getenv("LLM_KEY_COOLDOWN_SECONDS", "60"))  # quarantine after a 429
+LLM_KEY_MAX_WAIT_SECONDS = float(os.getenv("LLM_KEY_MAX_WAIT_SECONDS", "10"))  # then give up with 503
+
+# Which key suffix "owns" each module; modules not listed own the key named after them.
+MODULE_KEYS = {"coding": "TECHNICAL", "gd": "INTERVIEW"}
+
+class PoolExhausted(Exception):
+    """No key can take the call within LLM_KEY_MAX_WAIT_SECONDS."""
+
+class ApiKey:
+    def __init__(self, name, value, owner):
+        self.name = name  # env var name; safe to show in stats, unlike the value
+        self.value = value
+        self.owner = owner  # key suffix, e.g. "INTERVIEW"; None for the shared GEMINI_API_KEY
+        self.window = deque()  # [timestamp, tokens] per call in the current window
+        self.quarantined_until = 0.0
+        self.rate_limited = 0
+
+    def _trim(self, now):
+        while self.window and now - self.window[0][0] >= LLM_KEY_WINDOW_SECONDS:
+            self.window.popleft()
+
+    def usage(self, now):
+        """(requests, tokens) in the sliding window."""
+        self._trim(now)
+        return len(self.window), sum(entry[1] for entry in self.window)
+
+    def load(self, now):
+        requests, tokens = self.usage(now)
+        return max(requests / LLM_KEY_RPM, tokens / LLM_KEY_TPM)
+
+    def has_budget(self, module, tokens, now):
+        requests, used = self.usage(now)
+        # Other modules may only use the unreserved part of a module's key
+        share = 1.0 if self.owner is None or self.owner == owner_of(module) else 1.0 - LLM_KEY_RESERVED_SHARE
+        return requests + 1 <= LLM_KEY_RPM * share and used + tokens <= LLM_KEY_TPM * share
+
+    def next_free_at(self, now):
+        """Earliest time a window slot frees up (or the quarantine ends)."""
+        self._trim(now)
+        free_at = self.window[0][0] + LLM_KEY_WINDOW_SECONDS if self.window else now
+        return max(free_at, self.quarantined_until)
+
+def owner_of(module):
+    return MODULE_KEYS.get(module, (module or "").upper())
+
+class KeyPool:
+    def __init__(self, environ=None):
+        environ = os.environ if environ is None else environ
+        self.keys = []
+        seen = set()
+        for name in sorted(environ):
+            value = environ[name]
+            if not (name == KEY_PREFIX or name.startswith(KEY_PREFIX + "_")) or not value or value in seen:
+                continue
+            seen.add(value)
+            self.keys.append(ApiKey(name, value, name[len(KEY_PREFIX) + 1:] or None))
+
+    def pick(self, module, tokens, usable=lambda key: True):
+        """Least-loaded eligible key, or None. Ties go to the module's own key."""
+        now = time.monotonic()
+        owner = owner_of(module)
+        eligible = [
+            key for key in self.keys
+            if key.quarantined_until <= now and key.has_budget(module, tokens, now) and usable(key)
+        ]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda key: (key.load(now), key.owner != owner))
+
+    async def acquire(self, module, tokens, usable=lambda key: True):
+        """Picks a key and charges the call to its window. Returns (key, entry) for settle().
+
+        Waits (up to LLM_KEY_MAX_WAIT_SECONDS) for budget to free up; fails at once if usable()
+        rules out every key, e.g. when all their circuit breakers are open.
+        """
+        if not self.keys:
+            raise PoolExhausted("No Gemini API keys configured")
+        if not any(usable(key) for key in self.keys):
+            raise PoolExhausted("AI service temporarily unavailable, please retry shortly")
+        deadline = time.monotonic() + LLM_KEY_MAX_WAIT_SECONDS
+        while True:
+            key = self.pick(module, tokens, usable)
+            now = time.monotonic()
+            if key is not None:
+                entry = [now, tokens]
+                key.window.append(entry)
+                return key, entry
+            wait = min(key.next_free_at(now) for key in self.keys) - now
+            if now + max(wait, 0.05) > deadline:
+                raise PoolExhausted("All Gemini API keys are at their quota, please retry shortly")
+            await asyncio.sleep(max(wait, 0.05))
+
+    def settle(self, entry, tokens):
+        """Replaces the estimate charged at acquire() with the real token count."""
+        if tokens:
+            entry[1] = tokens
+
+    def quarantine(self, key):
+        key.rate_limited += 1
+        key.quarantined_until = time.monotonic() + LLM_KEY_COOLDOWN_SECONDS
+        print(f"⚠️ {key.name} rate limited; quarantined for {LLM_KEY_COOLDOWN_SECONDS:.0f}s")
+
+    def get_stats(self):
+        now = time.monotonic()
+        stats = {}
+        for key in self.keys:
+            requests, tokens = key.usage(now)
+            stats[key.name] = {
+                "requests_in_window": requests,
+                "tokens_in_window": tokens,
+                "load": round(key.load(now), 3),
+                "quarantined_for": round(max(0.0, key.quarantined_until - now), 1),
+                "rate_limited": key.rate_limited,
+            }
+        return stats
+
+key_pool = KeyPool()
@@ -0,0 +1,183 @@
+# backend/leaderboard_index.py
+# In-process ranked view of user_xp. Reads (top N, page k, rank of any user) are served from
+# memory in O(log n + page size); the XP write paths publish the rows they just committed.
+import random
+import threading
+
+MAX_LEVEL = 32
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+class IndexableSkipList:
+    """Sorted keys with O(log n) insert, remove, rank and positional lookup (widths on every link)."""
+
+    def __init__(self):
+        self.head = _Node(None, MAX_LEVEL)
+        self.size = 0
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        chain, steps_at = [None] * MAX_LEVEL, [0] * MAX_LEVEL
+        node, steps = self.head, 0
+        for lvl in reversed(range(MAX_LEVEL)):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                steps += node.width[lvl]
+                node = node.next[lvl]
+            chain[lvl], steps_at[lvl] = node, steps
+
+        new = _Node(key, self._random_level())
+        for lvl in range(MAX_LEVEL):
+            prev = chain[lvl]
+            if lvl < len(new.next):
+                new.next[lvl] = prev.next[lvl]
+                prev.next[lvl] = new
+                new.width[lvl] = prev.width[lvl] - (steps - steps_at[lvl])
+                prev.width[lvl] = steps - steps_at[lvl] + 1
+            else:
+                prev.width[lvl] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * MAX_LEVEL
+        node = self.head
+        for lvl in reversed(range(MAX_LEVEL)):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                node = node.next[lvl]
+            chain[lvl] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            return False
+        for lvl in range(MAX_LEVEL):
+            prev = chain[lvl]
+            if prev.next[lvl] is target:
+                prev.width[lvl] += target.width[lvl] - 1
+                prev.next[lvl] = target.next[lvl]
+            else:
+                prev.width[lvl] -= 1
+        self.size -= 1
+        return True
+
+    def rank(self, key):
+        """0-based position of key (must be present)."""
+        node, steps = self.head, 0
+        for lvl in reversed(range(MAX_LEVEL)):
+            while node.next[lvl] is not None and node.next[lvl].key <= key:
+                steps += node.width[lvl]
+                node = node.next[lvl]
+        return steps - 1
+
+    def slice(self, start, count):
+        """Keys at positions [start, start + count)."""
+        if start >= self.size or count <= 0:
+            return []
+        node, steps = self.head, -1
+        for lvl in reversed(range(MAX_LEVEL)):
+            while node.next[lvl] is not None and steps + node.width[lvl] <= start:
+                steps += node.width[lvl]
+                node = node.next[lvl]
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class LeaderboardIndex:
+    """Ranks users by total XP (desc), ties broken by user_id (asc), like the old SQL ORDER BY."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # one rebuild at a time; the buffer belongs to it
+        self._ranked = IndexableSkipList()
+        self._entries = {}  # user_id -> row from xp_ledger.LEADERBOARD_ROW_QUERY
+        self.loaded = False
+        self._pending = None  # [(apply, args)] made while a load is running
+
+    @staticmethod
+    def _key(row):
+        return (-float(row["total_xp"]), row["user_id"])
+
+    def load(self, fetch_rows):
+        """Rebuilds the index from fetch_rows(). Publishes made while the rows are read and ranked
+        are buffered and replayed after the swap, so the rebuild never rolls them back."""
+        with self._load_lock:
+            self._load(fetch_rows)
+
+    def _load(self, fetch_rows):
+        with self._lock:
+            self._pending = []
+        try:
+            rows = fetch_rows()
+            ranked, entries = IndexableSkipList(), {}
+            for row in rows:
+                entries[row["user_id"]] = row
+                if row["total_xp"] > 0:
+                    ranked.insert(self._key(row))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._ranked, self._entries, self.loaded = ranked, entries, True
+            pending, self._pending = self._pending, None
+            for apply, args in pending:
+                apply(*args)
+
+    def publish(self, row):
+        """Replaces one user's row. Users with 0 XP stay off the board, as before."""
+        if not row:
+            return
+        with self._lock:
+            self._apply(self._publish, row)
+
+    def update_profile(self, user_id, **fields):
+        with self._lock:
+            self._apply(self._update_profile, user_id, fields)
+
+    def _apply(self, apply, *args):
+        # Caller holds _lock
+        if self._pending is not None:
+            self._pending.append((apply, args))
+        apply(*args)
+
+    def _publish(self, row):
+        old = self._entries.get(row["user_id"])
+        if old is not None and old["total_xp"] > 0:
+            self._ranked.remove(self._key(old))
+        self._entries[row["user_id"]] = row
+        if row["total_xp"] > 0:
+            self._ranked.insert(self._key(row))
+
+    def _update_profile(self, user_id, fields):
+        if user_id in self._entries:
+            self._entries[user_id] = {**self._entries[user_id], **fields}
+
+    def page(self, offset, limit):
+        """[(rank, row), ...] with 1-based ranks."""
+        with self._lock:
+            keys = self._ranked.slice(offset, limit)
+            return [(offset + i + 1, self._entries[user_id]) for i, (_, user_id) in enumerate(keys)]
+
+    def rank_of(self, user_id):
+        """(rank, row); rank is None for users who are not on the board yet."""
+        with self._lock:
+            row = self._entries.get(user_id)
+            if row is None or row["total_xp"] <= 0:
+                return None, row
+            return self._ranked.rank(self._key(row)) + 1, row
+
+    def __len__(self):
+        return self._ranked.size
+
+leaderboard = LeaderboardIndex()
@@ -0,0 +1,229 @@
+# backend/llm_gateway.py
+# Single entry point for every Gemini call. Callers name their module ("interview", "coding", ...)
+# and key_pool.py picks the API key. Owns one long-lived client per API key, caps
+# concurrent calls per key, retries transient failures with exponential backoff + jitter,
+# falls back to the next model, and opens a circuit breaker during provider outages so
+# requests fail fast instead of queueing behind timeouts.
+import os
+import time
+import random
+import asyncio
+import httpx
+from google import genai
+from google.genai import types, errors
+from key_pool import key_pool, PoolExhausted
+from llm_scheduler import scheduler
+
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")  # e.g. http://127.0.0.1:8808 for fake_llm.py
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # in-flight calls per API key
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))  # attempts per model
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))  # consecutive failures
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1000"))  # charged up front, settled after
+
+DEFAULT_MODELS = ("gemini-2.5-flash", "gemini-2.5-flash-lite")
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+# Timeouts and connection errors from the HTTP transport (google-genai uses aiohttp when installed)
+TRANSPORT_ERRORS = (httpx.TransportError, asyncio.TimeoutError, ConnectionError)
+try:
+    import aiohttp
+    TRANSPORT_ERRORS += (aiohttp.ClientError,)
+except ImportError:
+    pass
+
+class LLMUnavailable(Exception):
+    """No key can take the call (none configured, all at quota, or all circuits open)."""
+
+# --- Circuit Breaker ---
+class CircuitBreaker:
+    def __init__(self, threshold=LLM_BREAKER_THRESHOLD, cooldown=LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def available(self):
+        """Closed: always. Open: never. After the cooldown: one probe call at a time."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def allow(self):
+        """available(), and claims the probe slot when half-open."""
+        if not self.available():
+            return False
+        if self.state == "half_open":
+            self.probing = True
+        return True
+
+    def release_probe(self):
+        """Gives the probe slot back without a verdict (the call was cancelled or hit a quota)."""
+        self.probing = False
+
+    def record_success(self):
+        self.failures, self.opened_at, self.probing = 0, None, False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            if self.opened_at is None or self.probing:
+                print(f"⚠️ LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at, self.probing = time.monotonic(), False
+
+# --- Per-key State ---
+class _KeyState:
+    def __init__(self, api_key):
+        http_options = types.HttpOptions(base_url=GEMINI_BASE_URL, timeout=int(LLM_TIMEOUT_SECONDS * 1000))
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
+        self.semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self.breaker = CircuitBreaker()
+        self.in_flight = 0
+        self.stats = {"attempts": 0, "succeeded": 0, "failed": 0}
+
+_keys = {}
+stats = {"calls": 0, "streams": 0, "retries": 0, "fallbacks": 0, "unavailable": 0}
+
+def _state(api_key):
+    if api_key.name not in _keys:
+        _keys[api_key.name] = _KeyState(api_key.value)
+    return _keys[api_key.name]
+
+def _usable(api_key):
+    return _state(api_key).breaker.available()
+
+def _retryable(error):
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_CODES
+    return isinstance(error, TRANSPORT_ERRORS)
+
+def backoff_delay(attempt):
+    """Full jitter: uniform in [0, min(max, base * 2^attempt)]."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+def has_keys():
+    return bool(key_pool.keys)
+
+def estimate_tokens(contents):
+    """Rough prompt size (~4 characters per token) plus an allowance for the reply."""
+    return len(str(contents)) // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+async def generate(module, contents, models=DEFAULT_MODELS, config=None, priority="batch"):
+    """generate_content on the best key for `module` (see key_pool.py). Returns the SDK response.
+
+    `priority` is the llm_scheduler class ("interactive", "batch" or "background").
+    Every attempt re-picks a key, so a retry after a 429 or an outage on one key lands on another.
+    """
+    stats["calls"] += 1
+
+    async def call(client, model):
+        return await client.aio.models.generate_content(model=model, contents=contents, config=config)
+
+    async with scheduler.slot(priority):
+        key, entry, response = await _call_with_retries(module, contents, models, call)
+        key.semaphore.release()
+        _settle(entry, response)
+        return response
+
+async def generate_stream(module, contents, models=DEFAULT_MODELS, config=None, priority="interactive"):
+    """Like generate(), but yields text chunks as they arrive (generate_content_stream).
+
+    Retries and fallback only happen before the first chunk; a stream that breaks midway raises.
+    """
+    stats["calls"] += 1
+    stats["streams"] += 1
+
+    async def call(client, model):
+        stream = await client.aio.models.generate_content_stream(model=model, contents=contents, config=config)
+        return stream, await anext(stream)  # errors surface on the first chunk, inside the retry loop
+
+    async with scheduler.slot(priority):
+        key, entry, (stream, chunk) = await _call_with_retries(module, contents, models, call)
+        try:
+            while True:
+                if chunk.text:
+                    yield chunk.text
+                last = chunk
+                try:
+                    chunk = await anext(stream)
+                except StopAsyncIteration:
+                    break
+            _settle(entry, last)
+        finally:
+            key.semaphore.release()
+
+def _settle(entry, response):
+    usage = getattr(response, "usage_metadata", None)
+    key_pool.settle(entry, getattr(usage, "total_token_count", None))
+
+async def _call_with_retries(module, contents, models, call):
+    """Runs call(client, model) until it succeeds. Returns (key state, pool entry, result);
+    the key's semaphore is still held and the caller must release it."""
+    tokens = estimate_tokens(contents)
+    last_error = None
+    for i, model in enumerate(models):
+        if i:
+            stats["fallbacks"] += 1
+        for attempt in range(LLM_MAX_RETRIES):
+            try:
+                api_key, entry = await key_pool.acquire(module, tokens, usable=_usable)
+            except PoolExhausted as e:
+                stats["unavailable"] += 1
+                raise LLMUnavailable(str(e)) from last_error
+            key = _state(api_key)
+            # Claims the half-open probe if this key is recovering; every exit must settle it
+            probe = key.breaker.allow() and key.breaker.state == "half_open"
+            try:
+                key.stats["attempts"] += 1
+                await key.semaphore.acquire()
+                key.in_flight += 1
+                try:
+                    result = await call(key.client, model)
+                except BaseException as e:
+                    key.in_flight -= 1
+                    key.semaphore.release()
+                    if not isinstance(e, Exception):
+                        raise  # cancelled
+                    if not isinstance(e, (errors.APIError,) + TRANSPORT_ERRORS):
+                        raise  # a bug, not the provider: retrying or falling back would hide it
+                    last_error = e
+                    key.stats["failed"] += 1
+                    if isinstance(e, errors.APIError) and e.code == 429:
+                        key_pool.quarantine(api_key)  # no backoff: the next attempt uses another key
+                        continue
+                    if not _retryable(e):
+                        key.breaker.record_success()  # the provider answered; this model/request is the problem
+                        break  # e.g. 404 for this model: try the next one
+                    key.breaker.record_failure()
+                    if attempt < LLM_MAX_RETRIES - 1:
+                        stats["retries"] += 1
+                        delay = backoff_delay(attempt)
+                        print(f"⚠️ Gemini {model} failed on {api_key.name} ({e}). Retrying in {delay:.1f}s... (Attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+                        await asyncio.sleep(delay)
+                    continue
+                key.in_flight -= 1
+                key.breaker.record_success()
+                key.stats["succeeded"] += 1
+                return key, entry, result
+            finally:
+                if probe and key.breaker.probing:
+                    key.breaker.release_probe()  # cancelled, or a 429 that says nothing about health
+    raise last_error
+
+def get_stats():
+    """Gateway counters plus, per key (by env var name, never the value), pool and client state."""
+    pool_stats = key_pool.get_stats()
+    for name, key in _keys.items():
+        pool_stats.setdefault(name, {}).update(
+            **key.stats, in_flight=key.in_flight, circuit=key.breaker.state,
+            consecutive_failures=key.breaker.failures,
+        )
+    return {**stats, "keys": pool_stats}
@@ -0,0 +1,168 @@
+# backend/llm_scheduler.py
+# Admission control for LLM work, in front of the gateway's key pool. Three classes:
+#   interactive - live interview turns; always dispatched before anything queued
+#   batch       - user-facing but latency-tolerant (test/problem generation, code review, GD evaluation)
+#   background  - MCQ pool refills and the build_massive_* miners
+# batch and background share the non-reserved slots by weighted fair queuing, and that share
+# shrinks (AIMD) while the interactive p95 latency is above target.
+import os
+import time
+import asyncio
+import httpx
+from collections import deque
+from contextlib import asynccontextmanager
+from percentiles import percentile
+
+LLM_SCHEDULER_SLOTS = int(os.getenv("LLM_SCHEDULER_SLOTS", "12"))  # concurrent LLM calls per process
+LLM_INTERACTIVE_RESERVED_SLOTS = int(os.getenv("LLM_INTERACTIVE_RESERVED_SLOTS", "4"))  # never given to bulk work
+LLM_INTERACTIVE_P95_TARGET = float(os.getenv("LLM_INTERACTIVE_P95_TARGET", "6"))  # seconds
+LLM_BULK_WEIGHTS = {"batch": 3, "background": 1}
+LATENCY_WINDOW_SECONDS = 60
+ADJUST_INTERVAL_SECONDS = 1.0
+PLACIFY_API_URL = os.getenv("PLACIFY_API_URL")  # lets out-of-process miners back off too
+
+PRIORITIES = ("interactive", "batch", "background")
+
+class _Job:
+    __slots__ = ("priority", "tag", "enqueued", "future")
+
+    def __init__(self, priority, tag):
+        self.priority = priority
+        self.tag = tag
+        self.enqueued = time.monotonic()
+        self.future = asyncio.get_running_loop().create_future()
+
+class LLMScheduler:
+    def __init__(self, slots=LLM_SCHEDULER_SLOTS, reserved=LLM_INTERACTIVE_RESERVED_SLOTS):
+        self.slots = slots
+        self.bulk_cap = max(1, slots - reserved)
+        self.bulk_limit = self.bulk_cap  # current (throttled) share for batch + background
+        self.queues = {p: deque() for p in PRIORITIES}
+        self.running = {p: 0 for p in PRIORITIES}
+        self.completed = {p: 0 for p in PRIORITIES}
+        self.waits = {p: deque(maxlen=500) for p in PRIORITIES}
+        self.interactive_latency = deque()  # (finished_at, seconds)
+        self.virtual_time = 0.0
+        self.last_tag = {p: 0.0 for p in LLM_BULK_WEIGHTS}
+        self._adjusted_at = 0.0
+
+    # --- Throttling ---
+    def interactive_p95(self, now=None):
+        now = now or time.monotonic()
+        while self.interactive_latency and now - self.interactive_latency[0][0] > LATENCY_WINDOW_SECONDS:
+            self.interactive_latency.popleft()
+        return percentile([seconds for _, seconds in self.interactive_latency], 95)
+
+    def _adjust(self):
+        """Halve the bulk share (down to one slot) while interactive p95 is over target, add a slot back per interval otherwise."""
+        now = time.monotonic()
+        if now - self._adjusted_at < ADJUST_INTERVAL_SECONDS:
+            return
+        self._adjusted_at = now
+        p95 = self.interactive_p95(now)
+        if p95 is not None and p95 > LLM_INTERACTIVE_P95_TARGET:
+            self.bulk_limit = max(1, self.bulk_limit // 2)  # never starve batch/background entirely
+        elif self.bulk_limit < self.bulk_cap:
+            self.bulk_limit += 1
+
+    @property
+    def throttled(self):
+        return self.bulk_limit < self.bulk_cap
+
+    # --- Dispatch ---
+    def _grant(self, priority):
+        job = self.queues[priority].popleft()
+        self.running[priority] += 1
+        if priority in LLM_BULK_WEIGHTS:
+            self.virtual_time = max(self.virtual_time, job.tag)
+        job.future.set_result(None)
+
+    def _dispatch(self):
+        self._adjust()
+        while sum(self.running.values()) < self.slots:
+            # Interactive work always goes first
+            if self.queues["interactive"]:
+                self._grant("interactive")
+                continue
+            bulk_running = self.running["batch"] + self.running["background"]
+            heads = [p for p in LLM_BULK_WEIGHTS if self.queues[p]]
+            if not heads or bulk_running >= self.bulk_limit:
+                return
+            # Weighted fair queuing: smallest virtual finish tag wins
+            self._grant(min(heads, key=lambda p: self.queues[p][0].tag))
+
+    def _release(self, priority):
+        self.running[priority] -= 1
+        self.completed[priority] += 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority="batch"):
+        """Holds one LLM call slot for the duration of the block."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority '{priority}'")
+        tag = 0.0
+        if priority in LLM_BULK_WEIGHTS:
+            tag = max(self.virtual_time, self.last_tag[priority]) + 1.0 / LLM_BULK_WEIGHTS[priority]
+            self.last_tag[priority] = tag
+        job = _Job(priority, tag)
+        self.queues[priority].append(job)
+        self._dispatch()
+        try:
+            while not job.future.done():
+                # Re-check periodically so a throttled share recovers even when nothing completes
+                await asyncio.wait({job.future}, timeout=ADJUST_INTERVAL_SECONDS)
+                if not job.future.done():
+                    self._dispatch()
+        except asyncio.CancelledError:
+            if job.future.done():
+                self._release(priority)  # granted a slot we will never use
+            else:
+                self.queues[priority].remove(job)
+            raise
+
+        started = time.monotonic()
+        self.waits[priority].append(started - job.enqueued)
+        try:
+            yield
+        finally:
+            if priority == "interactive":
+                finished = time.monotonic()
+                self.interactive_latency.append((finished, finished - started))
+            self._release(priority)
+
+    def get_stats(self):
+        return {
+            "slots": self.slots,
+            "bulk_limit": self.bulk_limit,
+            "throttled": self.throttled,
+            "interactive_p95_seconds": self.interactive_p95(),
+            "classes": {
+                p: {
+                    "queued": len(self.queues[p]),
+                    "running": self.running[p],
+                    "completed": self.completed[p],
+                    "wait_p50_seconds": percentile(list(self.waits[p]), 50),
+                    "wait_p95_seconds": percentile(list(self.waits[p]), 95),
+                    "oldest_queued_seconds": round(time.monotonic() - self.queues[p][0].enqueued, 2) if self.queues[p] else 0,
+                }
+                for p in PRIORITIES
+            },
+        }
+
+scheduler = LLMScheduler()
+
+async def wait_for_api_headroom(poll_seconds=10):
+    """For background jobs in other processes: wait while the API (PLACIFY_API_URL) is throttling bulk work."""
+    if not PLACIFY_API_URL:
+        return
+    async with httpx.AsyncClient(timeout=5) as client:
+        while True:
+            try:
+                resp = await client.get(f"{PLACIFY_API_URL}/health/llm")
+                if not resp.json()["scheduler"]["throttled"]:
+                    return
+                print("⏸️ API is busy with interactive traffic; background miner waiting...")
+            except Exception:
+                return  # API unreachable: do not block the miner on it
+            await asyncio.sleep(poll_seconds)
@@ -2,6 +2,8 @@
 import os
 import re
 import json
+import asyncio
+import base64
 import mysql.connector
 from fastapi import FastAPI, Body, HTTPException, Depends, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,10 +19,26 @@ import shutil
 import uuid
 import nltk
 import interview_models
+import xp_ledger
+import topic_categories
+import question_bank
+import singleflight
+import llm_gateway
+from llm_scheduler import scheduler
+import interview_memory
+import interview_openers
+from interview_state import interview_states
+import sandbox_pool
+import sandbox_executor
+import sandbox_cpus
+import compile_cache
+from migrations import run_migrations
+from xp_ledger import calculate_level, next_level_xp
+from leaderboard_index import leaderboard
 from sqlalchemy import text
 
 # Import from the new database file and other route files
-from database import get_cursor, engine, Base
+from database import get_cursor, engine, warm_pool, get_pool_stats, get_async_pool, close_async_pool
 from aptitude_routes import router as aptitude_router
 from technical_routes import router as technical_router
 from coding_routes import router as coding_router
@@ -31,7 +49,9 @@ from gd_routes import router as gd_router
 # --- Setup ---
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "60"))
+LEADERBOARD_RETRY_SECONDS = int(os.getenv("LEADERBOARD_RETRY_SECONDS", "5"))  # until the first load succeeds
+MAX_HISTORY_PAGE = 100
 
 try:
     nltk.data.find('tokenizers/punkt')
@@ -46,6 +66,71 @@ except LookupError:
 
 app = FastAPI(title="Placify Backend", version="1.0.0")
 
+def prepare_database():
+    """Applies pending schema migrations, then loads the topic registry."""
+    conn = None
+    try:
+        conn = engine.raw_connection()
+        run_migrations(conn)
+        cursor = conn.cursor(dictionary=True)
+        topic_categories.load(cursor)
+        cursor.close()
+    except Exception as e:
+        print(f"⚠️ Could not prepare database: {e}")
+    finally:
+        if conn: conn.close()
+
+def refresh_leaderboard():
+    """Rebuilds the in-memory leaderboard from user_xp. Only the startup hook and the refresh loop call it."""
+    conn = None
+    try:
+        conn = engine.raw_connection()
+        cursor = conn.cursor(dictionary=True)
+        leaderboard.load(lambda: xp_ledger.load_leaderboard_rows(cursor))
+    except Exception as e:
+        print(f"⚠️ Could not load leaderboard: {e}")
+    finally:
+        if conn: conn.close()
+
+async def leaderboard_refresh_loop():
+    # Each worker publishes its own writes instantly; this picks up the other workers' writes.
+    # If the startup load failed (DB down), it retries sooner until one succeeds.
+    while True:
+        await asyncio.sleep(LEADERBOARD_REFRESH_SECONDS if leaderboard.loaded else LEADERBOARD_RETRY_SECONDS)
+        await asyncio.to_thread(refresh_leaderboard)
+
+def require_leaderboard():
+    if not leaderboard.loaded:
+        raise HTTPException(
+            status_code=503, detail="Leaderboard is still loading. Try again shortly.",
+            headers={"Retry-After": str(LEADERBOARD_RETRY_SECONDS)},
+        )
+
+@app.on_event("startup")
+async def on_startup():
+    await asyncio.to_thread(warm_pool)
+    await asyncio.to_thread(prepare_database)
+    await asyncio.to_thread(refresh_leaderboard)
+    await asyncio.to_thread(question_bank.load_all)
+    app.state.leaderboard_task = asyncio.create_task(leaderboard_refresh_loop())
+    try:
+        await get_async_pool()
+    except Exception as e:
+        print(f"⚠️ Could not open async DB pool: {e}")
+    try:
+        interview_openers.warm(await asyncio.to_thread(interview_openers.popular_pairs))
+    except Exception as e:
+        print(f"⚠️ Could not warm interview openers: {e}")
+    # Containers start in background threads; Docker being down only disables the pool
+    await asyncio.to_thread(sandbox_pool.warm)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    app.state.leaderboard_task.cancel()
+    await close_async_pool()
+    sandbox_executor.shutdown()
+    await asyncio.to_thread(sandbox_pool.shutdown)
+
 # --- Mount Static Files Directory ---
 os.makedirs("static/profile_pics", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -111,6 +196,16 @@ class ResetPasswordWithIDRequest(BaseModel):
     password: str
 
 # ---- Utility Functions ----
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), row_id]).encode()).decode()
+
+def decode_cursor(token: str):
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Malformed cursor")
+
 def send_email(to_email: str, subject: str, body: str):
     msg = EmailMessage()
     msg["Subject"] = subject
@@ -134,6 +229,33 @@ def validate_password(password: str):
 def health():
     return {"status": "ok"}
 
+@app.get("/health/db")
+def health_db():
+    return get_pool_stats()
+
+@app.get("/health/llm")
+def health_llm():
+    return {
+        "gateway": llm_gateway.get_stats(),
+        "scheduler": scheduler.get_stats(),
+        "singleflight": singleflight.get_stats(),
+        "interview": {
+            "prompt_tokens_by_turn": interview_memory.get_stats(),
+            "state_cache": interview_states.get_stats(),
+            "openers": interview_openers.get_stats(),
+        },
+    }
+
+@app.get("/health/sandbox")
+def health_sandbox():
+    return {
+        "pool_size": sandbox_pool.SANDBOX_POOL_SIZE,
+        "languages": sandbox_pool.get_stats(),
+        "queues": sandbox_executor.get_stats(),
+        "cpus": sandbox_cpus.slots.get_stats(),
+        "compile_cache": compile_cache.get_stats(),
+    }
+
 # ---- Password Reset Routes ----
 @app.post("/api/forgot-password")
 def forgot_password(req: ForgotPasswordRequest, db_cursor: tuple = Depends(get_cursor)):
@@ -220,6 +342,7 @@ async def upload_profile_picture(user_id: int, file: UploadFile = File(...), db_
     profile_picture_url = f"/static/profile_pics/{unique_filename}"
     cursor.execute("UPDATE users SET profile_picture_url = %s WHERE id = %s", (profile_picture_url, user_id))
     db.commit()
+    leaderboard.update_profile(user_id, profile_picture_url=profile_picture_url)
 
     return {"message": "Profile picture updated successfully", "profile_picture_url": profile_picture_url}
 
@@ -232,43 +355,97 @@ def login_user(user: LoginUser, db_cursor: tuple = Depends(get_cursor)):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {"message": "Login successful", "user": record}
 
+# Keyset pagination: each history list is ordered by (timestamp, id) DESC and paged with an opaque
+# cursor pointing at the last row returned, so deep pages cost the same as the first one.
+HISTORY_QUERIES = {
+    "tests": ("SELECT id, topic, mode, score, total, created_at FROM test_attempts WHERE user_id=%s", "created_at"),
+    "coding": ("SELECT id, problem_title, difficulty, is_correct, created_at FROM coding_attempts WHERE user_id=%s", "created_at"),
+    "interviews": (
+        "SELECT id, interview_type, job_role, overall_score, start_time as created_at FROM interview_sessions WHERE user_id=%s AND end_time IS NOT NULL",
+        "start_time",
+    ),
+}
+
+def fetch_history_page(cursor, name: str, user_id: int, after: str | None, limit: int):
+    query, sort_col = HISTORY_QUERIES[name]
+    params = [user_id]
+    if after:
+        try:
+            ts, last_id = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {name} cursor")
+        query += f" AND ({sort_col} < %s OR ({sort_col} = %s AND id < %s))"
+        params += [ts, ts, last_id]
+    cursor.execute(query + f" ORDER BY {sort_col} DESC, id DESC LIMIT %s", (*params, limit + 1))
+    rows = cursor.fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last["created_at"], last["id"])
+
 @app.get("/api/user/{user_id}")
-def get_user_details(user_id: int, db_cursor: tuple = Depends(get_cursor), page: int = 1, limit: int = 20):
+def get_user_details(
+    user_id: int,
+    db_cursor: tuple = Depends(get_cursor),
+    limit: int = 20,
+    tests_cursor: str | None = None, tests_limit: int | None = None,
+    coding_cursor: str | None = None, coding_limit: int | None = None,
+    interviews_cursor: str | None = None, interviews_limit: int | None = None,
+):
+    """Profile + one page of each history list. `limit` is the default page size for all three;
+    pass the `next_cursors` values back as *_cursor to fetch the following page of a list, and
+    *_limit=0 to skip a list that has run out."""
     cursor, db = db_cursor
     cursor.execute("SELECT id, fname, lname, email, year, field, profile_picture_url FROM users WHERE id=%s", (user_id,))
     user = cursor.fetchone()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    offset = (page - 1) * limit
-    cursor.execute(
-        "SELECT id, topic, mode, score, total, created_at FROM test_attempts WHERE user_id=%s ORDER BY created_at DESC LIMIT %s OFFSET %s",
-        (user_id, limit, offset)
-    )
-    tests = cursor.fetchall()
 
-    cursor.execute(
-        "SELECT problem_title, difficulty, is_correct, created_at FROM coding_attempts WHERE user_id=%s ORDER BY created_at DESC",
-        (user_id,)
-    )
-    coding_attempts = cursor.fetchall()
+    def page(name, after, n):
+        if n == 0:
+            return [], None
+        return fetch_history_page(cursor, name, user_id, after, min(max(n if n is not None else limit, 1), MAX_HISTORY_PAGE))
+
+    tests, tests_next = page("tests", tests_cursor, tests_limit)
+    coding_attempts, coding_next = page("coding", coding_cursor, coding_limit)
+    interviews, interviews_next = page("interviews", interviews_cursor, interviews_limit)
 
+    return {
+        "user": user, 
+        "tests": tests, 
+        "coding": coding_attempts,
+        "interviews": interviews,
+        "next_cursors": {"tests": tests_next, "coding": coding_next, "interviews": interviews_next},
+    }
+
+@app.get("/api/user/{user_id}/summary")
+def get_user_summary(user_id: int, db_cursor: tuple = Depends(get_cursor)):
+    """Dashboard first paint: profile plus ledger counters, no history rows."""
+    cursor, db = db_cursor
     cursor.execute(
         """
-        SELECT id, interview_type, job_role, overall_score, start_time as created_at 
-        FROM interview_sessions 
-        WHERE user_id=%s AND end_time IS NOT NULL 
-        ORDER BY start_time DESC
+        SELECT u.id, u.fname, u.lname, u.email, u.year, u.field, u.profile_picture_url,
+               x.total_xp, x.aptitude_tests, x.coding_solved, x.interviews, x.active_days
+        FROM users u LEFT JOIN user_xp x ON x.user_id = u.id
+        WHERE u.id=%s
         """,
         (user_id,)
     )
-    interviews = cursor.fetchall()
+    row = cursor.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Every attempt, not just the passed levels the ledger counts (index on user_id)
+    cursor.execute("SELECT COUNT(*) AS tests_taken, AVG(score) AS avg_test_score FROM test_attempts WHERE user_id=%s", (user_id,))
+    tests = cursor.fetchone()
 
+    xp = int(row.pop("total_xp") or 0)
+    level = calculate_level(xp)
+    stats = {key: row.pop(key) or 0 for key in ("aptitude_tests", "coding_solved", "interviews", "active_days")}
     return {
-        "user": user, 
-        "tests": tests, 
-        "coding": coding_attempts,
-        "interviews": interviews
+        "user": row, "xp": xp, "level": level, "next_level_xp": next_level_xp(level), **stats,
+        "tests_taken": tests["tests_taken"],
+        "avg_test_score": round(float(tests["avg_test_score"]), 1) if tests["avg_test_score"] is not None else 0,
     }
 
 # ---- Test Submission & Mode Unlock Routes ----
@@ -283,7 +460,9 @@ def submit_test(data: SubmitTest = Body(...), db_cursor: tuple = Depends(get_cur
         "INSERT INTO test_attempts (user_id, topic, mode, score, total, time_taken) VALUES (%s,%s,%s,%s,%s,%s)",
         (data.user_id, data.topic, data.mode, data.score, data.total, data.time_taken)
     )
+    xp_row = xp_ledger.record_test_attempt(cursor, data.user_id, data.topic, data.mode, data.score, data.total)
     db.commit()
+    leaderboard.publish(xp_row)
     
     passing_score = int(data.total * 0.75)
     return {"message": "Test recorded", "passed": data.score >= passing_score}
@@ -317,60 +496,17 @@ def get_best_score(req: BestScoreRequest, db_cursor: tuple = Depends(get_cursor)
 # ---- NEW GAMIFICATION & LEADERBOARD SYSTEM (XP, LEVELS, BADGES) ----
 # =========================================================================
 
-def calculate_level(xp):
-    if xp >= 1500: return 5
-    if xp >= 700: return 4
-    if xp >= 300: return 3
-    if xp >= 100: return 2
-    return 1
-
 @app.get("/api/user/{user_id}/gamification")
 def get_user_gamification(user_id: int, db_cursor: tuple = Depends(get_cursor)):
     cursor, db = db_cursor
     try:
-        # ANTI-FARMING: Only count MAX score for each unique test, and only if score >= 15
-        query = """
-        SELECT 
-            (
-                COALESCE((
-                    SELECT SUM(
-                        CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END + 
-                        CASE WHEN max_total > 0 AND (max_score / max_total) >= 0.9 THEN 15 ELSE 0 END
-                    ) 
-                    FROM (
-                        SELECT topic, mode, MAX(score) as max_score, MAX(total) as max_total 
-                        FROM test_attempts 
-                        WHERE user_id = %s 
-                        GROUP BY topic, mode
-                    ) as best_tests
-                    WHERE max_score >= 15
-                ), 0) 
-                + 
-                COALESCE((
-                    SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END) 
-                    FROM (
-                        SELECT problem_title, difficulty 
-                        FROM coding_attempts 
-                        WHERE user_id = %s AND is_correct = 1 
-                        GROUP BY problem_title, difficulty
-                    ) as unique_coding
-                ), 0) 
-                +
-                COALESCE((
-                    SELECT SUM(50 + (overall_score * 5)) 
-                    FROM interview_sessions 
-                    WHERE user_id = %s AND end_time IS NOT NULL
-                ), 0)
-            ) as total_xp,
-            (SELECT COUNT(DISTINCT DATE(created_at)) FROM test_attempts WHERE user_id = %s) as streak
-        """
-        cursor.execute(query, (user_id, user_id, user_id, user_id))
+        # XP comes from the incrementally maintained ledger (see xp_ledger.py), not from the raw attempts.
+        cursor.execute("SELECT total_xp, active_days FROM user_xp WHERE user_id = %s", (user_id,))
         res = cursor.fetchone()
         
         xp = int(res['total_xp']) if res else 0
-        streak = res['streak'] if res else 0
+        streak = res['active_days'] if res else 0
         level = calculate_level(xp)
-        next_level_xp = 100 if level == 1 else (300 if level == 2 else (700 if level == 3 else (1500 if level == 4 else 3000)))
         
         # Fetch counts for Level 4 Attempt Limits
         cursor.execute("SELECT COUNT(*) as c FROM interview_sessions WHERE user_id=%s", (user_id,))
@@ -380,152 +516,65 @@ def get_user_gamification(user_id: int, db_cursor: tuple = Depends(get_cursor)):
         gds_taken = cursor.fetchone()['c']
 
         return { 
-            "xp": xp, "level": level, "next_level_xp": next_level_xp, "streak": streak, 
+            "xp": xp, "level": level, "next_level_xp": next_level_xp(level), "streak": streak, 
             "interviews_taken": interviews_taken, "gds_taken": gds_taken 
         }
     except Exception as e:
         print(f"Gamification Error: {e}")
         return { "xp": 0, "level": 1, "next_level_xp": 100, "streak": 0, "interviews_taken": 0, "gds_taken": 0 }
 
+def leaderboard_entry(rank, row):
+    xp = int(row['test_xp']) + int(row['coding_xp']) + int(row['interview_xp'])
+    level = calculate_level(xp)
+
+    badges = []
+    if row['aptitude_tests'] >= 5: badges.append("🧠 Aptitude Master")
+    if row['coding_solved'] >= 5: badges.append("💻 Tech Ninja")
+    if row['interviews'] >= 2: badges.append("🗣️ GD Star")
+    if not badges: badges.append("🌱 Rising Star")
+
+    return {
+        "rank": rank, "id": row['user_id'], "name": f"{row['fname']} {row['lname']}",
+        "profile_picture_url": row['profile_picture_url'], "xp": xp, "level": level,
+        "next_level_xp": next_level_xp(level), "badges": badges, "streak": min((row['aptitude_tests'] + row['coding_solved']), 30)
+    }
+
 @app.get("/api/leaderboard")
-def get_leaderboard(db_cursor: tuple = Depends(get_cursor)):
-    cursor, db = db_cursor
-    try:
-        # ANTI-FARMING: Global Leaderboard Query Fix
-        query = """
-        SELECT 
-            u.id, 
-            u.fname, 
-            u.lname, 
-            u.profile_picture_url,
-            
-            COALESCE((
-                SELECT SUM(
-                    CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END +
-                    CASE WHEN max_total > 0 AND (max_score / max_total) >= 0.9 THEN 15 ELSE 0 END
-                )
-                FROM (
-                    SELECT user_id, topic, mode, MAX(score) as max_score, MAX(total) as max_total
-                    FROM test_attempts
-                    GROUP BY user_id, topic, mode
-                ) t
-                WHERE t.user_id = u.id AND t.max_score >= 15
-            ), 0) as test_xp,
-            
-            COALESCE((
-                SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
-                FROM (
-                    SELECT user_id, problem_title, difficulty
-                    FROM coding_attempts
-                    WHERE is_correct = 1
-                    GROUP BY user_id, problem_title, difficulty
-                ) c
-                WHERE c.user_id = u.id
-            ), 0) as coding_xp,
-            
-            COALESCE((
-                SELECT SUM(50 + (overall_score * 5)) 
-                FROM interview_sessions 
-                WHERE user_id = u.id AND end_time IS NOT NULL
-            ), 0) as interview_xp,
-            
-            (SELECT COUNT(DISTINCT topic, mode) FROM test_attempts WHERE user_id = u.id AND score >= 15) as aptitude_tests,
-            (SELECT COUNT(DISTINCT problem_title) FROM coding_attempts WHERE user_id = u.id AND is_correct = 1) as coding_solved,
-            (SELECT COUNT(*) FROM interview_sessions WHERE user_id = u.id AND end_time IS NOT NULL) as interviews
-            
-        FROM users u
-        HAVING (test_xp + coding_xp + interview_xp) > 0
-        ORDER BY (test_xp + coding_xp + interview_xp) DESC
-        LIMIT 50;
-        """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        
-        leaderboard = []
-        for rank, row in enumerate(rows):
-            xp = int(row['test_xp']) + int(row['coding_xp']) + int(row['interview_xp'])
-            level = calculate_level(xp)
-            
-            badges = []
-            if row['aptitude_tests'] >= 5: badges.append("🧠 Aptitude Master")
-            if row['coding_solved'] >= 5: badges.append("💻 Tech Ninja")
-            if row['interviews'] >= 2: badges.append("🗣️ GD Star")
-            if not badges: badges.append("🌱 Rising Star")
-            
-            next_level_xp = 100 if level == 1 else (300 if level == 2 else (700 if level == 3 else (1500 if level == 4 else 3000)))
-
-            leaderboard.append({
-                "rank": rank + 1, "id": row['id'], "name": f"{row['fname']} {row['lname']}",
-                "profile_picture_url": row['profile_picture_url'], "xp": xp, "level": level,
-                "next_level_xp": next_level_xp, "badges": badges, "streak": min((row['aptitude_tests'] + row['coding_solved']), 30)
-            })
-            
-        return leaderboard
-    except Exception as e:
-        print(f"❌ Leaderboard Error: {e}")
-        raise HTTPException(status_code=500, detail=f"Database Error: {str(e)}")
+def get_leaderboard(page: int = 1, limit: int = 50):
+    # Served from the in-memory ranked index; never touches MySQL (the refresh loop loads it).
+    require_leaderboard()
+    page, limit = max(page, 1), min(max(limit, 1), 100)
+    return [leaderboard_entry(rank, row) for rank, row in leaderboard.page((page - 1) * limit, limit)]
+
+@app.get("/api/leaderboard/me/{user_id}")
+def get_my_rank(user_id: int, limit: int = 50):
+    require_leaderboard()
+    limit = min(max(limit, 1), 100)
+    rank, row = leaderboard.rank_of(user_id)
+    return {
+        "rank": rank,
+        "page": (rank - 1) // limit + 1 if rank else None,
+        "total_ranked": len(leaderboard),
+        "entry": leaderboard_entry(rank, row) if rank else None,
+    }
 
 @app.get("/api/leaderboard/filter")
 def get_filtered_leaderboard(category: str, db_cursor: tuple = Depends(get_cursor)):
     cursor, db = db_cursor
+    if category == "global": return get_leaderboard()
+    if category not in topic_categories.CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown category '{category}'")
     try:
-        if category == "global": return get_leaderboard(db_cursor)
-
-        query = ""
-        # ANTI-FARMING: Filtered Leaderboard Fixes
-        if category in ["aptitude", "technical"]:
-            topics = "('C Programming', 'C++ Programming', 'Java Programming', 'Python Programming', 'Data Structures & Algorithms', 'Database Management Systems', 'Operating Systems', 'Computer Networks')" if category == "technical" else "('Percentages', 'Profit & Loss', 'Time, Speed & Distance', 'Ratio & Proportion', 'Number System', 'Simple & Compound Interest', 'Permutation & Combination', 'Geometry & Mensuration', 'Series & Patterns', 'Coding-Decoding', 'Blood Relations', 'Direction Sense', 'Grammar', 'Vocabulary', 'Reading Comprehension', 'Final Aptitude Test')"
-            query = f"""
-            SELECT u.id, u.fname, u.lname, u.profile_picture_url,
-                   COALESCE((
-                       SELECT SUM(CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END)
-                       FROM (
-                           SELECT user_id, topic, mode, MAX(score) as max_score 
-                           FROM test_attempts 
-                           WHERE topic IN {topics}
-                           GROUP BY user_id, topic, mode
-                       ) t
-                       WHERE t.user_id = u.id AND t.max_score >= 15
-                   ), 0) as total_xp
-            FROM users u 
-            HAVING total_xp > 0 
-            ORDER BY total_xp DESC LIMIT 50;
-            """
-        elif category == "coding":
-            query = """
-            SELECT u.id, u.fname, u.lname, u.profile_picture_url,
-                   COALESCE((
-                       SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
-                       FROM (
-                           SELECT user_id, problem_title, difficulty 
-                           FROM coding_attempts 
-                           WHERE is_correct = 1
-                           GROUP BY user_id, problem_title, difficulty
-                       ) c
-                       WHERE c.user_id = u.id
-                   ), 0) as total_xp
-            FROM users u 
-            HAVING total_xp > 0 
-            ORDER BY total_xp DESC LIMIT 50;
-            """
-        elif category == "interview" or category == "gd":
-            query = """
-            SELECT u.id, u.fname, u.lname, u.profile_picture_url, COALESCE(SUM(50 + (overall_score * 5)), 0) as total_xp
-            FROM users u JOIN interview_sessions i ON u.id = i.user_id WHERE i.end_time IS NOT NULL
-            GROUP BY u.id HAVING total_xp > 0 ORDER BY total_xp DESC LIMIT 50;
-            """
-
-        cursor.execute(query)
-        leaderboard = []
-        for rank, row in enumerate(cursor.fetchall()):
+        # Per-(user, category) rollups are maintained on write (xp_ledger.py); this is an indexed top-50.
+        board = []
+        for rank, row in enumerate(xp_ledger.load_category_board(cursor, category)):
             xp = int(row['total_xp'])
             level = calculate_level(xp)
-            next_level_xp = 100 if level == 1 else (300 if level == 2 else (700 if level == 3 else (1500 if level == 4 else 3000)))
-            leaderboard.append({
+            board.append({
                 "rank": rank + 1, "id": row['id'], "name": f"{row['fname']} {row['lname']}",
                 "profile_picture_url": row['profile_picture_url'], "xp": xp, "level": level,
-                "next_level_xp": next_level_xp, "badges": [f"{category.capitalize()} Specialist"], "streak": 0
+                "next_level_xp": next_level_xp(level), "badges": [f"{category.capitalize()} Specialist"], "streak": 0
             })
-        return leaderboard
+        return board
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
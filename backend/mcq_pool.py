@@ -0,0 +1,166 @@
+# backend/mcq_pool.py
+# Persistent pool of validated MCQs per (topic, difficulty) for single-topic tests.
+# Tests are served from the pool when it holds enough questions the user has not seen yet;
+# otherwise the live Gemini path runs and everything it generates is harvested into the pool.
+# A background refill tops a pool up whenever it drops below the watermark.
+import os
+import json
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+import aiomysql
+from database import get_async_pool
+
+POOL_LOW_WATERMARK = int(os.getenv("MCQ_POOL_LOW_WATERMARK", "60"))  # questions per (topic, difficulty)
+POOL_MAX = int(os.getenv("MCQ_POOL_MAX", "400"))  # background refills stop here; harvesting does not
+REFILL_BATCH = int(os.getenv("MCQ_POOL_REFILL_BATCH", "20"))
+
+_refilling = set()  # (topic, difficulty) pairs with a refill in flight
+_tasks = set()  # strong refs so refill tasks are not garbage-collected mid-run
+
+def pool_key(topic, difficulty):
+    return (topic or "").strip(), (difficulty or "").strip().lower()
+
+def question_hash(question: str) -> str:
+    """Identity of a question for de-duplication: case and whitespace do not matter."""
+    return hashlib.sha1(" ".join(question.lower().split()).encode("utf-8")).hexdigest()
+
+@asynccontextmanager
+async def _pool_cursor():
+    pool = await get_async_pool()
+    async with pool.acquire() as db:
+        cursor = await db.cursor(aiomysql.DictCursor)
+        try:
+            yield cursor, db
+        finally:
+            await cursor.close()
+            await db.rollback()
+
+# --- Reads ---
+async def _counts(cursor, topic, difficulty, user_id):
+    """(pool size, questions this user has not seen)."""
+    await cursor.execute(
+        """
+        SELECT COUNT(*) AS size, COALESCE(SUM(s.question_id IS NULL), 0) AS unseen
+        FROM mcq_pool p
+        LEFT JOIN mcq_seen s ON s.question_id = p.id AND s.user_id = %s
+        WHERE p.topic = %s AND p.difficulty = %s
+        """,
+        (user_id or 0, topic, difficulty),
+    )
+    row = await cursor.fetchone()
+    return int(row["size"]), int(row["unseen"])
+
+async def _draw(cursor, topic, difficulty, count, user_id):
+    """Random questions, unseen ones first."""
+    await cursor.execute(
+        """
+        SELECT p.id, p.question, p.options, p.answer, p.explanation
+        FROM mcq_pool p
+        LEFT JOIN mcq_seen s ON s.question_id = p.id AND s.user_id = %s
+        WHERE p.topic = %s AND p.difficulty = %s
+        ORDER BY s.question_id IS NOT NULL, RAND()
+        LIMIT %s
+        """,
+        (user_id or 0, topic, difficulty, count),
+    )
+    return await cursor.fetchall()
+
+def _as_mcq(row):
+    return {
+        "question": row["question"], "options": json.loads(row["options"]),
+        "answer": row["answer"], "explanation": row["explanation"],
+    }
+
+# --- Writes ---
+async def harvest(cursor, topic, difficulty, mcqs, source="live"):
+    """Adds validated MCQs (validate_mcqs output) to the pool; duplicates are skipped. Returns {hash: id}."""
+    rows = [
+        (topic, difficulty, question_hash(q["question"]), q["question"], json.dumps(q["options"]),
+         q["answer"], q.get("explanation"), source)
+        for q in mcqs
+    ]
+    if not rows:
+        return {}
+    await cursor.executemany(
+        """
+        INSERT IGNORE INTO mcq_pool (topic, difficulty, question_hash, question, options, answer, explanation, source)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        rows,
+    )
+    hashes = [row[2] for row in rows]
+    await cursor.execute(
+        f"SELECT id, question_hash FROM mcq_pool WHERE topic = %s AND difficulty = %s AND question_hash IN ({', '.join(['%s'] * len(hashes))})",
+        (topic, difficulty, *hashes),
+    )
+    return {row["question_hash"]: row["id"] for row in await cursor.fetchall()}
+
+async def mark_seen(cursor, user_id, question_ids):
+    if user_id and question_ids:
+        await cursor.executemany(
+            "INSERT IGNORE INTO mcq_seen (user_id, question_id) VALUES (%s, %s)",
+            [(user_id, qid) for qid in question_ids],
+        )
+
+# --- Background refill ---
+def schedule_refill(topic, difficulty, generate):
+    """generate(n, priority) -> awaitable list of validated MCQs. At most one refill per pool at a time."""
+    key = (topic, difficulty)
+    if key in _refilling:
+        return
+    _refilling.add(key)
+    task = asyncio.create_task(_refill(key, generate))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+async def _refill(key, generate):
+    topic, difficulty = key
+    try:
+        async with _pool_cursor() as (cursor, db):
+            size, _ = await _counts(cursor, topic, difficulty, None)
+        if size >= POOL_MAX:
+            return
+        # No connection is held while the model is generating
+        mcqs = await generate(REFILL_BATCH, "background")
+        async with _pool_cursor() as (cursor, db):
+            await harvest(cursor, topic, difficulty, mcqs, source="refill")
+            await db.commit()
+            new_size, _ = await _counts(cursor, topic, difficulty, None)
+        print(f"🧺 MCQ pool '{topic}' [{difficulty or 'any'}]: +{new_size - size} (now {new_size})")
+    except Exception as e:
+        print(f"⚠️ MCQ pool refill failed for '{topic}': {e}")
+    finally:
+        _refilling.discard(key)
+
+# --- Serving ---
+async def serve(topic, difficulty, count, user_id, generate):
+    """A test of `count` MCQs: from the pool if it can cover it, otherwise generated live (and harvested)."""
+    topic, difficulty = pool_key(topic, difficulty)
+    try:
+        async with _pool_cursor() as (cursor, db):
+            size, unseen = await _counts(cursor, topic, difficulty, user_id)
+            # Keep a test's worth of fresh questions ahead of this user, and the pool above the watermark
+            if size < POOL_LOW_WATERMARK or unseen < 2 * count:
+                schedule_refill(topic, difficulty, generate)
+            rows = await _draw(cursor, topic, difficulty, count, user_id) if size else []
+            if unseen >= count:
+                await mark_seen(cursor, user_id, [row["id"] for row in rows])
+                await db.commit()
+                return [_as_mcq(row) for row in rows]
+    except aiomysql.Error as e:
+        print(f"⚠️ MCQ pool unavailable, generating live: {e}")
+        return await generate(count)
+
+    mcqs = await generate(count)
+    if not mcqs:
+        # Live generation failed (e.g. rate limit): repeat seen questions rather than fail
+        return [_as_mcq(row) for row in rows] if len(rows) >= max(1, count // 2) else []
+    try:
+        async with _pool_cursor() as (cursor, db):
+            ids = await harvest(cursor, topic, difficulty, mcqs)
+            await mark_seen(cursor, user_id, list(ids.values()))
+            await db.commit()
+    except aiomysql.Error as e:
+        print(f"⚠️ Could not harvest generated MCQs: {e}")
+    return mcqs
@@ -0,0 +1,441 @@
+# backend/migrations.py
+# Versioned schema migrations for every table the app uses (raw-SQL routes and the interview ORM).
+# Applied in order at startup; each version runs once and is recorded in `schema_migrations`.
+#
+#   python migrations.py          -> apply pending migrations
+#   python migrations.py status   -> list applied / pending versions
+#
+# Never edit a migration that has shipped; add a new version instead. Migrations carry their own
+# SQL and data rather than calling app modules, so later changes there never alter what an
+# already-shipped version does on a fresh database.
+import sys
+
+# --- Helpers ---
+def _index_exists(cursor, table, name):
+    cursor.execute(
+        "SELECT 1 AS found FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+        (table, name),
+    )
+    return cursor.fetchone() is not None
+
+def _column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 AS found FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1",
+        (table, column),
+    )
+    return cursor.fetchone() is not None
+
+def add_index(cursor, table, name, columns, unique=False):
+    """MySQL has no CREATE INDEX IF NOT EXISTS, so check information_schema first."""
+    if not _index_exists(cursor, table, name):
+        cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({columns})")
+
+def add_column(cursor, table, column, definition):
+    if not _column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# --- 0001: Baseline (tables that existed before migrations; IF NOT EXISTS keeps live DBs untouched) ---
+def m0001_baseline(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            fname VARCHAR(100) NOT NULL,
+            lname VARCHAR(100) NOT NULL,
+            email VARCHAR(255) NOT NULL UNIQUE,
+            year INT,
+            field VARCHAR(100),
+            password VARCHAR(255) NOT NULL,
+            profile_picture_url VARCHAR(255) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS password_resets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            otp VARCHAR(6) NOT NULL,
+            expires_at DATETIME NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS test_attempts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            topic VARCHAR(255) NOT NULL,
+            mode VARCHAR(50) NOT NULL,
+            score INT NOT NULL,
+            total INT NOT NULL DEFAULT 20,
+            time_taken INT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS coding_attempts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            problem_title VARCHAR(255) NOT NULL,
+            difficulty VARCHAR(50) NOT NULL,
+            is_correct BOOLEAN NOT NULL DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_coding_attempt (user_id, problem_title, difficulty)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_attempts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            interview_type VARCHAR(50),
+            job_role VARCHAR(100),
+            overall_score INT,
+            feedback TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gd_sessions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            host_id INT NOT NULL,
+            host_name VARCHAR(100),
+            scheduled_time DATETIME NOT NULL,
+            topic VARCHAR(255),
+            status VARCHAR(20) NOT NULL DEFAULT 'scheduled',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gd_participants (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            session_id INT NOT NULL,
+            user_id INT NOT NULL,
+            user_name VARCHAR(100),
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_gd_participant (session_id, user_id)
+        )
+    """)
+    # Interview module (previously created by Base.metadata.create_all; same names as interview_models.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_sessions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT,
+            job_role VARCHAR(100),
+            difficulty VARCHAR(50),
+            interview_type VARCHAR(50),
+            topic VARCHAR(100),
+            start_time DATETIME,
+            end_time DATETIME NULL,
+            overall_score FLOAT NULL,
+            feedback_summary TEXT NULL,
+            INDEX ix_interview_sessions_user_id (user_id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interview_turns (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            session_id INT,
+            question_text TEXT,
+            question_type VARCHAR(50),
+            user_answer_text TEXT NULL,
+            user_answer_audio_url VARCHAR(255) NULL,
+            ai_score INT NULL,
+            ai_feedback TEXT NULL,
+            ai_suggested_answer TEXT NULL,
+            turn_number INT,
+            FOREIGN KEY (session_id) REFERENCES interview_sessions (id)
+        )
+    """)
+
+# --- 0002: XP ledger, topic registry and category rollups (xp_ledger.py, topic_categories.py) ---
+# The topic lists the filtered leaderboard used to hard-code, and the ledger backfill as shipped
+_M0002_TOPICS = [
+    # technical
+    ("C Programming", "technical"),
+    ("C++ Programming", "technical"),
+    ("Java Programming", "technical"),
+    ("Python Programming", "technical"),
+    ("Data Structures & Algorithms", "technical"),
+    ("Database Management Systems", "technical"),
+    ("Operating Systems", "technical"),
+    ("Computer Networks", "technical"),
+    # aptitude
+    ("Percentages", "aptitude"),
+    ("Profit & Loss", "aptitude"),
+    ("Time, Speed & Distance", "aptitude"),
+    ("Ratio & Proportion", "aptitude"),
+    ("Number System", "aptitude"),
+    ("Simple & Compound Interest", "aptitude"),
+    ("Permutation & Combination", "aptitude"),
+    ("Geometry & Mensuration", "aptitude"),
+    ("Series & Patterns", "aptitude"),
+    ("Coding-Decoding", "aptitude"),
+    ("Blood Relations", "aptitude"),
+    ("Direction Sense", "aptitude"),
+    ("Grammar", "aptitude"),
+    ("Vocabulary", "aptitude"),
+    ("Reading Comprehension", "aptitude"),
+    ("Final Aptitude Test", "aptitude"),
+]
+
+_M0002_BACKFILL = [
+    "DELETE FROM user_best_scores",
+    """
+    INSERT INTO user_best_scores (user_id, topic, mode, max_score, max_total)
+    SELECT user_id, topic, mode, MAX(score), MAX(total) FROM test_attempts GROUP BY user_id, topic, mode
+    """,
+    "DELETE FROM user_solved_problems",
+    """
+    INSERT IGNORE INTO user_solved_problems (user_id, problem_title, difficulty)
+    SELECT DISTINCT user_id, problem_title, difficulty FROM coding_attempts WHERE is_correct = 1
+    """,
+    "DELETE FROM user_active_days",
+    """
+    INSERT IGNORE INTO user_active_days (user_id, day)
+    SELECT DISTINCT user_id, DATE(created_at) FROM test_attempts
+    """,
+    "DELETE FROM user_xp",
+    """
+    INSERT INTO user_xp (user_id, test_xp, coding_xp, interview_xp, aptitude_tests, coding_solved, interviews, active_days)
+    SELECT u.id,
+        COALESCE((
+            SELECT SUM(
+                CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END +
+                CASE WHEN max_total > 0 AND (max_score / max_total) >= 0.9 THEN 15 ELSE 0 END
+            ) FROM user_best_scores b WHERE b.user_id = u.id AND b.max_score >= 15
+        ), 0),
+        COALESCE((
+            SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
+            FROM user_solved_problems s WHERE s.user_id = u.id
+        ), 0),
+        COALESCE((
+            SELECT SUM(50 + (overall_score * 5)) FROM interview_sessions i
+            WHERE i.user_id = u.id AND i.end_time IS NOT NULL
+        ), 0),
+        (SELECT COUNT(*) FROM user_best_scores b WHERE b.user_id = u.id AND b.max_score >= 15),
+        (SELECT COUNT(DISTINCT problem_title) FROM user_solved_problems s WHERE s.user_id = u.id),
+        (SELECT COUNT(*) FROM interview_sessions i WHERE i.user_id = u.id AND i.end_time IS NOT NULL),
+        (SELECT COUNT(*) FROM user_active_days d WHERE d.user_id = u.id)
+    FROM users u
+    """,
+    "DELETE FROM user_category_xp",
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT b.user_id, tc.category, SUM(CASE WHEN b.mode = 'hard' THEN 40 WHEN b.mode = 'moderate' THEN 20 ELSE 10 END)
+    FROM user_best_scores b
+    JOIN topic_categories tc ON tc.topic = b.topic
+    WHERE b.max_score >= 15
+    GROUP BY b.user_id, tc.category
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'coding', SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
+    FROM user_solved_problems GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'interview', COALESCE(SUM(50 + (overall_score * 5)), 0)
+    FROM interview_sessions WHERE end_time IS NOT NULL GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'gd', SUM(50 + total) FROM gd_results GROUP BY user_id
+    """,
+]
+
+def m0002_xp_ledger(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS topic_categories (
+            topic VARCHAR(255) PRIMARY KEY,
+            category VARCHAR(32) NOT NULL,
+            INDEX idx_topic_categories_category (category)
+        )
+    """)
+    cursor.executemany("INSERT IGNORE INTO topic_categories (topic, category) VALUES (%s, %s)", _M0002_TOPICS)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_xp (
+            user_id INT PRIMARY KEY,
+            test_xp INT NOT NULL DEFAULT 0,
+            coding_xp INT NOT NULL DEFAULT 0,
+            interview_xp DOUBLE NOT NULL DEFAULT 0,
+            total_xp DOUBLE AS (test_xp + coding_xp + interview_xp) STORED,
+            aptitude_tests INT NOT NULL DEFAULT 0,
+            coding_solved INT NOT NULL DEFAULT 0,
+            interviews INT NOT NULL DEFAULT 0,
+            active_days INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_user_xp_total (total_xp)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_best_scores (
+            user_id INT NOT NULL,
+            topic VARCHAR(255) NOT NULL,
+            mode VARCHAR(50) NOT NULL,
+            max_score INT NOT NULL,
+            max_total INT NOT NULL,
+            PRIMARY KEY (user_id, topic, mode)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_solved_problems (
+            user_id INT NOT NULL,
+            problem_title VARCHAR(255) NOT NULL,
+            difficulty VARCHAR(50) NOT NULL,
+            PRIMARY KEY (user_id, problem_title, difficulty)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_active_days (
+            user_id INT NOT NULL,
+            day DATE NOT NULL,
+            PRIMARY KEY (user_id, day)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_category_xp (
+            user_id INT NOT NULL,
+            category VARCHAR(32) NOT NULL,
+            xp DOUBLE NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, category),
+            INDEX idx_user_category_xp_rank (category, xp)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gd_results (
+            session_id INT NOT NULL,
+            user_id INT NOT NULL,
+            total INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id, user_id)
+        )
+    """)
+    # Backfill from the attempts that already exist
+    for sql in _M0002_BACKFILL:
+        cursor.execute(sql)
+
+# --- 0003: Covering indexes for the hot queries (see check_query_plans.py) ---
+def m0003_hot_path_indexes(cursor):
+    add_index(cursor, "users", "idx_users_email", "email")
+    add_index(cursor, "test_attempts", "idx_test_attempts_user_topic_mode_score", "user_id, topic, mode, score")
+    add_index(cursor, "coding_attempts", "idx_coding_attempts_user_level", "user_id, difficulty, is_correct, problem_title")
+    add_index(cursor, "interview_sessions", "idx_interview_sessions_user_end", "user_id, end_time")
+    add_index(cursor, "interview_turns", "idx_interview_turns_session_turn", "session_id, turn_number")
+    add_index(cursor, "gd_participants", "idx_gd_participants_session", "session_id")
+    add_index(cursor, "gd_participants", "idx_gd_participants_user", "user_id")
+    add_index(cursor, "gd_sessions", "idx_gd_sessions_status_time", "status, scheduled_time")
+    add_index(cursor, "password_resets", "idx_password_resets_user_otp_expiry", "user_id, otp, expires_at")
+
+# --- 0004: Keyset pagination of the profile history lists ---
+def m0004_history_keyset_indexes(cursor):
+    # InnoDB appends the primary key to secondary indexes, so these also cover the id tiebreak.
+    add_index(cursor, "test_attempts", "idx_test_attempts_user_created", "user_id, created_at")
+    add_index(cursor, "coding_attempts", "idx_coding_attempts_user_created", "user_id, created_at")
+    add_index(cursor, "interview_sessions", "idx_interview_sessions_user_start", "user_id, start_time")
+
+# --- 0005: Pre-generated MCQ pool for single-topic tests (see mcq_pool.py) ---
+def m0005_mcq_pool(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS mcq_pool (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            topic VARCHAR(255) NOT NULL,
+            difficulty VARCHAR(50) NOT NULL DEFAULT '',
+            question_hash CHAR(40) NOT NULL,
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            explanation TEXT,
+            source VARCHAR(20) NOT NULL DEFAULT 'live',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_mcq_pool_question (topic, difficulty, question_hash)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS mcq_seen (
+            user_id INT NOT NULL,
+            question_id INT NOT NULL,
+            seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, question_id)
+        )
+    """)
+
+# --- 0006: Rolling interview memory (see interview_memory.py) ---
+def m0006_interview_memory(cursor):
+    add_column(cursor, "interview_sessions", "memory_summary", "TEXT NULL")
+    add_column(cursor, "interview_sessions", "memory_facts", "TEXT NULL")
+
+# --- 0007: Running score totals on interview sessions (see interview_scores.py) ---
+_M0007_BACKFILL = """
+    UPDATE interview_sessions s
+    LEFT JOIN (SELECT session_id, SUM(ai_score) AS total, COUNT(ai_score) AS scored FROM interview_turns GROUP BY session_id) t
+        ON t.session_id = s.id
+    SET s.score_sum = COALESCE(t.total, 0), s.score_count = COALESCE(t.scored, 0)
+"""
+
+def m0007_interview_score_totals(cursor):
+    add_column(cursor, "interview_sessions", "score_sum", "INT NOT NULL DEFAULT 0")
+    add_column(cursor, "interview_sessions", "score_count", "INT NOT NULL DEFAULT 0")
+    # Backfill from the turns scored so far
+    cursor.execute(_M0007_BACKFILL)
+
+MIGRATIONS = [
+    (1, "baseline", m0001_baseline),
+    (2, "xp_ledger", m0002_xp_ledger),
+    (3, "hot_path_indexes", m0003_hot_path_indexes),
+    (4, "history_keyset_indexes", m0004_history_keyset_indexes),
+    (5, "mcq_pool", m0005_mcq_pool),
+    (6, "interview_memory", m0006_interview_memory),
+    (7, "interview_score_totals", m0007_interview_score_totals),
+]
+
+# --- Runner ---
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def applied_versions(cursor):
+    _ensure_version_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row["version"] for row in cursor.fetchall()}
+
+def run_migrations(conn):
+    """Applies pending migrations in order, committing after each one. Returns the versions applied."""
+    cursor = conn.cursor(dictionary=True)
+    # Serialise concurrent starts (several uvicorn workers) on a server-side named lock.
+    cursor.execute("SELECT GET_LOCK('placify_migrations', 60) AS got")
+    if not cursor.fetchone()["got"]:
+        raise RuntimeError("Timed out waiting for the migration lock")
+    try:
+        done = applied_versions(cursor)
+        applied = []
+        for version, name, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            print(f"Applying migration {version:04d}_{name}...")
+            migrate(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append(version)
+        return applied
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('placify_migrations') AS released")
+        cursor.fetchone()
+        cursor.close()
+
+if __name__ == "__main__":
+    from database import engine
+
+    conn = engine.raw_connection()
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "status":
+            done = applied_versions(conn.cursor(dictionary=True))
+            for version, name, _ in MIGRATIONS:
+                print(f"{'✅' if version in done else '⏳'} {version:04d}_{name}")
+        else:
+            applied = run_migrations(conn)
+            print(f"✅ Applied {len(applied)} migration(s).")
+    finally:
+        conn.close()
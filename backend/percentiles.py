@@ -0,0 +1,8 @@
+# backend/percentiles.py
+# Nearest-rank percentile shared by the schedulers' and sandbox's /health stats and the bench scripts.
+
+def percentile(values, pct, default=None):
+    """The value at the pct-th percentile of values (nearest rank), or default if there are none."""
+    if not values: return default
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,165 @@
+# backend/question_bank.py
+# Local question banks for the Final Aptitude Test. Each dataset is split into per-difficulty
+# buckets and re-read only when its file changes (e.g. after a miner run).
+#
+# Preferred source is question_bank.bin (see build_question_bank.py): every worker mmaps the same
+# file, so the pages are shared and a question is only decoded when it is served. A bank whose JSON
+# is newer than the compiled copy (or a missing .bin) falls back to parsing the JSON.
+import os
+import json
+import mmap
+import time
+import struct
+import random
+import threading
+
+BASE_DIR = os.path.dirname(__file__)
+DATASETS = {
+    "quant": "quant_dataset.json",
+    "logical": "logical_dataset.json",
+    "verbal": "verbal_dataset.json",
+}
+COMPILED_PATH = os.getenv("QUESTION_BANK_FILE", os.path.join(BASE_DIR, "question_bank.bin"))
+# Final test mix: 20% Easy, 30% Medium, 50% Hard
+DIFFICULTY_MIX = (("easy", 0.20), ("medium", 0.30), ("hard", 0.50))
+# How often (seconds) a request may stat() the files to look for changes.
+RELOAD_CHECK_SECONDS = float(os.getenv("QUESTION_BANK_RELOAD_CHECK", "2"))
+
+# --- Compiled format ---
+# header | manifest (JSON) | fixed-width records | string heap
+# Each record is an (offset, length) pair into the heap per field; equal strings share one heap entry.
+MAGIC = b"QBNK"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxII")  # magic, version, record count, manifest length
+FIELDS = ("id", "module", "topic", "difficulty", "question", "options", "answer", "explanation")
+JSON_FIELDS = ("id", "options")  # stored JSON-encoded to keep their types
+RECORD = struct.Struct("<" + "II" * len(FIELDS))
+
+class CompiledBanks:
+    """Read-only view over question_bank.bin."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, manifest_length = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a v{VERSION} question bank; rebuild it")
+        self.manifest = json.loads(self.buf[HEADER.size:HEADER.size + manifest_length])
+        self.records_at = HEADER.size + manifest_length
+        self.heap_at = self.records_at + count * RECORD.size
+
+    def _field(self, refs, index):
+        offset, length = refs[2 * index], refs[2 * index + 1]
+        start = self.heap_at + offset
+        value = self.buf[start:start + length].decode("utf-8")
+        return json.loads(value) if FIELDS[index] in JSON_FIELDS else value
+
+    def question(self, record, explanation=True):
+        """Decodes one record into the same dict the JSON dataset holds."""
+        refs = RECORD.unpack_from(self.buf, self.records_at + record * RECORD.size)
+        return {
+            name: self._field(refs, i) for i, name in enumerate(FIELDS)
+            if explanation or name != "explanation"
+        }
+
+_compiled = None
+_compiled_lock = threading.Lock()
+
+def compiled_banks():
+    """The current question_bank.bin, re-mapped when the file is replaced; None if unusable."""
+    global _compiled
+    with _compiled_lock:
+        try:
+            mtime = os.stat(COMPILED_PATH).st_mtime_ns
+        except FileNotFoundError:
+            _compiled = None
+            return None
+        if _compiled is None or _compiled.mtime != mtime:
+            try:
+                # The old map stays valid for requests still holding it; it is freed with them.
+                _compiled = CompiledBanks(COMPILED_PATH)
+            except Exception as e:
+                print(f"⚠️ Error mapping {os.path.basename(COMPILED_PATH)}: {e}")
+                _compiled = None
+        return _compiled
+
+# --- Banks ---
+class QuestionBank:
+    def __init__(self, name: str, filename: str):
+        self.name = name
+        self.path = os.path.join(BASE_DIR, filename)
+        # (questions, buckets, compiled): questions/buckets hold dicts when loaded from JSON,
+        # record numbers (ranges) when served from the compiled file. Swapped as one tuple.
+        self._view = ([], {difficulty: [] for difficulty, _ in DIFFICULTY_MIX}, None)
+        self._source = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load_json(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                questions = json.load(f)
+        except Exception as e:
+            # Keep serving the previous copy (the file may be mid-write); retry on the next check.
+            print(f"⚠️ Error reading {os.path.basename(self.path)}: {e}")
+            return False
+        buckets = {difficulty: [] for difficulty, _ in DIFFICULTY_MIX}
+        for q in questions:
+            if q.get("difficulty") in buckets:
+                buckets[q["difficulty"]].append(q)
+        self._view = (questions, buckets, None)
+        return True
+
+    def _load_compiled(self, compiled, entry):
+        buckets = {difficulty: range(0) for difficulty, _ in DIFFICULTY_MIX}
+        buckets.update({difficulty: range(*span) for difficulty, span in entry["buckets"].items()})
+        self._view = (range(entry["start"], entry["end"]), buckets, compiled)
+        return True
+
+    def refresh(self, force: bool = False):
+        """Switches to whichever copy of the dataset is newest, if that changed since the last load."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                json_mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                json_mtime = None
+            compiled = compiled_banks()
+            entry = compiled.manifest["banks"].get(self.name) if compiled else None
+            if entry and json_mtime in (None, entry["source_mtime"]):
+                source, load = ("compiled", compiled.mtime), lambda: self._load_compiled(compiled, entry)
+            elif json_mtime is not None:
+                source, load = ("json", json_mtime), self._load_json
+            else:
+                return
+            if source != self._source and load():
+                self._source = source
+
+    def sample_balanced(self, count: int = 20):
+        """Exactly 20% Easy, 30% Medium, 50% Hard; O(count)."""
+        self.refresh()
+        questions, buckets, compiled = self._view
+        test_qs = []
+        # random.choices allows duplicates while a bank is still small
+        for difficulty, share in DIFFICULTY_MIX:
+            if buckets[difficulty]:
+                test_qs.extend(random.choices(buckets[difficulty], k=int(count * share)))
+        # Fill any missing gaps (rounding, or a difficulty with no questions yet)
+        if questions and len(test_qs) < count:
+            test_qs.extend(random.choices(questions, k=count - len(test_qs)))
+        if compiled:
+            return [compiled.question(record) for record in test_qs]
+        return [dict(q) for q in test_qs]
+
+    def __len__(self):
+        return len(self._view[0])
+
+banks = {name: QuestionBank(name, filename) for name, filename in DATASETS.items()}
+
+def load_all():
+    for bank in banks.values():
+        bank.refresh(force=True)
@@ -0,0 +1,116 @@
+# backend/sandbox_cpus.py
+# CPU slots for sandbox jobs. Every runner used to be pinned to CPU 0, so concurrent runs fought
+# over one core while the rest of the host sat idle. Each job now takes a slot on one core from
+# SANDBOX_CPUS (default: every core except the first SANDBOX_API_RESERVED_CORES, which stay with
+# the API), waits in FIFO order when every slot is busy, and its container is pinned to that core.
+# SANDBOX_SLOTS_PER_CORE > 1 shares a core between that many jobs, each capped to its fraction.
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from percentiles import percentile
+
+SANDBOX_API_RESERVED_CORES = int(os.getenv("SANDBOX_API_RESERVED_CORES", "1"))
+SANDBOX_SLOTS_PER_CORE = max(1, int(os.getenv("SANDBOX_SLOTS_PER_CORE", "1")))
+UTILIZATION_WINDOW_SECONDS = 60
+CPU_PERIOD_US = 100000  # CFS period used for fractional slots
+
+def parse_cpus(spec):
+    """'0-3,6' -> [0, 1, 2, 3, 6]"""
+    cores = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        first, _, last = part.partition("-")
+        cores.extend(range(int(first), int(last or first) + 1))
+    return sorted(set(cores))
+
+def default_cpus():
+    host = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    # A one- or two-core host keeps at least one core for the sandbox, shared with the API
+    return host[SANDBOX_API_RESERVED_CORES:] or host[-1:]
+
+class _Core:
+    def __init__(self, core):
+        self.core = core
+        self.in_use = 0
+        self.jobs = 0
+        self.spans = deque()  # (started, finished) of recent jobs
+        self.running = {}  # slot id -> started
+
+class CpuSlots:
+    def __init__(self, cores, slots_per_core=SANDBOX_SLOTS_PER_CORE):
+        self.slots_per_core = slots_per_core
+        self.cores = [_Core(c) for c in cores]
+        self.cond = threading.Condition()
+        self.waiting = deque()  # FIFO tickets
+        self.wait_seconds = deque(maxlen=500)
+        self._next_id = 0
+
+    @property
+    def cpu_quota(self):
+        """CFS quota for one slot, or None when a slot is a whole core."""
+        return CPU_PERIOD_US // self.slots_per_core if self.slots_per_core > 1 else None
+
+    def _free_core(self):
+        # Least loaded core; ties go to the core that has run fewest jobs
+        free = [c for c in self.cores if c.in_use < self.slots_per_core]
+        return min(free, key=lambda c: (c.in_use, c.jobs)) if free else None
+
+    @contextmanager
+    def slot(self):
+        """Holds one CPU slot for the block; yields (core number, seconds spent waiting)."""
+        enqueued = time.monotonic()
+        with self.cond:
+            ticket = object()
+            self.waiting.append(ticket)
+            while self.waiting[0] is not ticket or (core := self._free_core()) is None:
+                self.cond.wait()
+            self.waiting.popleft()
+            core.in_use += 1
+            core.jobs += 1
+            self._next_id += 1
+            slot_id = self._next_id
+            started = time.monotonic()
+            core.running[slot_id] = started
+            waited = started - enqueued
+            self.wait_seconds.append(waited)
+            self.cond.notify_all()  # the next ticket may fit on another core
+        try:
+            yield core.core, waited
+        finally:
+            with self.cond:
+                core.in_use -= 1
+                core.running.pop(slot_id, None)
+                finished = time.monotonic()
+                core.spans.append((started, finished))
+                _prune(core, finished)
+                self.cond.notify_all()
+
+    def _utilization(self, core, now):
+        start = _prune(core, now)
+        busy = sum(end - max(begin, start) for begin, end in core.spans)
+        busy += sum(now - max(begin, start) for begin in core.running.values())
+        return busy / (UTILIZATION_WINDOW_SECONDS * self.slots_per_core)
+
+    def get_stats(self):
+        now = time.monotonic()
+        with self.cond:
+            waits = list(self.wait_seconds)
+            return {
+                "slots_per_core": self.slots_per_core,
+                "waiting": len(self.waiting),
+                "wait_p95_ms": round(percentile(waits, 95) * 1000) if waits else None,
+                "cores": {
+                    c.core: {"in_use": c.in_use, "jobs": c.jobs, "utilization": round(self._utilization(c, now), 3)}
+                    for c in self.cores
+                },
+            }
+
+def _prune(core, now):
+    """Drops spans that ended before the utilization window; returns the window start."""
+    start = now - UTILIZATION_WINDOW_SECONDS
+    while core.spans and core.spans[0][1] < start:
+        core.spans.popleft()
+    return start
+
+slots = CpuSlots(parse_cpus(os.getenv("SANDBOX_CPUS", "")) or default_cpus())
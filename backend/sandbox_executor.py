@@ -0,0 +1,128 @@
+# backend/sandbox_executor.py
+# Runs sandbox jobs off the event loop. /run-code used to call the blocking run_in_sandbox inside
+# an async handler, so one long compile stalled every request and websocket on the worker. Each
+# language now has its own thread pool (SANDBOX_WORKERS_<LANG> jobs at a time) behind a bounded
+# FIFO queue; when SANDBOX_QUEUE_SIZE jobs are already waiting, submissions are refused with a
+# Retry-After estimate instead of piling up.
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from percentiles import percentile
+import sandbox_cpus
+
+# Default: one worker per CPU slot, so any language can use every sandbox core; sandbox_cpus
+# queues the excess when several languages are busy at once
+_SLOTS = str(len(sandbox_cpus.slots.cores) * sandbox_cpus.slots.slots_per_core)
+SANDBOX_WORKERS = {
+    "python": int(os.getenv("SANDBOX_WORKERS_PYTHON", _SLOTS)),
+    "java": int(os.getenv("SANDBOX_WORKERS_JAVA", _SLOTS)),
+    "cpp": int(os.getenv("SANDBOX_WORKERS_CPP", _SLOTS)),
+}
+SANDBOX_QUEUE_SIZE = int(os.getenv("SANDBOX_QUEUE_SIZE", "64"))  # waiting jobs per language
+
+class QueueFull(Exception):
+    def __init__(self, language, retry_after):
+        super().__init__(f"The {language} runner queue is full.")
+        self.retry_after = retry_after
+
+class _Job:
+    __slots__ = ("submitted", "started", "finished")
+
+    def __init__(self):
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+class LanguageExecutor:
+    def __init__(self, language, workers):
+        self.language = language
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"sandbox-{language}")
+        self.lock = threading.Lock()  # counters are touched from the loop and the worker threads
+        self.waiting = 0
+        self.running = 0
+        self.stats = {"completed": 0, "rejected": 0, "cancelled": 0}
+        self.wait_seconds = deque(maxlen=500)
+        self.run_seconds = deque(maxlen=500)
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up (at least 1)."""
+        with self.lock:
+            per_job = percentile(list(self.run_seconds), 50) or 1.0
+            ahead = self.waiting - SANDBOX_QUEUE_SIZE + 1
+        return max(1, math.ceil(per_job * max(ahead, 1) / self.workers))
+
+    def _run(self, job, fn, args):
+        with self.lock:
+            self.waiting -= 1
+            self.running += 1
+        job.started = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            job.finished = time.monotonic()
+            with self.lock:
+                self.running -= 1
+                self.stats["completed"] += 1
+                self.wait_seconds.append(job.started - job.submitted)
+                self.run_seconds.append(job.finished - job.started)
+
+    async def submit(self, fn, *args):
+        """Runs fn(*args) on this language's pool. Returns (result, queue info)."""
+        with self.lock:
+            full = self.waiting >= SANDBOX_QUEUE_SIZE
+            if full:
+                self.stats["rejected"] += 1
+            else:
+                position = self.waiting  # jobs ahead of this one (FIFO)
+                self.waiting += 1
+        if full:
+            raise QueueFull(self.language, self.retry_after())
+        job = _Job()
+        future = self.pool.submit(self._run, job, fn, args)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Client went away. A job that had not started is dropped from the queue.
+            if future.cancel():
+                with self.lock:
+                    self.waiting -= 1
+                    self.stats["cancelled"] += 1
+            raise
+        return result, {
+            "position": position,
+            "wait_ms": round((job.started - job.submitted) * 1000),
+            "run_ms": round((job.finished - job.started) * 1000),
+        }
+
+    def get_stats(self):
+        with self.lock:
+            waits, runs = list(self.wait_seconds), list(self.run_seconds)
+            return {
+                **self.stats,
+                "workers": self.workers,
+                "waiting": self.waiting,
+                "running": self.running,
+                "wait_p95_ms": round(percentile(waits, 95) * 1000) if waits else None,
+                "run_p50_ms": round(percentile(runs, 50) * 1000) if runs else None,
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+executors = {language: LanguageExecutor(language, workers) for language, workers in SANDBOX_WORKERS.items()}
+
+async def submit(language, fn, *args):
+    # Unknown languages fall through to the python runner's queue (run_in_sandbox rejects them cheaply)
+    return await executors.get(language, executors["python"]).submit(fn, *args)
+
+def shutdown():
+    for executor in executors.values():
+        executor.shutdown()
+
+def get_stats():
+    return {language: executor.get_stats() for language, executor in executors.items()}
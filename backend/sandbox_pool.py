@@ -0,0 +1,523 @@
+# backend/sandbox_pool.py
+# Warm pool of runner containers for "Run Code". Creating, starting and removing a container per
+# run cost far more than running a short script, so each language keeps SANDBOX_POOL_SIZE
+# locked-down containers idling and runs jobs in them with `docker exec`, each job in a fresh
+# directory on the container's mount; /tmp and /dev/shm are emptied after each job. A container is
+# recycled after SANDBOX_POOL_MAX_JOBS jobs or on any anomaly: an exec error, a killed job (e.g.
+# out of memory), processes left behind, or scratch files that could not be removed.
+# Every phase runs under timeout + ulimit (wall clock, CPU time, output size) and GNU time, so each
+# result carries runtime, CPU time, peak memory, exit status and a verdict (OK/CE/RE/TLE/MLE/OLE).
+# C++/Java builds and compile errors are reused across runs through compile_cache.py.
+import os
+import time
+import uuid
+import socket
+import shutil
+import threading
+from collections import deque
+import docker
+import sandbox_cpus
+import compile_cache
+from percentiles import percentile
+
+SANDBOX_POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", "2"))  # idle containers kept per language
+SANDBOX_POOL_MAX_JOBS = int(os.getenv("SANDBOX_POOL_MAX_JOBS", "50"))  # then the container is replaced
+SANDBOX_ROOT = os.path.abspath(os.getenv("SANDBOX_ROOT", "../temp_code"))
+SANDBOX_LABEL = "placify.sandbox"
+# Owner of this process's containers, unique per boot. Liveness is a heartbeat file under
+# SANDBOX_ROOT, never a PID probe: PIDs mean nothing across hosts/namespaces sharing a daemon.
+INSTANCE_ID = f"{socket.gethostname()}-{uuid.uuid4().hex[:12]}"
+HEARTBEAT_DIR = os.path.join(SANDBOX_ROOT, ".instances")
+HEARTBEAT_SECONDS = 30
+HEARTBEAT_STALE_SECONDS = HEARTBEAT_SECONDS * 4
+
+# --- Limits (per job) ---
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "256"))  # container memory limit
+SANDBOX_WALL_SECONDS = float(os.getenv("SANDBOX_WALL_SECONDS", "5"))  # running the program
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "3"))
+SANDBOX_COMPILE_SECONDS = float(os.getenv("SANDBOX_COMPILE_SECONDS", "20"))
+SANDBOX_OUTPUT_BYTES = int(os.getenv("SANDBOX_OUTPUT_BYTES", "65536"))  # per stream; more is OLE
+COMPILE_FILE_BLOCKS = 128 * 1024  # 64 MB in sh's 512-byte ulimit blocks (compiler output)
+KILL_GRACE_SECONDS = 3  # host-side backstop if the in-container timeout does not fire
+TIME_FORMAT = "%e %U %S %M"  # GNU time: elapsed s, user s, system s, peak RSS KB
+
+# language -> (source file, compile command or None, run command)
+LANGUAGES = {
+    "python": ("script.py", None, "python script.py"),
+    "java": ("MyClass.java", "javac MyClass.java", "java MyClass"),
+    "cpp": ("script.cpp", "g++ script.cpp -o script", "./script"),
+}
+# compiled language -> (build artifacts, run command for a cached build in {dir})
+COMPILED = {
+    "java": (("*.class",), "java -cp {dir} MyClass"),
+    "cpp": (("script",), "{dir}/script"),
+}
+
+class SandboxUnavailable(Exception):
+    """Docker is not reachable."""
+
+# --- Docker Client (one per process) ---
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                client = docker.from_env()
+                client.ping()
+            except Exception:
+                try:
+                    # Force Windows named pipe connection if default fails
+                    client = docker.DockerClient(base_url='npipe:////./pipe/docker_engine')
+                    client.ping()
+                except Exception as e:
+                    raise SandboxUnavailable(str(e))
+            _client = client
+        return _client
+
+def reset_client():
+    """Drops the cached client so the next call reconnects (e.g. after Docker restarts)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+# --- Pool ---
+class _Runner:
+    def __init__(self, container, workdir, core):
+        self.container = container
+        self.toolchain = container.attrs.get("Image")  # image id; part of the compile cache key
+        self.core = core  # CPU the container is pinned to
+        self.workdir = workdir  # host directory mounted at /jobs
+        self.jobs = 0
+        self.killed = False
+
+class SandboxPool:
+    def __init__(self, language):
+        self.language = language
+        self.image = f"{language}-runner"
+        self.source_file, self.compile_command, self.run_command = LANGUAGES.get(language, LANGUAGES["python"])
+        self.idle = deque()
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.refilling = False
+        self.toolchain = None  # image id of the newest container
+        self.stats = {"started": 0, "recycled": 0, "hits": 0, "misses": 0, "runs": 0, "failed_starts": 0, "killed": 0}
+        self.verdicts = {}
+        self.run_seconds = deque(maxlen=500)
+
+    def _start(self, core):
+        name = f"sandbox-{self.language}-{uuid.uuid4().hex[:12]}"
+        workdir = os.path.join(SANDBOX_ROOT, name)
+        os.makedirs(workdir, exist_ok=True)
+        os.chmod(workdir, 0o777)  # jobs run as the image's unprivileged `coder` user
+        os.makedirs(compile_cache.CACHE_DIR, exist_ok=True)
+        try:
+            container = get_client().containers.run(
+                image=self.image,
+                command=["sleep", "infinity"],  # keeps the container up; jobs arrive via exec
+                name=name,
+                detach=True,
+                user="root",  # only the idle process; jobs exec as coder
+                volumes={
+                    workdir: {'bind': '/jobs', 'mode': 'rw'},
+                    compile_cache.CACHE_DIR: {'bind': '/cache', 'mode': 'ro'},
+                },
+                working_dir="/jobs",
+                network_disabled=True,
+                mem_limit=f"{SANDBOX_MEMORY_MB}m",
+                pids_limit=64,
+                cpuset_cpus=str(core),
+                cpu_period=sandbox_cpus.CPU_PERIOD_US if sandbox_cpus.slots.cpu_quota else None,
+                cpu_quota=sandbox_cpus.slots.cpu_quota,  # fractional slots only
+                read_only=True,
+                tmpfs={"/tmp": "rw,exec,nosuid,size=64m"},
+                security_opt=["no-new-privileges"],
+                cap_drop=["ALL"],
+                labels={
+                    SANDBOX_LABEL: self.language,
+                    f"{SANDBOX_LABEL}.owner": INSTANCE_ID,
+                    f"{SANDBOX_LABEL}.root": SANDBOX_ROOT,
+                },
+                stop_signal='SIGKILL',
+            )
+        except Exception:
+            shutil.rmtree(workdir, ignore_errors=True)
+            with self.lock:
+                self.stats["failed_starts"] += 1
+            raise
+        runner = _Runner(container, workdir, core)
+        with self.lock:
+            self.stats["started"] += 1
+            self.toolchain = runner.toolchain
+        return runner
+
+    def _discard(self, runner):
+        with self.lock:
+            self.stats["recycled"] += 1
+        try:
+            runner.container.remove(force=True)
+        except Exception as e:
+            print(f"⚠️ Could not remove sandbox container {runner.container.name}: {e}")
+        shutil.rmtree(runner.workdir, ignore_errors=True)
+
+    def _acquire(self, core):
+        """An idle container for the job's CPU, preferring one already pinned to it."""
+        with self.lock:
+            runner = next((r for r in reversed(self.idle) if r.core == core), None)
+            if runner is None and self.idle:
+                runner = self.idle[-1]
+            if runner is not None:
+                self.idle.remove(runner)
+            self.stats["hits" if runner else "misses"] += 1
+            self.busy += 1
+        try:
+            if runner is not None and runner.core != core:
+                try:
+                    runner.container.update(cpuset_cpus=str(core))
+                    runner.core = core
+                except Exception:
+                    self._discard(runner)
+                    runner = None
+            if runner is None:
+                runner = self._start(core)  # cold start: the pool ran dry
+        except Exception:
+            with self.lock:
+                self.busy -= 1
+            raise
+        self.refill_async()
+        return runner
+
+    def _release(self, runner, anomaly):
+        runner.jobs += 1
+        with self.lock:
+            self.busy -= 1
+            keep = not anomaly and runner.jobs < SANDBOX_POOL_MAX_JOBS
+            if keep:
+                self.idle.append(runner)
+        if not keep:
+            self._discard(runner)
+            self.refill_async()
+
+    def refill(self):
+        """Starts containers until SANDBOX_POOL_SIZE are idle."""
+        try:
+            while True:
+                with self.lock:
+                    if len(self.idle) >= SANDBOX_POOL_SIZE:
+                        return
+                runner = self._start(self._spare_core())
+                with self.lock:
+                    self.idle.append(runner)
+        except Exception as e:
+            print(f"⚠️ Could not warm {self.image} sandbox: {e}")
+        finally:
+            with self.lock:
+                self.refilling = False
+
+    def _spare_core(self):
+        """The sandbox core with the fewest idle containers pinned to it."""
+        with self.lock:
+            pinned = [r.core for r in self.idle]
+        return min((c.core for c in sandbox_cpus.slots.cores), key=pinned.count)
+
+    def refill_async(self):
+        with self.lock:
+            if self.refilling or len(self.idle) >= SANDBOX_POOL_SIZE:
+                return
+            self.refilling = True
+        threading.Thread(target=self.refill, daemon=True).start()
+
+    def _kill(self, runner):
+        """Backstop for an exec that outlived its limit: the container goes, which ends the exec."""
+        runner.killed = True
+        with self.lock:
+            self.stats["killed"] += 1
+        try:
+            runner.container.kill()
+        except Exception as e:
+            print(f"⚠️ Could not kill sandbox container {runner.container.name}: {e}")
+
+    def _exec(self, runner, job, command, seconds):
+        """Runs one limited phase in the job directory. Returns its exit code (None if killed)."""
+        timer = threading.Timer(seconds + KILL_GRACE_SECONDS, self._kill, (runner,))
+        timer.start()
+        exit_code = None
+        try:
+            exit_code, _ = runner.container.exec_run(["sh", "-c", command], user="coder", workdir=f"/jobs/{job}")
+        except docker.errors.APIError:
+            if not runner.killed:
+                raise
+        finally:
+            timer.cancel()
+        return None if runner.killed else exit_code
+
+    def run(self, code, stdin):
+        """Runs one job on its own CPU slot (waiting for one if all are busy). Returns a result dict."""
+        build = self._cached_build(code)
+        try:
+            if build and build[2] and not build[2]["ok"]:
+                # This exact source failed to compile before: answer without a container
+                result = _result("CE", 1, b"", build[2]["errors"].encode("utf-8"), False, (None, None, None))
+                result["compile_cached"] = True
+                self._count(result)
+                return result
+            with sandbox_cpus.slots.slot() as (core, waited):
+                result = self._run_on(core, code, stdin, build)
+                result["core"] = core
+                result["cpu_wait_ms"] = round(waited * 1000)
+                return result
+        finally:
+            if build and build[2] and build[2]["ok"]:
+                compile_cache.unpin(build[1])
+
+    def _cached_build(self, code):
+        """(toolchain, cache key, cached entry or None) for compiled languages, else None."""
+        if self.language not in COMPILED or not self.toolchain:
+            return None  # no container has started yet, so the toolchain is unknown
+        toolchain = self.toolchain
+        key = compile_cache.cache_key(self.language, toolchain, code)
+        return toolchain, key, compile_cache.lookup(key, pin=True)
+
+    def _count(self, result):
+        with self.lock:
+            self.verdicts[result["verdict"]] = self.verdicts.get(result["verdict"], 0) + 1
+
+    def _run_on(self, core, code, stdin, build):
+        """Runs one job under the wall-clock, CPU, memory and output limits."""
+        runner = self._acquire(core)
+        started = time.perf_counter()
+        job = uuid.uuid4().hex
+        job_dir = os.path.join(runner.workdir, job)
+        anomaly = True
+        result = None
+        try:
+            os.makedirs(job_dir)
+            os.chmod(job_dir, 0o777)
+            with open(os.path.join(job_dir, self.source_file), "w", encoding='utf-8') as f:
+                f.write(code)
+            with open(os.path.join(job_dir, "input.txt"), "w", encoding='utf-8') as f:
+                f.write(stdin)
+            run_command, compile_cached = self.run_command, False
+            if build and build[2] and build[0] == runner.toolchain and compile_cache.touch(build[1]):
+                # Cached build, mounted read-only at /cache in every runner
+                run_command = COMPILED[self.language][1].format(dir=f"/cache/{build[1]}")
+                compile_cached = True
+            elif self.compile_command:
+                key = compile_cache.cache_key(self.language, runner.toolchain, code) if runner.toolchain else None
+                result = self._compile(runner, job, job_dir, key)
+            if result is None:
+                result = self._run(runner, job, job_dir, run_command)
+            result["compile_cached"] = compile_cached
+            # A SIGKILLed job (memory limit) or anything still running would leak into the next job
+            anomaly = result["exit_code"] in (None, 137) or len(runner.container.top()["Processes"]) > 1
+            return result
+        finally:
+            try:
+                _clear(runner.workdir)
+            except OSError:
+                anomaly = True  # could not wipe the job's files; the container goes with them
+            if not anomaly and not self._clear_scratch(runner):
+                anomaly = True
+            self._release(runner, anomaly)
+            with self.lock:
+                self.stats["runs"] += 1
+                self.run_seconds.append(time.perf_counter() - started)
+            if result:
+                self._count(result)
+
+    def _clear_scratch(self, runner):
+        """Empties the container's writable tmpfs mounts (/tmp, /dev/shm); the rest of its
+        filesystem is read-only. False if that failed, and the container must not be reused."""
+        try:
+            # As coder: every file a job can create there is coder's (root has no capabilities)
+            exit_code, _ = runner.container.exec_run(["find", "/tmp", "/dev/shm", "-mindepth", "1", "-delete"], user="coder")
+            return exit_code == 0
+        except docker.errors.APIError:
+            return False
+
+    def _compile(self, runner, job, job_dir, key):
+        """None if the source compiled, else a CE result with the compiler's errors. Caches either outcome."""
+        command = _limited(f"{self.compile_command} > /dev/null 2> compile.txt", SANDBOX_COMPILE_SECONDS, file_blocks=COMPILE_FILE_BLOCKS)
+        exit_code = self._exec(runner, job, command, SANDBOX_COMPILE_SECONDS)
+        if exit_code == 0:
+            if key:
+                compile_cache.store(key, compile_cache.collect(job_dir, COMPILED[self.language][0]))
+            return None
+        errors, truncated = _read_capped(os.path.join(job_dir, "compile.txt"))
+        measured = _read_time(job_dir)
+        if exit_code is None or (measured[0] or 0) >= SANDBOX_COMPILE_SECONDS - 0.05:
+            errors = f"Compilation timed out after {SANDBOX_COMPILE_SECONDS:g}s.".encode()
+        elif key and exit_code != 137:  # a killed compiler says nothing about the source
+            compile_cache.store(key, errors=errors.decode("utf-8", errors="replace"))
+        return _result("CE", exit_code, b"", errors, truncated, measured)
+
+    def _run(self, runner, job, job_dir, run_command):
+        command = _limited(
+            f"{run_command} < input.txt > stdout.txt 2> stderr.txt", SANDBOX_WALL_SECONDS,
+            cpu=SANDBOX_CPU_SECONDS, file_blocks=SANDBOX_OUTPUT_BYTES // 512 + 1,
+        )
+        exit_code = self._exec(runner, job, command, SANDBOX_WALL_SECONDS)
+        stdout, out_truncated = _read_capped(os.path.join(job_dir, "stdout.txt"))
+        stderr, err_truncated = _read_capped(os.path.join(job_dir, "stderr.txt"))
+        measured = _read_time(job_dir)
+        truncated = out_truncated or err_truncated
+        return _result(_verdict(exit_code, measured, truncated, stderr), exit_code, stdout, stderr, truncated, measured)
+
+    def shutdown(self):
+        with self.lock:
+            runners, self.idle = list(self.idle), deque()
+        for runner in runners:
+            self._discard(runner)
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            seconds = list(self.run_seconds)
+            return {
+                **self.stats,
+                "idle": len(self.idle),
+                "busy": self.busy,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+                "run_p50_ms": round(percentile(seconds, 50) * 1000, 1) if seconds else None,
+                "run_p95_ms": round(percentile(seconds, 95) * 1000, 1) if seconds else None,
+                "verdicts": dict(self.verdicts),
+            }
+
+# --- Limits and verdicts ---
+def _limited(command, seconds, cpu=None, file_blocks=None):
+    """Shell line running `command` under timeout/ulimit, with GNU time writing .time in the job dir."""
+    limits = [f"ulimit -t {cpu}"] if cpu else []
+    if file_blocks:
+        limits.append(f"ulimit -f {file_blocks}")
+    return " && ".join(limits + [
+        f"exec /usr/bin/time -q -o .time -f '{TIME_FORMAT}' timeout -s KILL {seconds:g} sh -c '{command}'"
+    ])
+
+def _read_capped(path):
+    """(first SANDBOX_OUTPUT_BYTES of the file, whether there was more)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(SANDBOX_OUTPUT_BYTES + 1)
+    except OSError:
+        return b"", False
+    return data[:SANDBOX_OUTPUT_BYTES], len(data) > SANDBOX_OUTPUT_BYTES
+
+def _read_time(job_dir):
+    """(elapsed s, cpu s, peak KB) from GNU time, or Nones if the phase was killed before it wrote them."""
+    try:
+        with open(os.path.join(job_dir, ".time"), encoding='utf-8') as f:
+            elapsed, user, system, peak_kb = f.read().split()[-4:]
+        return float(elapsed), float(user) + float(system), int(peak_kb)
+    except (OSError, ValueError):
+        return None, None, None
+
+def _verdict(exit_code, measured, truncated, stderr):
+    elapsed, cpu, peak_kb = measured
+    # `timeout -s KILL` kills its whole process group, itself included, so a timed-out run exits 137
+    # just like an out-of-memory kill; GNU time (outside that group) still records elapsed/CPU time,
+    # which tells the two apart. 152: SIGXCPU; 153: SIGXFSZ (output file limit).
+    # "MemoryError" also matches Java's OutOfMemoryError.
+    if exit_code is None or exit_code in (124, 152) or (elapsed or 0) >= SANDBOX_WALL_SECONDS - 0.05 or (cpu or 0) >= SANDBOX_CPU_SECONDS:
+        return "TLE"
+    if exit_code == 153 or truncated:
+        return "OLE"
+    if exit_code == 137 or (peak_kb or 0) >= SANDBOX_MEMORY_MB * 1024 * 0.95 or b"MemoryError" in stderr:
+        return "MLE"
+    return "OK" if exit_code == 0 else "RE"
+
+def _result(verdict, exit_code, stdout, stderr, truncated, measured):
+    elapsed, cpu, peak_kb = measured
+    return {
+        "verdict": verdict,
+        "exit_code": exit_code,
+        "stdout": stdout,
+        "stderr": stderr,
+        "truncated": truncated,
+        "runtime_ms": round(elapsed * 1000) if elapsed is not None else None,
+        "cpu_ms": round(cpu * 1000) if cpu is not None else None,
+        "peak_memory_kb": peak_kb,
+    }
+
+def _clear(directory):
+    """Empties a runner's mount so nothing a job wrote is visible to the next one."""
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+pools = {language: SandboxPool(language) for language in LANGUAGES}
+
+def pool_for(language):
+    # Unknown languages get a throwaway pool: their image does not exist, so the run fails with
+    # ImageNotFound like before, and arbitrary request values never become long-lived pools.
+    return pools.get(language) or SandboxPool(language)
+
+# --- Ownership ---
+_heartbeat_stop = threading.Event()
+
+def _heartbeat_path(instance_id):
+    return os.path.join(HEARTBEAT_DIR, instance_id)
+
+def _beat():
+    os.makedirs(HEARTBEAT_DIR, exist_ok=True)
+    with open(_heartbeat_path(INSTANCE_ID), "a"):
+        pass
+    os.utime(_heartbeat_path(INSTANCE_ID))
+
+def _heartbeat_loop():
+    while not _heartbeat_stop.wait(HEARTBEAT_SECONDS):
+        try:
+            _beat()
+        except OSError as e:
+            print(f"⚠️ Sandbox heartbeat failed: {e}")
+
+def _owner_alive(instance_id):
+    try:
+        return time.time() - os.path.getmtime(_heartbeat_path(instance_id)) < HEARTBEAT_STALE_SECONDS
+    except OSError:
+        return False
+
+def remove_orphans():
+    """Removes sandbox containers whose owning instance stopped heartbeating. Only containers that
+    share our SANDBOX_ROOT are considered: their owners' heartbeats are visible to us."""
+    for container in get_client().containers.list(all=True, filters={"label": f"{SANDBOX_LABEL}.root={SANDBOX_ROOT}"}):
+        owner = container.labels.get(f"{SANDBOX_LABEL}.owner")
+        if not owner or owner == INSTANCE_ID or _owner_alive(owner):
+            continue
+        container.remove(force=True)
+        shutil.rmtree(os.path.join(SANDBOX_ROOT, container.name), ignore_errors=True)
+    # Heartbeat files of instances gone for a day
+    for instance_id in os.listdir(HEARTBEAT_DIR):
+        try:
+            if time.time() - os.path.getmtime(_heartbeat_path(instance_id)) > 86400:
+                os.remove(_heartbeat_path(instance_id))
+        except OSError:
+            pass
+
+def warm():
+    """Startup: starts the heartbeat, clears orphans and fills every language's pool. Never raises (Docker may be down)."""
+    try:
+        _beat()
+        threading.Thread(target=_heartbeat_loop, daemon=True).start()
+        remove_orphans()
+    except Exception as e:
+        print(f"⚠️ Sandbox pool not started: {e}")
+        return
+    for pool in pools.values():
+        pool.refill_async()
+
+def shutdown():
+    _heartbeat_stop.set()
+    for pool in pools.values():
+        pool.shutdown()
+    try:
+        os.remove(_heartbeat_path(INSTANCE_ID))
+    except OSError:
+        pass
+
+def get_stats():
+    return {language: pool.get_stats() for language, pool in pools.items()}
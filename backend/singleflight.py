@@ -0,0 +1,69 @@
+# backend/singleflight.py
+# Request coalescing for LLM generation: concurrent calls with the same key share one in-flight
+# generation (e.g. a whole lab opening the same topic test at once) instead of each burning quota.
+import copy
+import random
+import asyncio
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}  # key -> asyncio.Task
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        self.errors = 0
+
+    async def do(self, key, fn):
+        """Runs fn() once per key at a time; callers arriving while it runs await the same result.
+
+        Every caller gets its own deep copy (lists shuffled independently), so nobody can mutate
+        what another request is about to return.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            # A task of its own, so one caller disconnecting does not cancel it for the others
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.collapsed += 1
+        return shuffled_copy(await asyncio.shield(task))
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            self.errors += 1
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+        }
+
+def shuffled_copy(result):
+    result = copy.deepcopy(result)
+    if isinstance(result, list):
+        random.shuffle(result)
+    elif isinstance(result, dict):
+        for value in result.values():
+            if isinstance(value, list):
+                random.shuffle(value)
+    return result
+
+_flights = {}
+
+def flight(name: str) -> SingleFlight:
+    """The shared SingleFlight for one kind of generation (created on first use)."""
+    if name not in _flights:
+        _flights[name] = SingleFlight(name)
+    return _flights[name]
+
+def get_stats():
+    return {name: f.stats() for name, f in _flights.items()}
@@ -1,10 +1,9 @@
 # backend/technical_routes.py
-import os
-import asyncio
 import random
 from fastapi import APIRouter, Body, HTTPException
 from pydantic import BaseModel
 from aptitude_routes import generate_single_topic
+import mcq_pool
 
 # --- Router Setup ---
 router = APIRouter(prefix="/api/technical", tags=["Technical"])
@@ -13,15 +12,16 @@ class TechnicalMCQRequest(BaseModel):
     topic: str
     count: int = 20
     difficulty: str | None = None
+    user_id: int | None = None  # lets the MCQ pool skip questions this user has already seen
 
 @router.post("/mcqs/test")
 async def generate_technical_test(req: TechnicalMCQRequest):
     try:
-        # Fetch the Technical-specific key
-        technical_key = os.getenv("GEMINI_API_KEY_TECHNICAL")
-        
-        # Pass the key to the shared function
-        mcqs = await generate_single_topic(req.topic, req.count, req.difficulty, technical_key)
+        # Shared generator, billed to the technical module's keys; the pool only calls it when it cannot cover the test
+        async def generate(count, priority="batch"):
+            return await generate_single_topic(req.topic, count, req.difficulty, "technical", priority)
+
+        mcqs = await mcq_pool.serve(req.topic, req.difficulty, req.count, req.user_id, generate)
         
         if not mcqs:
             raise HTTPException(status_code=500, detail="Failed to generate valid technical test questions")
@@ -0,0 +1,33 @@
+# backend/topic_categories.py
+# Registry of which leaderboard category each test topic counts towards.
+# Backed by the `topic_categories` table so new topics can be added without touching SQL strings;
+# loaded once into memory at startup. Migration 0002 seeds the original topic lists.
+import threading
+
+CATEGORIES = ("aptitude", "technical", "coding", "interview", "gd")
+
+_lock = threading.Lock()
+_registry = {}
+
+def load(cursor):
+    """Loads the table (created by migrations.py) into memory."""
+    cursor.execute("SELECT topic, category FROM topic_categories")
+    rows = cursor.fetchall()
+    with _lock:
+        _registry.clear()
+        _registry.update({row["topic"].strip().lower(): row["category"] for row in rows})
+
+def add_topic(cursor, topic, category):
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown category '{category}'")
+    cursor.execute(
+        "INSERT INTO topic_categories (topic, category) VALUES (%s, %s) ON DUPLICATE KEY UPDATE category = VALUES(category)",
+        (topic, category),
+    )
+    with _lock:
+        _registry[topic.strip().lower()] = category
+
+def category_of(topic):
+    """Category for a test topic, or None if the topic does not count towards any category board."""
+    # MySQL's default collation compares case-insensitively; match that here.
+    return _registry.get((topic or "").strip().lower())
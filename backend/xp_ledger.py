@@ -0,0 +1,439 @@
+# backend/xp_ledger.py
+# Incrementally maintained XP projection. Every write path that can change a user's XP
+# updates `user_xp` in the same transaction, so the gamification and leaderboard reads
+# are a single-row / indexed lookup instead of GROUP BYs over every attempt.
+#
+#   python xp_ledger.py rebuild   -> recompute all projection tables from the source tables
+#   python xp_ledger.py verify    -> compare the projection with the legacy SQL formulas
+#   python xp_ledger.py replay    -> scratch DBs only: play random attempts through the record_*
+#                                    write paths, then verify (the ledger's equivalence test)
+#
+# The repo has no test suite; `replay` and `verify` exit 1 on any mismatch so they can gate CI.
+import sys
+import random
+import topic_categories
+
+# --- Levels ---
+LEVEL_THRESHOLDS = [(1500, 5), (700, 4), (300, 3), (100, 2)]
+
+def calculate_level(xp):
+    for threshold, level in LEVEL_THRESHOLDS:
+        if xp >= threshold: return level
+    return 1
+
+def next_level_xp(level):
+    return {1: 100, 2: 300, 3: 700, 4: 1500}.get(level, 3000)
+
+# --- XP Formulas (must stay in sync with LEGACY_XP_QUERY below) ---
+PASSING_SCORE = 15
+
+def mode_points(mode, max_score):
+    """Base XP for passing one (topic, mode); category boards count only this part."""
+    if max_score is None or max_score < PASSING_SCORE: return 0
+    mode = (mode or "").strip().lower()
+    return 40 if mode == "hard" else (20 if mode == "moderate" else 10)
+
+def test_points(mode, max_score, max_total):
+    """XP for the best attempt of one (topic, mode). ANTI-FARMING: only the best score counts."""
+    points = mode_points(mode, max_score)
+    if points and max_total and max_total > 0 and max_score / max_total >= 0.9:
+        points += 15
+    return points
+
+def coding_points(difficulty):
+    difficulty = (difficulty or "").strip().lower()
+    return 40 if difficulty == "hard" else (20 if difficulty == "medium" else 10)
+
+def interview_points(overall_score):
+    return 0 if overall_score is None else 50 + overall_score * 5
+
+def gd_points(total):
+    """GD totals are out of 50 (5 metrics x 10), so this mirrors interview_points for a 0-10 score."""
+    return 50 + total
+
+# --- Schema ---
+# Tables are created by migrations.py (0002_xp_ledger).
+
+# --- Read Model ---
+# One row per user as the leaderboard index keeps it (see leaderboard_index.py).
+LEADERBOARD_ROW_QUERY = """
+    SELECT x.user_id, u.fname, u.lname, u.profile_picture_url,
+           x.test_xp, x.coding_xp, x.interview_xp, x.total_xp,
+           x.aptitude_tests, x.coding_solved, x.interviews
+    FROM user_xp x
+    JOIN users u ON u.id = x.user_id
+"""
+
+def load_leaderboard_rows(cursor):
+    cursor.execute(LEADERBOARD_ROW_QUERY)
+    return cursor.fetchall()
+
+# --- Write Paths ---
+# Each recorder is written once as a generator of (sql, params) steps; the driver feeds back
+# fetchone() for SELECTs and rowcount for writes, so the same logic runs on a mysql.connector
+# cursor (sync routes / ORM sessions) and an aiomysql cursor (async routes).
+# Recorders return the user's fresh leaderboard row (None if nothing changed); publish it to
+# the leaderboard index only after the caller has committed.
+
+_BUMP_XP = """
+    INSERT INTO user_xp (user_id, test_xp, coding_xp, interview_xp, aptitude_tests, coding_solved, interviews, active_days)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        test_xp = test_xp + VALUES(test_xp),
+        coding_xp = coding_xp + VALUES(coding_xp),
+        interview_xp = interview_xp + VALUES(interview_xp),
+        aptitude_tests = aptitude_tests + VALUES(aptitude_tests),
+        coding_solved = coding_solved + VALUES(coding_solved),
+        interviews = interviews + VALUES(interviews),
+        active_days = active_days + VALUES(active_days)
+"""
+
+def _bump(user_id, test_xp=0, coding_xp=0, interview_xp=0, aptitude_tests=0, coding_solved=0, interviews=0, active_days=0):
+    return _BUMP_XP, (user_id, test_xp, coding_xp, interview_xp, aptitude_tests, coding_solved, interviews, active_days)
+
+def _bump_category(user_id, category, xp):
+    return (
+        """
+        INSERT INTO user_category_xp (user_id, category, xp) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE xp = xp + VALUES(xp)
+        """,
+        (user_id, category, xp),
+    )
+
+def _leaderboard_row(user_id):
+    return LEADERBOARD_ROW_QUERY + " WHERE x.user_id = %s", (user_id,)
+
+def _test_attempt_steps(user_id, topic, mode, score, total):
+    new_day = yield "INSERT IGNORE INTO user_active_days (user_id, day) VALUES (%s, CURDATE())", (user_id,)
+
+    best = yield (
+        "SELECT max_score, max_total FROM user_best_scores WHERE user_id=%s AND topic=%s AND mode=%s FOR UPDATE",
+        (user_id, topic, mode),
+    )
+    old_score, old_total = (best["max_score"], best["max_total"]) if best else (None, None)
+    new_score = score if old_score is None else max(old_score, score)
+    new_total = total if old_total is None else max(old_total, total)
+    if best is None or (new_score, new_total) != (old_score, old_total):
+        yield (
+            """
+            INSERT INTO user_best_scores (user_id, topic, mode, max_score, max_total) VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE max_score = GREATEST(max_score, VALUES(max_score)), max_total = GREATEST(max_total, VALUES(max_total))
+            """,
+            (user_id, topic, mode, new_score, new_total),
+        )
+
+    passed_before = old_score is not None and old_score >= PASSING_SCORE
+    passed_now = new_score >= PASSING_SCORE
+    delta = test_points(mode, new_score, new_total) - test_points(mode, old_score, old_total)
+    yield _bump(user_id, test_xp=delta, aptitude_tests=int(passed_now and not passed_before), active_days=int(new_day == 1))
+
+    category = topic_categories.category_of(topic)
+    category_delta = mode_points(mode, new_score) - mode_points(mode, old_score)
+    if category and category_delta:
+        yield _bump_category(user_id, category, category_delta)
+    return (yield _leaderboard_row(user_id))
+
+def _coding_solve_steps(user_id, problem_title, difficulty):
+    seen_title = yield (
+        "SELECT 1 AS seen FROM user_solved_problems WHERE user_id=%s AND problem_title=%s LIMIT 1 FOR UPDATE",
+        (user_id, problem_title),
+    )
+    inserted = yield (
+        "INSERT IGNORE INTO user_solved_problems (user_id, problem_title, difficulty) VALUES (%s, %s, %s)",
+        (user_id, problem_title, difficulty),
+    )
+    if inserted != 1:
+        return None
+    yield _bump(user_id, coding_xp=coding_points(difficulty), coding_solved=int(seen_title is None))
+    yield _bump_category(user_id, "coding", coding_points(difficulty))
+    return (yield _leaderboard_row(user_id))
+
+def _interview_completed_steps(user_id, overall_score):
+    yield _bump(user_id, interview_xp=interview_points(overall_score), interviews=1)
+    yield _bump_category(user_id, "interview", interview_points(overall_score))
+    return (yield _leaderboard_row(user_id))
+
+def _gd_result_steps(session_id, user_id, total):
+    inserted = yield (
+        "INSERT IGNORE INTO gd_results (session_id, user_id, total) VALUES (%s, %s, %s)",
+        (session_id, user_id, total),
+    )
+    if inserted == 1:
+        yield _bump_category(user_id, "gd", gd_points(total))
+
+def _run(cursor, steps):
+    result = None
+    try:
+        while True:
+            sql, params = steps.send(result)
+            cursor.execute(sql, params)
+            result = cursor.fetchone() if sql.lstrip().upper().startswith("SELECT") else cursor.rowcount
+    except StopIteration as done:
+        return done.value
+
+async def _run_async(cursor, steps):
+    result = None
+    try:
+        while True:
+            sql, params = steps.send(result)
+            await cursor.execute(sql, params)
+            result = await cursor.fetchone() if sql.lstrip().upper().startswith("SELECT") else cursor.rowcount
+    except StopIteration as done:
+        return done.value
+
+def record_test_attempt(cursor, user_id, topic, mode, score, total):
+    """Call right after inserting into test_attempts, before commit."""
+    return _run(cursor, _test_attempt_steps(user_id, topic, mode, score, total))
+
+def record_coding_solve(cursor, user_id, problem_title, difficulty):
+    """Call after a correct coding_attempts write, before commit."""
+    return _run(cursor, _coding_solve_steps(user_id, problem_title, difficulty))
+
+async def record_coding_solve_async(cursor, user_id, problem_title, difficulty):
+    return await _run_async(cursor, _coding_solve_steps(user_id, problem_title, difficulty))
+
+def record_interview_completed(cursor, user_id, overall_score):
+    """Call once, when an interview session's end_time goes from NULL to set, before commit."""
+    return _run(cursor, _interview_completed_steps(user_id, overall_score))
+
+async def record_gd_result_async(cursor, session_id, user_id, total):
+    """Credits one participant's GD evaluation once per session (GD XP only counts on the GD board)."""
+    return await _run_async(cursor, _gd_result_steps(session_id, user_id, total))
+
+# --- Category Boards ---
+def load_category_board(cursor, category, limit=50):
+    cursor.execute(
+        """
+        SELECT u.id, u.fname, u.lname, u.profile_picture_url, c.xp AS total_xp
+        FROM user_category_xp c
+        JOIN users u ON u.id = c.user_id
+        WHERE c.category = %s AND c.xp > 0
+        ORDER BY c.xp DESC, c.user_id ASC
+        LIMIT %s
+        """,
+        (category, limit),
+    )
+    return cursor.fetchall()
+
+# --- Rebuild / Verify ---
+REBUILD_STATEMENTS = [
+    "DELETE FROM user_best_scores",
+    """
+    INSERT INTO user_best_scores (user_id, topic, mode, max_score, max_total)
+    SELECT user_id, topic, mode, MAX(score), MAX(total) FROM test_attempts GROUP BY user_id, topic, mode
+    """,
+    "DELETE FROM user_solved_problems",
+    """
+    INSERT IGNORE INTO user_solved_problems (user_id, problem_title, difficulty)
+    SELECT DISTINCT user_id, problem_title, difficulty FROM coding_attempts WHERE is_correct = 1
+    """,
+    "DELETE FROM user_active_days",
+    """
+    INSERT IGNORE INTO user_active_days (user_id, day)
+    SELECT DISTINCT user_id, DATE(created_at) FROM test_attempts
+    """,
+    "DELETE FROM user_xp",
+    """
+    INSERT INTO user_xp (user_id, test_xp, coding_xp, interview_xp, aptitude_tests, coding_solved, interviews, active_days)
+    SELECT u.id,
+        COALESCE((
+            SELECT SUM(
+                CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END +
+                CASE WHEN max_total > 0 AND (max_score / max_total) >= 0.9 THEN 15 ELSE 0 END
+            ) FROM user_best_scores b WHERE b.user_id = u.id AND b.max_score >= 15
+        ), 0),
+        COALESCE((
+            SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
+            FROM user_solved_problems s WHERE s.user_id = u.id
+        ), 0),
+        COALESCE((
+            SELECT SUM(50 + (overall_score * 5)) FROM interview_sessions i
+            WHERE i.user_id = u.id AND i.end_time IS NOT NULL
+        ), 0),
+        (SELECT COUNT(*) FROM user_best_scores b WHERE b.user_id = u.id AND b.max_score >= 15),
+        (SELECT COUNT(DISTINCT problem_title) FROM user_solved_problems s WHERE s.user_id = u.id),
+        (SELECT COUNT(*) FROM interview_sessions i WHERE i.user_id = u.id AND i.end_time IS NOT NULL),
+        (SELECT COUNT(*) FROM user_active_days d WHERE d.user_id = u.id)
+    FROM users u
+    """,
+    "DELETE FROM user_category_xp",
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT b.user_id, tc.category, SUM(CASE WHEN b.mode = 'hard' THEN 40 WHEN b.mode = 'moderate' THEN 20 ELSE 10 END)
+    FROM user_best_scores b
+    JOIN topic_categories tc ON tc.topic = b.topic
+    WHERE b.max_score >= 15
+    GROUP BY b.user_id, tc.category
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'coding', SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
+    FROM user_solved_problems GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'interview', COALESCE(SUM(50 + (overall_score * 5)), 0)
+    FROM interview_sessions WHERE end_time IS NOT NULL GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_category_xp (user_id, category, xp)
+    SELECT user_id, 'gd', SUM(50 + total) FROM gd_results GROUP BY user_id
+    """,
+]
+
+def rebuild(cursor):
+    """One-shot backfill: recomputes every projection table from the source tables. Caller commits.
+    Needs topic_categories to exist (topic_categories.load)."""
+    for sql in REBUILD_STATEMENTS:
+        cursor.execute(sql)
+
+# The formulas main.py used before the ledger existed; kept as the source of truth for `verify`.
+LEGACY_XP_QUERY = """
+    SELECT u.id,
+        COALESCE((
+            SELECT SUM(
+                CASE WHEN mode = 'hard' THEN 40 WHEN mode = 'moderate' THEN 20 ELSE 10 END +
+                CASE WHEN max_total > 0 AND (max_score / max_total) >= 0.9 THEN 15 ELSE 0 END
+            )
+            FROM (
+                SELECT user_id, topic, mode, MAX(score) as max_score, MAX(total) as max_total
+                FROM test_attempts GROUP BY user_id, topic, mode
+            ) t
+            WHERE t.user_id = u.id AND t.max_score >= 15
+        ), 0) as test_xp,
+        COALESCE((
+            SELECT SUM(CASE WHEN difficulty = 'hard' THEN 40 WHEN difficulty = 'medium' THEN 20 ELSE 10 END)
+            FROM (
+                SELECT user_id, problem_title, difficulty FROM coding_attempts
+                WHERE is_correct = 1 GROUP BY user_id, problem_title, difficulty
+            ) c
+            WHERE c.user_id = u.id
+        ), 0) as coding_xp,
+        COALESCE((
+            SELECT SUM(50 + (overall_score * 5)) FROM interview_sessions
+            WHERE user_id = u.id AND end_time IS NOT NULL
+        ), 0) as interview_xp,
+        (SELECT COUNT(DISTINCT topic, mode) FROM test_attempts WHERE user_id = u.id AND score >= 15) as aptitude_tests,
+        (SELECT COUNT(DISTINCT problem_title) FROM coding_attempts WHERE user_id = u.id AND is_correct = 1) as coding_solved,
+        (SELECT COUNT(*) FROM interview_sessions WHERE user_id = u.id AND end_time IS NOT NULL) as interviews,
+        (SELECT COUNT(DISTINCT DATE(created_at)) FROM test_attempts WHERE user_id = u.id) as active_days
+    FROM users u
+"""
+
+# Same formulas the filtered leaderboard used, with its hard-coded topic lists replaced by the registry.
+LEGACY_CATEGORY_QUERY = """
+    SELECT user_id, category, SUM(xp) AS xp FROM (
+        SELECT t.user_id, tc.category, CASE WHEN t.mode = 'hard' THEN 40 WHEN t.mode = 'moderate' THEN 20 ELSE 10 END AS xp
+        FROM (
+            SELECT user_id, topic, mode, MAX(score) as max_score FROM test_attempts GROUP BY user_id, topic, mode
+        ) t
+        JOIN topic_categories tc ON tc.topic = t.topic
+        WHERE t.max_score >= 15
+        UNION ALL
+        SELECT c.user_id, 'coding', CASE WHEN c.difficulty = 'hard' THEN 40 WHEN c.difficulty = 'medium' THEN 20 ELSE 10 END
+        FROM (
+            SELECT user_id, problem_title, difficulty FROM coding_attempts
+            WHERE is_correct = 1 GROUP BY user_id, problem_title, difficulty
+        ) c
+        UNION ALL
+        SELECT user_id, 'interview', COALESCE(50 + (overall_score * 5), 0) FROM interview_sessions WHERE end_time IS NOT NULL
+        UNION ALL
+        SELECT user_id, 'gd', 50 + total FROM gd_results
+    ) s
+    GROUP BY user_id, category
+"""
+
+# interview_sessions.overall_score is a single-precision FLOAT, so the legacy sums drift by ~1e-6 per interview
+XP_TOLERANCE = 0.01
+
+LEDGER_COLUMNS = ["test_xp", "coding_xp", "interview_xp", "aptitude_tests", "coding_solved", "interviews", "active_days"]
+
+def verify(cursor):
+    """Returns a list of (user_id, column, legacy_value, ledger_value) for every disagreement."""
+    cursor.execute(LEGACY_XP_QUERY)
+    legacy = {row["id"]: row for row in cursor.fetchall()}
+    cursor.execute(f"SELECT user_id, {', '.join(LEDGER_COLUMNS)} FROM user_xp")
+    ledger = {row["user_id"]: row for row in cursor.fetchall()}
+
+    mismatches = []
+    for user_id, expected in legacy.items():
+        actual = ledger.get(user_id, {})
+        for col in LEDGER_COLUMNS:
+            want, got = float(expected[col] or 0), float(actual.get(col) or 0)
+            if abs(want - got) > XP_TOLERANCE:
+                mismatches.append((user_id, col, want, got))
+
+    cursor.execute(LEGACY_CATEGORY_QUERY)
+    legacy = {(row["user_id"], row["category"]): float(row["xp"] or 0) for row in cursor.fetchall()}
+    cursor.execute("SELECT user_id, category, xp FROM user_category_xp")
+    ledger = {(row["user_id"], row["category"]): float(row["xp"]) for row in cursor.fetchall()}
+    for user_id, category in legacy.keys() | ledger.keys():
+        want, got = legacy.get((user_id, category), 0.0), ledger.get((user_id, category), 0.0)
+        if abs(want - got) > XP_TOLERANCE:
+            mismatches.append((user_id, f"{category}_category_xp", want, got))
+    return mismatches
+
+def replay(cursor, users=50, events=3000, seed=42):
+    """Writes random test attempts, coding solves and finished interviews the way the routes do
+    (source row, then record_*), so `verify` checks the incremental updates, not `rebuild`. Caller commits."""
+    rnd = random.Random(seed)
+    topics = ["Percentages", "Grammar", "Java Programming", "Operating Systems", "Uncategorised Topic"]
+    cursor.executemany(
+        "INSERT IGNORE INTO users (fname, lname, email, year, field, password) VALUES (%s, %s, %s, %s, %s, %s)",
+        [("Replay", str(i), f"replay{i}@example.com", 3, "CSE", "x") for i in range(users)],
+    )
+    cursor.execute("SELECT id FROM users WHERE email LIKE %s", ("replay%@example.com",))
+    user_ids = [row["id"] for row in cursor.fetchall()]
+    for _ in range(events):
+        user_id, kind = rnd.choice(user_ids), rnd.random()
+        if kind < 0.6:
+            topic, mode, score = rnd.choice(topics), rnd.choice(["easy", "moderate", "hard"]), rnd.randint(0, 20)
+            cursor.execute(
+                "INSERT INTO test_attempts (user_id, topic, mode, score, total, time_taken) VALUES (%s, %s, %s, %s, 20, 60)",
+                (user_id, topic, mode, score),
+            )
+            record_test_attempt(cursor, user_id, topic, mode, score, 20)
+        elif kind < 0.9:
+            title, difficulty = f"Problem {rnd.randint(1, 40)}", rnd.choice(["easy", "medium", "hard"])
+            cursor.execute(
+                """
+                INSERT INTO coding_attempts (user_id, problem_title, difficulty, is_correct) VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE is_correct = VALUES(is_correct)
+                """,
+                (user_id, title, difficulty, True),
+            )
+            record_coding_solve(cursor, user_id, title, difficulty)
+        else:
+            score = round(rnd.uniform(0, 10), 1)
+            cursor.execute(
+                "INSERT INTO interview_sessions (user_id, job_role, interview_type, start_time, end_time, overall_score) VALUES (%s, 'SDE', 'HR', NOW(), NOW(), %s)",
+                (user_id, score),
+            )
+            record_interview_completed(cursor, user_id, score)
+
+if __name__ == "__main__":
+    from database import engine
+    from migrations import run_migrations
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    conn = engine.raw_connection()
+    try:
+        run_migrations(conn)
+        cursor = conn.cursor(dictionary=True)
+        topic_categories.load(cursor)
+        if command == "rebuild":
+            rebuild(cursor)
+            conn.commit()
+            print("✅ XP ledger rebuilt.")
+        elif command == "replay":
+            rebuild(cursor)  # whatever the scratch DB already holds starts out consistent
+            replay(cursor)
+            conn.commit()
+            print("✅ Replayed random attempts through the ledger write paths.")
+        mismatches = verify(cursor)
+        for user_id, col, want, got in mismatches[:50]:
+            print(f"❌ user {user_id}: {col} legacy={want} ledger={got}")
+        print(f"{'✅' if not mismatches else '❌'} {len(mismatches)} mismatches.")
+        sys.exit(1 if mismatches else 0)
+    finally:
+        conn.close()
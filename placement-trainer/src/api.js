@@ -10,14 +10,45 @@ export async function registerUser(userData) {
   return res.data;
 }
 
-export async function getUserDetails(userId, page = 1, limit = 20, signal) {
+const HISTORY_LISTS = ["tests", "coding", "interviews"];
+
+// One page of each history list. Pass the previous page's next_cursors back as `cursors`;
+// lists named in `skip` are not queried (they have run out).
+export async function getUserDetails(userId, { limit = 20, cursors = {}, skip = [] } = {}, signal) {
+  const params = { limit };
+  HISTORY_LISTS.forEach((name) => {
+    if (cursors[name]) params[`${name}_cursor`] = cursors[name];
+    if (skip.includes(name)) params[`${name}_limit`] = 0;
+  });
   const res = await axios.get(`${API_BASE}/api/user/${userId}`, {
-    params: { page, limit },
+    params,
     signal: signal
   });
   return res.data;
 }
 
+// Every page of the three history lists (newest first), following next_cursors until each runs out
+export async function getUserHistory(userId, signal) {
+  const history = { tests: [], coding: [], interviews: [] };
+  let cursors = {}, skip = [], user = null;
+  for (;;) {
+    const data = await getUserDetails(userId, { limit: 100, cursors, skip }, signal);
+    user = user || data.user;
+    HISTORY_LISTS.forEach((name) => {
+      if (!skip.includes(name)) history[name].push(...(data[name] || []));
+    });
+    cursors = data.next_cursors || {};
+    skip = HISTORY_LISTS.filter((name) => !cursors[name]);
+    if (skip.length === HISTORY_LISTS.length) return { user, ...history };
+  }
+}
+
+// Profile plus the ledger's totals, without history rows
+export async function getUserSummary(userId, signal) {
+  const res = await axios.get(`${API_BASE}/api/user/${userId}/summary`, { signal });
+  return res.data;
+}
+
 export async function loginUser(credentials) {
   // credentials = { email, password }
   const res = await axios.post(`${API_BASE}/api/login`, credentials);
@@ -52,6 +52,7 @@ export default function TestPage() {
           topic: decodedTopic,
           difficulty: mode,
           count: count,
+          user_id: user?.id,
         });
 
         // Split into sections for the UI
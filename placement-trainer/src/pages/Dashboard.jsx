@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useMemo } from "react";
-import { getUserDetails } from "../api";
+import { getUserHistory, getUserSummary } from "../api";
 import { useAuth } from "../context/AuthContext";
 import API_BASE from "../api";
 import axios from "axios";
@@ -79,6 +79,7 @@ export default function Dashboard() {
   const [tests, setTests] = useState([]);
   const [codingAttempts, setCodingAttempts] = useState([]);
   const [interviewAttempts, setInterviewAttempts] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   
   const [selectedView, setSelectedView] = useState('aptitude');
@@ -94,16 +95,21 @@ export default function Dashboard() {
     
     async function fetchUser() {
       try {
-        const data = await getUserDetails(authUser.id, 1, 100, controller.signal);
+        // Totals come from the ledger; the charts and the log need every history page
+        const [summaryData, data] = await Promise.all([
+          getUserSummary(authUser.id, controller.signal),
+          getUserHistory(authUser.id, controller.signal),
+        ]);
+        setSummary(summaryData);
         if(data.user) {
             setUser(data.user);
             updateUser(data.user);
         }
-        setTests((data.tests || []).sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
-        setCodingAttempts((data.coding || []).sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
-        setInterviewAttempts(data.interviews || []);
+        setTests(data.tests.sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
+        setCodingAttempts(data.coding.sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
+        setInterviewAttempts(data.interviews.sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
       } catch (err) {
-        if (err.name !== 'AbortError') console.error("Fetch error:", err);
+        if (!axios.isCancel(err)) console.error("Fetch error:", err);
       } finally {
         if (!controller.signal.aborted) setLoading(false);
       }
@@ -134,12 +140,12 @@ export default function Dashboard() {
   };
 
   // --- MEMOIZED LOGIC ---
-  const stats = useMemo(() => {
-    const totalTests = tests.length;
-    const avgScore = totalTests > 0 ? (tests.reduce((a, b) => a + (b.score || 0), 0) / totalTests).toFixed(1) : 0;
-    const codingSolved = codingAttempts.filter(c => c.is_correct).length;
-    return { totalTests, avgScore, codingSolved, interviewCount: interviewAttempts.length };
-  }, [tests, codingAttempts, interviewAttempts]);
+  const stats = useMemo(() => ({
+    totalTests: summary?.tests_taken ?? 0,
+    avgScore: summary?.avg_test_score ?? 0,
+    codingSolved: summary?.coding_solved ?? 0,
+    interviewCount: summary?.interviews ?? 0,
+  }), [summary]);
 
   const { filteredTests } = useMemo(() => {
     const relevantTopics = selectedView === 'aptitude' ? APTITUDE_TOPICS : TECHNICAL_TOPICS;
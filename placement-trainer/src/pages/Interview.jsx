@@ -110,38 +110,51 @@ export default function Interview() {
       const res = await axios.post(`${API_BASE}/api/interview/chat`, {
         session_id: sessionId,
         user_input: userMsg.content,
-        history: messages,
         is_code: isCodingMode
       });
 
-      const { feedback: aiFeedback, ideal_answer, score, next_question, is_final } = res.data;
+      const { feedback: aiFeedback, ideal_answer, score, next_question, is_final, scored_turn, overall_score } = res.data;
+      const question = messages[messages.length - 1]?.content || "Intro";
+
+      // Save turn history once the answer has a score
+      const recordFeedback = (result) => {
+        setFeedback({ score: result.score, ideal: result.ideal_answer, text: result.feedback });
+        setScoreHistory(prev => [...prev, result.score]);
+        setFeedbackHistory(prev => [...prev, {
+          question,
+          answer: userMsg.content,
+          score: result.score,
+          ideal_answer: result.ideal_answer,
+          feedback: result.feedback
+        }]);
+      };
 
-      setFeedback({ score, ideal: ideal_answer, text: aiFeedback });
-      
-      // Save turn history
       const turnData = {
-        question: messages[messages.length - 1]?.content || "Intro",
+        question,
         answer: userMsg.content,
         score: score,
         ideal_answer: ideal_answer,
         feedback: aiFeedback
       };
-      
-      setScoreHistory(prev => [...prev, score]);
-      setFeedbackHistory(prev => [...prev, turnData]);
+
+      // Mid-interview answers are scored in the background; fetch the result without blocking the next question
+      if (!is_final && scored_turn) {
+        setFeedback({ score: null, ideal: "", text: "" });
+        axios.get(`${API_BASE}/api/interview/feedback/${sessionId}/${scored_turn}`)
+          .then(fb => recordFeedback(fb.data))
+          .catch(err => console.error("Failed to load answer feedback", err));
+      }
 
       if (is_final) {
-        alert(`Interview Complete! Final Score: ${score}/10`);
-        
-        // Calculate average score
-        const totalScore = [...scoreHistory, score].reduce((a, b) => a + b, 0);
-        const avgScore = Math.round(totalScore / (scoreHistory.length + 1));
+        recordFeedback({ score, ideal_answer, feedback: aiFeedback });
+        alert(`Interview Complete! Final Score: ${overall_score}/10`);
         
+        // The server averages every scored turn, including feedback this page has not fetched yet
         await saveInterviewResult({
             user_id: user.id,
             interview_type: config.type,
             job_role: config.role,
-            overall_score: avgScore,
+            overall_score: Math.round(overall_score),
             feedback: [...feedbackHistory, turnData]
         });
 
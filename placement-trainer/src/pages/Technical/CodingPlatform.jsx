@@ -14,6 +14,15 @@ const boilerplate = {
   cpp: `#include <iostream>\n#include <string>\n#include <vector>\n\nint main() {\n    // Your solution logic here.\n}`,
 };
 
+const VERDICT_LABELS = {
+  OK: "Finished",
+  CE: "Compilation Error",
+  RE: "Runtime Error",
+  TLE: "Time Limit Exceeded",
+  MLE: "Memory Limit Exceeded",
+  OLE: "Output Limit Exceeded",
+};
+
 export default function CodingPlatform() {
   const { difficulty } = useParams();
   const navigate = useNavigate();
@@ -92,7 +101,11 @@ export default function CodingPlatform() {
         throw new Error(errData.detail || 'Failed to run code');
       }
       const data = await res.json();
-      setOutput(data.output || "Execution finished with no output.");
+      const run = data.run;
+      const summary = run
+        ? `\n\n[${VERDICT_LABELS[run.verdict] || run.verdict}] ${run.runtime_ms ?? '-'} ms · ${run.peak_memory_kb != null ? (run.peak_memory_kb / 1024).toFixed(1) : '-'} MB · exit ${run.exit_code ?? '-'}${run.compile_cached ? ' · cached build' : ''}`
+        : "";
+      setOutput((data.output || "Execution finished with no output.") + summary);
     } catch (err) {
       console.error(err);
       setOutput(`Error: ${err.message}`);